@@ -0,0 +1,123 @@
+"""
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+
+"""
+Descripción:
+============
+Compara la lectura de las filas del informe por vías de acceso celda a
+celda (buscando colspan y comprobando cada celda con re.match, como hacían
+los scripts) con el plan de columnas de grados.ugr.PlanAcceso, deducido de la
+cabecera.
+
+Se genera un informe sintético (benchmarks/sintetico.py) y se mide sólo el
+parseo de las filas, ya leídas del HTML. Se comprueba además que un informe
+con las vías de acceso en otro orden da los mismos datos.
+
+Argumentos:
+- titulaciones: Argumento opcional. Número de titulaciones del informe
+  sintético, con dos filas cada una (por defecto 100000).
+"""
+
+import io
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+from grados import ugr
+from grados.tabla import filas
+from sintetico import informe_acceso, titulaciones
+
+
+def parse_tr_celdas(td_list):
+    """
+    Lectura de una fila celda a celda, como hacía parse_tr en
+    nuevo_acceso.py.
+    """
+    titulacion = td_list[2]
+    facultad = td_list[0]
+    try:
+        total = int(td_list[1].replace('.', ''))
+    except ValueError as e:
+        total = None
+    try:
+        total_titulacion = int(td_list[3].replace('.', ''))
+    except ValueError as e:
+        total_titulacion = None
+
+    lista_accesos = [0, 0, 0, 0, 0, 0]
+    lista_index = 0
+    index = 5
+    while index < len(td_list) - 2:
+        if index in td_list.colspan:
+            lista_index = lista_index + td_list.colspan[index]
+        else:
+            if re.match('[0-9]+', td_list[index]):
+                lista_accesos[lista_index] = int(td_list[index].replace('.', ''))
+            lista_index = lista_index + 1
+        index = index + 1
+    acceso = {
+        'PAU': lista_accesos[0],
+        'Credencial': lista_accesos[1],
+        'F.P.': lista_accesos[2],
+        'Titulados': lista_accesos[3],
+        'Mayores 25': lista_accesos[4],
+        'Otros': lista_accesos[5],
+    }
+
+    total_sexo = int(td_list[len(td_list) - 2].replace('.', ''))
+    return facultad, total, titulacion, total_titulacion, total_sexo, acceso
+
+
+def medir(nombre, parse_tr, tabla):
+    inicio = time.perf_counter()
+    resultado = [parse_tr(td_list) for td_list in tabla]
+    tiempo = time.perf_counter() - inicio
+    print('%-16s %8.3f s %10.0f filas/s' % (nombre, tiempo, len(tabla) / tiempo))
+    return resultado
+
+
+def texto_acceso(datos, orden=range(6)):
+    output = io.StringIO()
+    informe_acceso(output, datos, orden)
+    return output.getvalue()
+
+
+if __name__ == '__main__':
+    n_titulaciones = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+
+    texto = texto_acceso(titulaciones(n_titulaciones))
+    tabla = list(filas(io.StringIO(texto)))
+    cabecera, tabla = tabla[:11], tabla[11:]
+    plan = ugr.PlanAcceso.desde_cabecera(cabecera)
+    print('Informe sintético: %d filas, %.1f MiB' % (len(tabla), len(texto) / 2**20))
+    print('Plan: %s' % (plan.columnas,))
+
+    celdas = medir('celda a celda', parse_tr_celdas, tabla)
+    con_plan = medir('plan', plan, tabla)
+    # El plan devuelve los contadores en una tupla, en el orden de VIAS_ACCESO
+    if [fila[:5] + (tuple(fila[5].values()),) for fila in celdas] != con_plan:
+        sys.exit('Los dos métodos no obtienen los mismos datos')
+
+    # El mismo informe con las vías en otro orden
+    datos = titulaciones(1000)
+    original = dict(ugr.parse_acceso(io.StringIO(texto_acceso(datos))))
+    reordenado = dict(ugr.parse_acceso(io.StringIO(
+        texto_acceso(datos, orden=(5, 3, 0, 4, 1, 2)))))
+    if original != reordenado:
+        sys.exit('El orden de las columnas cambia los datos')
+    print('Mismos datos con las vías en otro orden')
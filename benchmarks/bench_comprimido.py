@@ -0,0 +1,105 @@
+"""
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+
+"""
+Descripción:
+============
+Compara la lectura y la escritura de ficheros sin comprimir y comprimidos
+con gzip y zstd (grados/comprimido.py).
+
+Se genera un informe sintético por edades (benchmarks/sintetico.py) y se
+guarda sin comprimir, como .gz y como .zst. Para cada uno se muestra su
+tamaño y el tiempo de parse_edades leyendo directamente del fichero (filas
+por segundo), y se comprueba que se obtienen los mismos datos. Después se
+escribe el JSON de esos datos en cada formato, con su tiempo y su tamaño.
+
+Si zstd no está disponible (Python 3.14 o el paquete zstandard), se mide
+sólo gzip.
+
+Argumentos:
+- titulaciones: Argumento opcional. Número de titulaciones del informe
+  sintético, con dos filas cada una (por defecto 20000).
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+from grados import comprimido, salida, ugr
+from sintetico import informe_edades, titulaciones
+
+
+def extensiones():
+    disponibles = [extension for extension in ('',) + comprimido.EXTENSIONES
+                   if comprimido.disponible(extension)]
+    if '.zst' not in disponibles:
+        print('zstd no está disponible, se omite')
+    return disponibles
+
+
+def copiar(origen, destino):
+    with open(origen, 'rb') as entrada, comprimido.abrir(destino, 'wb') as output:
+        shutil.copyfileobj(entrada, output)
+
+
+def leer(filename):
+    inicio = time.perf_counter()
+    with comprimido.abrir(filename, 'rb') as html_doc:
+        data = dict(ugr.parse_edades(html_doc))
+    tiempo = time.perf_counter() - inicio
+    print('%-9s %-16s %8.1f MiB %8.2f s %10.0f filas/s' % ('leer',
+        os.path.basename(filename), os.path.getsize(filename) / 2**20, tiempo,
+        2 * len(data) / tiempo))
+    return data
+
+
+def escribir(data, filename):
+    inicio = time.perf_counter()
+    with comprimido.abrir(filename, 'w') as output:
+        salida.escribir_json(data.items(), output)
+    tiempo = time.perf_counter() - inicio
+    print('%-9s %-16s %8.1f MiB %8.2f s' % ('escribir',
+        os.path.basename(filename), os.path.getsize(filename) / 2**20, tiempo))
+
+
+if __name__ == '__main__':
+    n_titulaciones = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+
+    directorio = tempfile.mkdtemp(prefix='grados-')
+    try:
+        html = os.path.join(directorio, 'edades.html')
+        with open(html, 'w', encoding='latin-1') as output:
+            informe_edades(output, titulaciones(n_titulaciones))
+
+        disponibles = extensiones()
+        for extension in disponibles[1:]:
+            copiar(html, html + extension)
+
+        referencia = None
+        for extension in disponibles:
+            data = leer(html + extension)
+            if referencia is None:
+                referencia = data
+            elif data != referencia:
+                sys.exit('%s no da los mismos datos' % (html + extension))
+
+        for extension in disponibles:
+            escribir(referencia, os.path.join(directorio, 'salida.json' + extension))
+    finally:
+        shutil.rmtree(directorio)
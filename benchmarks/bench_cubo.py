@@ -0,0 +1,121 @@
+"""
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+
+"""
+Descripción:
+============
+Compara algunas agregaciones típicas recorriendo los diccionarios de salida de
+los scripts y usando grados.cubo, sobre datos sintéticos de varios años.
+También comprueba que Cubo.a_json devuelve los datos originales.
+
+Argumentos:
+- years: Argumento opcional. Número de años (por defecto 10).
+- titulaciones: Argumento opcional. Número de titulaciones (por defecto 2000).
+
+Requisitos:
+===========
+- Python 3
+- NumPy
+"""
+
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+from grados.cubo import Cubo, SEXOS
+from grados.upo import EDADES, VIAS_ACCESO
+
+
+def sintetico(n_years, n_titulaciones, n_facultades=25):
+    """
+    Devuelve ({año: data}, {titulacion: facultad}) con datos aleatorios.
+    """
+    random.seed(0)
+    facultad_de = {'GRADO EN TITULACIÓN %d' % i: 'FACULTAD %d' % (i % n_facultades)
+                   for i in range(n_titulaciones)}
+    por_year = {}
+    for year in range(2004, 2004 + n_years):
+        data = {}
+        for titulacion in facultad_de:
+            datos = {'total': 0}
+            for sexo in SEXOS:
+                edades = {e: random.randint(0, 50) for e in EDADES}
+                total_sexo = sum(edades.values())
+                accesos = {v: 0 for v in VIAS_ACCESO}
+                for _ in range(total_sexo):
+                    accesos[random.choice(VIAS_ACCESO)] += 1
+                datos[sexo] = {'total': total_sexo, 'edades': edades,
+                               'via_acceso': accesos}
+                datos['total'] = datos['total'] + total_sexo
+            data[titulacion] = datos
+        por_year[str(year)] = data
+    return por_year, facultad_de
+
+
+def con_diccionarios(por_year, facultad_de):
+    totales = {}
+    edades_universidad = {}
+    edades_facultad = {}
+    for year, data in por_year.items():
+        for titulacion, datos in data.items():
+            facultad = facultad_de[titulacion]
+            for sexo in SEXOS:
+                clave = (year, sexo)
+                totales[clave] = totales.get(clave, 0) + datos[sexo]['total']
+                for edad, n in datos[sexo]['edades'].items():
+                    clave = (year, sexo, edad)
+                    edades_universidad[clave] = edades_universidad.get(clave, 0) + n
+                    clave = (year, facultad, sexo, edad)
+                    edades_facultad[clave] = edades_facultad.get(clave, 0) + n
+    return totales, edades_universidad, edades_facultad
+
+
+def con_cubo(cubo, facultad_de):
+    totales = cubo.totales_sexo.sum(axis=1)
+    edades_universidad = cubo.edades.sum(axis=1)
+    edades_facultad = cubo.agrupar(cubo.edades, facultad_de)
+    return totales, edades_universidad, edades_facultad
+
+
+def medir(nombre, funcion, *args):
+    inicio = time.perf_counter()
+    resultado = funcion(*args)
+    print('%-28s %10.4f s' % (nombre, time.perf_counter() - inicio))
+    return resultado
+
+
+if __name__ == '__main__':
+    n_years = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    n_titulaciones = int(sys.argv[2]) if len(sys.argv) > 2 else 2000
+
+    por_year, facultad_de = sintetico(n_years, n_titulaciones)
+    print('Datos sintéticos: %d años, %d titulaciones' % (n_years, n_titulaciones))
+
+    totales, edades_universidad, _ = medir(
+        'diccionarios', con_diccionarios, por_year, facultad_de)
+    cubo = medir('carga del cubo', Cubo.desde_json, por_year)
+    c_totales, c_edades, _ = medir('cubo', con_cubo, cubo, facultad_de)
+
+    # Comprobaciones
+    for (year, sexo), n in totales.items():
+        assert c_totales[cubo.indice_year[year], SEXOS.index(sexo)] == n
+    for (year, sexo, edad), n in edades_universidad.items():
+        assert c_edades[cubo.indice_year[year], SEXOS.index(sexo), EDADES.index(edad)] == n
+    for year, data in por_year.items():
+        assert cubo.a_json(year) == data
+    print('Resultados y conversión a JSON correctos')
@@ -0,0 +1,152 @@
+"""
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+
+"""
+Descripción:
+============
+Compara la conversión de las celdas numéricas del informe por edades fila a
+fila (grados.ugr.parse_tr_edades: replace() e int() por celda) con la
+conversión por lotes de grados.ugr.parse_lote_edades (los números de
+LOTE_EDADES filas unidos en un texto que lee json.loads de una vez).
+
+Las filas se reconstruyen a partir de data/nuevo_edad.json (con los miles
+separados por puntos, como en los informes) y con las dos conversiones se
+vuelve a generar el JSON, que tiene que ser idéntico, byte a byte, al
+fichero. Después se mide:
+
+- conversión: sólo la conversión de las filas de data/nuevo_edad.json,
+  repetidas varias veces.
+- informe: parse_edades completo (lectura del HTML incluida) de un informe
+  sintético (ver sintetico.py), con cada una de las dos conversiones.
+
+Argumentos:
+- repeticiones: Argumento opcional. Número de veces que se repiten las filas
+  de data/nuevo_edad.json en la medición (por defecto 2000).
+- titulaciones: Argumento opcional. Número de titulaciones del informe
+  sintético (por defecto 20000).
+"""
+
+import io
+import json
+import os
+import sys
+import time
+
+RAIZ = os.path.join(os.path.dirname(__file__), '..')
+sys.path.insert(0, RAIZ)
+import sintetico
+from grados import ugr
+from grados.upo import EDADES
+
+SEXOS = ('Hombres', 'Mujeres')
+
+
+def por_filas(td_lists):
+    """
+    Conversión anterior: parse_tr_edades fila a fila.
+    """
+    return [ugr.parse_tr_edades(td_list) for td_list in td_lists]
+
+
+def por_lotes(tabla, convertir):
+    """
+    Convierte tabla en lotes de LOTE_EDADES filas, como grados.ugr.
+    """
+    resultado = []
+    for i in range(0, len(tabla), ugr.LOTE_EDADES):
+        resultado.extend(convertir(tabla[i:i + ugr.LOTE_EDADES]))
+    return resultado
+
+
+def miles(n):
+    return '{:,}'.format(n).replace(',', '.')
+
+
+def filas_json(data):
+    """
+    Filas del informe por edades con los datos del formato antiguo (una
+    lista con un diccionario por sexo). La titulación "null" se convierte en
+    una fila sin titulación, que parse_tr_edades lee como None.
+    """
+    tabla = []
+    for sexo, titulaciones in zip(SEXOS, data):
+        for titulacion, (total_sexo, edades) in titulaciones.items():
+            fila = ['FACULTAD', '', '' if titulacion == 'null' else titulacion,
+                  '', sexo]
+            if total_sexo is not None:
+                fila.extend(miles(edades[str(edad)]) for edad in EDADES)
+                fila.append(miles(total_sexo))
+            tabla.append(fila)
+    return tabla
+
+
+def a_json(convertir, tabla):
+    """
+    JSON del formato antiguo con los datos de las filas. Las titulaciones
+    se toman tal cual de las filas (algunas del fichero tienen saltos de
+    línea que parse_tr_edades quita), así que sólo se comparan los números.
+    """
+    data = [{} for _ in SEXOS]
+    for td_list, resultado in zip(tabla, por_lotes(tabla, convertir)):
+        edades = resultado[5]
+        if edades is not None:
+            edades = dict(zip(EDADES, edades))
+        data[SEXOS.index(td_list[4])][td_list[2] or None] = [resultado[4], edades]
+    return json.dumps(data)
+
+
+def medir(nombre, funcion, n):
+    inicio = time.perf_counter()
+    resultado = funcion()
+    tiempo = time.perf_counter() - inicio
+    print('%-24s %8.3f s %8.2f us/fila' % (nombre, tiempo, tiempo / n * 1e6))
+    return resultado
+
+
+if __name__ == '__main__':
+    repeticiones = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    n_titulaciones = int(sys.argv[2]) if len(sys.argv) > 2 else 20000
+
+    filename = os.path.join(RAIZ, 'data', 'nuevo_edad.json')
+    with open(filename, 'rb') as f:
+        original = f.read()
+    tabla = filas_json(json.loads(original.decode('utf-8')))
+
+    for nombre, convertir in (('fila a fila', por_filas),
+                              ('por lotes', ugr.parse_lote_edades)):
+        if a_json(convertir, tabla).encode('utf-8') != original:
+            sys.exit('%s no reproduce %s' % (nombre, filename))
+    print('Las dos conversiones reproducen %s (%d filas)' % (filename, len(tabla)))
+
+    tabla = [td_list for td_list in tabla if td_list[2]] * repeticiones
+    filas = medir('conversión fila a fila', lambda: por_lotes(tabla, por_filas), len(tabla))
+    lotes = medir('conversión por lotes', lambda: por_lotes(tabla, ugr.parse_lote_edades),
+                  len(tabla))
+    if filas != lotes:
+        sys.exit('Las dos conversiones no obtienen los mismos datos')
+
+    output = io.StringIO()
+    sintetico.informe_edades(output, sintetico.titulaciones(n_titulaciones))
+    html_doc = output.getvalue()
+    n_filas = 2 * n_titulaciones
+    filas = medir('informe fila a fila', lambda: list(ugr._entradas(
+        io.StringIO(html_doc), 10, lambda cabecera: por_filas, 'edades',
+        ugr.LOTE_EDADES)), n_filas)
+    lotes = medir('informe por lotes', lambda: list(ugr.parse_edades(io.StringIO(html_doc))),
+                  n_filas)
+    if filas != lotes:
+        sys.exit('Las dos conversiones no obtienen los mismos datos del informe')
+    print('Resultados correctos')
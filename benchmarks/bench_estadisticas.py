@@ -0,0 +1,101 @@
+"""
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+
+
+"""
+Descripción:
+============
+Compara las estadísticas de grados.estadisticas (edad media y mediana, cuota
+de mujeres y de la PAU) con el mismo cálculo titulación a titulación sobre
+los diccionarios de salida de los scripts, con los datos sintéticos de
+bench_cubo.py. También mide una consulta repetida (que se toma de los
+resultados guardados) y comprueba que ambos cálculos coinciden.
+
+Argumentos:
+- years: Argumento opcional. Número de años (por defecto 10).
+- titulaciones: Argumento opcional. Número de titulaciones (por defecto 2000).
+
+Requisitos:
+===========
+- Python 3
+- NumPy
+"""
+
+import math
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+from bench_cubo import medir, sintetico
+from grados.cubo import Cubo, SEXOS
+from grados.estadisticas import ANCHOS, INICIOS, MARCAS, Estadisticas
+from grados.upo import EDADES
+
+
+def estadisticas_titulacion(datos):
+    """
+    (media, mediana, cuota de mujeres, cuota de la PAU) de una titulación.
+    """
+    histograma = [sum(datos[sexo]['edades'][e] for sexo in SEXOS) for e in EDADES]
+    n = sum(histograma)
+    if not n:
+        return (math.nan,) * 4
+    media = sum(h * m for h, m in zip(histograma, MARCAS)) / n
+    acumulado = 0
+    for i, h in enumerate(histograma):
+        if acumulado + h >= n / 2:
+            mediana = INICIOS[i] + ANCHOS[i] * (n / 2 - acumulado) / h
+            break
+        acumulado = acumulado + h
+    total = datos['hombres']['total'] + datos['mujeres']['total']
+    pau = sum(datos[sexo]['via_acceso']['PAU'] for sexo in SEXOS)
+    accesos = sum(sum(datos[sexo]['via_acceso'].values()) for sexo in SEXOS)
+    return media, mediana, datos['mujeres']['total'] / total, pau / accesos
+
+
+def con_diccionarios(por_year):
+    return {(year, titulacion): estadisticas_titulacion(datos)
+            for year, data in por_year.items() for titulacion, datos in data.items()}
+
+
+def con_estadisticas(estadisticas):
+    return (estadisticas.edad_media(), estadisticas.edad_mediana(),
+            estadisticas.cuota_mujeres(), estadisticas.mezcla_acceso()[:, :, 0])
+
+
+if __name__ == '__main__':
+    n_years = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    n_titulaciones = int(sys.argv[2]) if len(sys.argv) > 2 else 2000
+
+    por_year, _ = sintetico(n_years, n_titulaciones)
+    print('Datos sintéticos: %d años, %d titulaciones' % (n_years, n_titulaciones))
+
+    esperado = medir('diccionarios', con_diccionarios, por_year)
+    estadisticas = Estadisticas(medir('carga del cubo', Cubo.desde_json, por_year), 'sintetico')
+    resultado = medir('estadisticas', con_estadisticas, estadisticas)
+    repetido = medir('estadisticas (repetidas)', con_estadisticas, estadisticas)
+    medir('variación de la edad media', estadisticas.variacion, 'edad_media')
+
+    # Comprobaciones
+    # Las consultas repetidas devuelven los mismos arrays, sin recalcularlos
+    assert all(a is b for a, b in zip(resultado[:3], repetido[:3]))
+    cubo = estadisticas.cubo
+    for (year, titulacion), valores in esperado.items():
+        y, t = cubo.indice_year[year], cubo.indice_titulacion[titulacion]
+        assert np.allclose([r[y, t] for r in resultado], valores, equal_nan=True)
+    print('Resultados correctos')
@@ -0,0 +1,125 @@
+"""
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+
+"""
+Descripción:
+============
+Mide con python -X importtime lo que cuesta importar los parsers de los
+informes y los scripts, en el árbol actual y en un commit anterior (por
+defecto el primero del repositorio, antes de que existiera el paquete
+grados). El commit se extrae con git archive en un directorio temporal.
+
+Para cada caso se ejecuta varias veces un intérprete nuevo y se muestra el
+mínimo del tiempo acumulado (en microsegundos) de los módulos que importa la
+sentencia; los que ya importa un intérprete que no hace nada (python -c pass)
+no se cuentan, así que no hace falta restar nada y el resultado nunca es
+negativo. Se usa el mínimo porque el ruido (caché de disco, otros procesos)
+sólo puede sumar tiempo.
+
+Antes del paquete grados, los parsers sólo estaban en los scripts, que se
+ejecutaban al importarlos: en ese árbol se mide lo que importa el script
+hasta que empieza a trabajar (falla enseguida por no tener argumentos).
+
+Argumentos:
+- repeticiones: Argumento opcional. Número de ejecuciones (por defecto 15).
+- commit: Argumento opcional. Commit con el que se compara (por defecto el
+  primero del repositorio).
+"""
+
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+
+
+RAIZ = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+# (caso, sentencia en el árbol actual, sentencia en el commit anterior)
+CASOS = (
+    ('parsers de edades', 'import grados; grados.parse_edades', 'import nuevo_edad'),
+    ('parsers de acceso', 'import grados; grados.parse_acceso', 'import nuevo_acceso'),
+    ('script nuevo_edad.py', 'import nuevo_edad', 'import nuevo_edad'),
+    ('script nuevas_matriculaciones', 'import nuevas_matriculaciones_grado',
+     'import nuevas_matriculaciones_grado'),
+)
+
+
+def _ejecutar(sentencia, directorio):
+    """
+    Módulos de primer nivel que importa sentencia: {módulo: tiempo acumulado}.
+    La sentencia puede terminar con error (los scripts antiguos se ejecutan
+    al importarlos): sólo interesa lo que se ha importado.
+    """
+    codigo = 'try:\n    %s\nexcept BaseException:\n    pass' % sentencia
+    proceso = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', codigo], cwd=directorio,
+        stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, universal_newlines=True)
+    modulos = {}
+    for linea in proceso.stderr.splitlines():
+        if not linea.startswith('import time:') or 'cumulative' in linea:
+            continue
+        _, acumulado, modulo = linea[len('import time:'):].split('|')
+        # Sólo los módulos de primer nivel (los demás ya están incluidos)
+        if not modulo.startswith('  '):
+            modulos[modulo.strip()] = int(acumulado)
+    return modulos
+
+
+def importtime(sentencia, directorio, repeticiones):
+    """
+    Mínimo en repeticiones del tiempo acumulado (us) de los módulos que
+    importa sentencia y que no importa un intérprete vacío.
+    """
+    iniciales = set(_ejecutar('pass', directorio))
+    mejor = None
+    for _ in range(repeticiones):
+        modulos = _ejecutar(sentencia, directorio)
+        tiempo = sum(t for m, t in modulos.items() if m not in iniciales)
+        mejor = tiempo if mejor is None else min(mejor, tiempo)
+    return mejor
+
+
+def extraer(commit, directorio):
+    """
+    Extrae el árbol de commit en directorio.
+    """
+    archivo = subprocess.run(['git', 'archive', commit], cwd=RAIZ,
+                             stdout=subprocess.PIPE, check=True).stdout
+    subprocess.run(['tar', '-x', '-C', directorio], input=archivo, check=True)
+
+
+if __name__ == '__main__':
+    repeticiones = int(sys.argv[1]) if len(sys.argv) > 1 else 15
+    if len(sys.argv) > 2:
+        commit = sys.argv[2]
+    else:
+        commit = subprocess.run(['git', 'rev-list', '--max-parents=0', 'HEAD'], cwd=RAIZ,
+                                stdout=subprocess.PIPE, universal_newlines=True,
+                                check=True).stdout.split()[0]
+    commit = subprocess.run(['git', 'rev-parse', '--short', commit], cwd=RAIZ,
+                            stdout=subprocess.PIPE, universal_newlines=True,
+                            check=True).stdout.strip()
+
+    anterior = tempfile.mkdtemp()
+    try:
+        extraer(commit, anterior)
+        print('%-32s %14s %14s' % ('caso (us)', commit, 'actual'))
+        for caso, ahora, antes in CASOS:
+            print('%-32s %14d %14d' % (caso, importtime(antes, anterior, repeticiones),
+                                       importtime(ahora, RAIZ, repeticiones)))
+    finally:
+        shutil.rmtree(anterior)
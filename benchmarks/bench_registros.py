@@ -0,0 +1,85 @@
+"""
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+
+"""
+Descripción:
+============
+Compara la memoria que ocupan los datos parseados de los dos informes
+(edades y vías de acceso, unidos con merge) guardados en los registros de
+grados.registro y en los diccionarios del formato de salida, como se
+guardaban antes.
+
+Para cada representación se muestra la memoria que queda reservada
+(tracemalloc) y el tamaño con pickle (el de la caché y el de los datos que
+envían los procesos del modo por lotes). Se comprueba además que ambas
+generan el mismo JSON.
+
+Argumentos:
+- titulaciones: Argumento opcional. Número de titulaciones de los informes
+  sintéticos (benchmarks/sintetico.py), con dos filas cada una (por defecto
+  50000).
+"""
+
+import gc
+import hashlib
+import io
+import os
+import pickle
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+from grados import salida, ugr
+from sintetico import informe_acceso, informe_edades, titulaciones
+
+
+def medir(nombre, data):
+    """
+    Muestra la memoria que ocupa data y devuelve el SHA-1 de su JSON. Para
+    no medir el parser (muy lento con tracemalloc), la memoria es la de una
+    copia de data obtenida con pickle, que conserva los objetos compartidos.
+    """
+    copia = pickle.dumps(data, pickle.HIGHEST_PROTOCOL)
+    gc.collect()
+    tracemalloc.start()
+    data = pickle.loads(copia)
+    memoria = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    output = io.StringIO()
+    salida.escribir_json(data.items(), output)
+    print('%-14s %10.1f MiB %10.1f MiB con pickle' % (
+        nombre, memoria / 2**20, len(copia) / 2**20))
+    return hashlib.sha1(output.getvalue().encode('utf-8')).hexdigest()
+
+
+if __name__ == '__main__':
+    n_titulaciones = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+
+    datos = titulaciones(n_titulaciones)
+    edades = io.StringIO()
+    informe_edades(edades, datos)
+    acceso = io.StringIO()
+    informe_acceso(acceso, datos)
+    print('Informes sintéticos: %d titulaciones' % n_titulaciones)
+
+    data = dict(ugr.parse_edades(io.StringIO(edades.getvalue())))
+    ugr.merge(data, ugr.parse_acceso(io.StringIO(acceso.getvalue())))
+
+    resumen = medir('registros', data)
+    diccionarios = {titulacion: datos.a_json() for titulacion, datos in data.items()}
+    if medir('diccionarios', diccionarios) != resumen:
+        sys.exit('Las dos representaciones no generan el mismo JSON')
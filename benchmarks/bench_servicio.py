@@ -0,0 +1,131 @@
+"""
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+
+"""
+Descripción:
+============
+Mide las peticiones por segundo del servidor HTTP de grados/servicio.py. El
+servidor se ejecuta en otro hilo y varios clientes (conexiones keep-alive)
+piden en bucle las rutas de titulaciones, facultades y totales, primero sin
+ETag y después con If-None-Match (respuestas 304).
+
+Argumentos:
+- directorio: Directorio con los ficheros JSON por año.
+- peticiones: Argumento opcional. Número total de peticiones de cada prueba
+  (por defecto 5000).
+- clientes: Argumento opcional. Número de conexiones simultáneas (por
+  defecto 20).
+"""
+
+import asyncio
+import os
+import sys
+import threading
+import time
+from urllib.parse import quote
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+from grados.servicio import Servicio, atender
+
+
+def arrancar(servicio):
+    """
+    Arranca el servidor en otro hilo y devuelve su puerto.
+    """
+    listo = threading.Event()
+    puerto = []
+
+    def hilo():
+        async def principal():
+            servidor = await asyncio.start_server(atender(servicio), '127.0.0.1', 0)
+            puerto.append(servidor.sockets[0].getsockname()[1])
+            listo.set()
+            await servidor.serve_forever()
+        asyncio.run(principal())
+
+    threading.Thread(target=hilo, daemon=True).start()
+    listo.wait()
+    return puerto[0]
+
+
+async def cliente(puerto, rutas, n, etags):
+    """
+    Hace n peticiones por una conexión. Si etags es un diccionario
+    {ruta: etag}, se envía la ETag de las rutas que tenga y se guardan las
+    de las demás.
+    """
+    reader, writer = await asyncio.open_connection('127.0.0.1', puerto)
+    estados = {}
+    for i in range(n):
+        ruta = rutas[i % len(rutas)]
+        peticion = 'GET %s HTTP/1.1\r\nHost: localhost\r\n' % ruta
+        if etags is not None and ruta in etags:
+            peticion = peticion + 'If-None-Match: %s\r\n' % etags[ruta]
+        writer.write((peticion + '\r\n').encode('latin-1'))
+        estado = int((await reader.readline()).split()[1])
+        estados[estado] = estados.get(estado, 0) + 1
+        longitud = 0
+        while True:
+            linea = (await reader.readline()).decode('latin-1')
+            if linea == '\r\n':
+                break
+            nombre, _, valor = linea.partition(':')
+            if nombre.lower() == 'content-length':
+                longitud = int(valor)
+            elif nombre.lower() == 'etag' and etags is not None:
+                etags.setdefault(ruta, valor.strip())
+        if estado != 304:
+            await reader.readexactly(longitud)
+    writer.close()
+    return estados
+
+
+async def prueba(puerto, rutas, peticiones, clientes, etags):
+    inicio = time.perf_counter()
+    resultados = await asyncio.gather(*(
+        cliente(puerto, rutas, peticiones // clientes, etags) for _ in range(clientes)))
+    tiempo = time.perf_counter() - inicio
+    estados = {}
+    for resultado in resultados:
+        for estado, n in resultado.items():
+            estados[estado] = estados.get(estado, 0) + n
+    return sum(estados.values()) / tiempo, estados
+
+
+if __name__ == '__main__':
+    if len(sys.argv) < 2:
+        sys.exit('USO: %s directorio [peticiones] [clientes]' % sys.argv[0])
+    directorio = sys.argv[1]
+    peticiones = int(sys.argv[2]) if len(sys.argv) > 2 else 5000
+    clientes = int(sys.argv[3]) if len(sys.argv) > 3 else 20
+
+    servicio = Servicio(directorio)
+    indice = servicio.indice
+    rutas = ['/years', '/total']
+    rutas.extend('/titulacion/%s' % quote(t) for t in indice.titulaciones[:50])
+    rutas.extend('/facultad/%s' % quote(f) for f in indice.por_facultad)
+    rutas.extend('/total?year=%s' % y for y in indice.por_year)
+    print('%d registros, %d rutas, %d clientes' % (
+        len(indice.registros), len(rutas), clientes))
+
+    puerto = arrancar(servicio)
+    por_segundo, estados = asyncio.run(prueba(puerto, rutas, peticiones, clientes, None))
+    print('%-14s %8.0f peticiones/s  %s' % ('sin ETag', por_segundo, estados))
+
+    etags = {}
+    asyncio.run(prueba(puerto, rutas, len(rutas), 1, etags))
+    por_segundo, estados = asyncio.run(prueba(puerto, rutas, peticiones, clientes, etags))
+    print('%-14s %8.0f peticiones/s  %s' % ('If-None-Match', por_segundo, estados))
@@ -0,0 +1,164 @@
+"""
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+
+
+"""
+Descripción:
+============
+Compara algunas consultas agregadas típicas recorriendo los JSON por año
+(cargándolos cada vez, como al abrirlos desde un notebook, y ya cargados) y en
+SQL sobre la base de datos de grados/basedatos.py, con datos sintéticos de
+varios años. También mide la carga de la base de datos y la sustitución de
+un año, y comprueba que las dos formas dan los mismos resultados.
+
+Consultas:
+- edad: mujeres de 18 años o menos en cada curso.
+- facultad: total de cada facultad en cada curso.
+- acceso: matriculados por PAU en cada curso y sexo.
+
+Argumentos:
+- years: Argumento opcional. Número de años (por defecto 10).
+- titulaciones: Argumento opcional. Número de titulaciones (por defecto 2000).
+"""
+
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+from grados.basedatos import BaseDatos, SEXOS
+from grados.upo import EDADES, VIAS_ACCESO
+
+
+def sintetico(n_years, n_titulaciones, n_facultades=25):
+    """
+    Devuelve {año: data} con datos aleatorios.
+    """
+    random.seed(0)
+    por_year = {}
+    for year in range(2004, 2004 + n_years):
+        data = {}
+        for i in range(n_titulaciones):
+            datos = {'total': 0, 'facultad': 'FACULTAD %d' % (i % n_facultades)}
+            for sexo in SEXOS:
+                edades = {e: random.randint(0, 50) for e in EDADES}
+                total_sexo = sum(edades.values())
+                accesos = {v: 0 for v in VIAS_ACCESO}
+                for _ in range(total_sexo):
+                    accesos[random.choice(VIAS_ACCESO)] += 1
+                datos[sexo] = {'total': total_sexo, 'edades': edades,
+                               'via_acceso': accesos}
+                datos['total'] = datos['total'] + total_sexo
+            data['GRADO EN TITULACIÓN %d' % i] = datos
+        por_year[str(year)] = data
+    return por_year
+
+
+def con_json(por_year):
+    edad = {}
+    facultad = {}
+    acceso = {}
+    for year, data in por_year.items():
+        for titulacion, datos in data.items():
+            edad[year] = edad.get(year, 0) + datos['mujeres']['edades']['18']
+            clave = (year, datos['facultad'])
+            facultad[clave] = facultad.get(clave, 0) + datos['total']
+            for sexo in SEXOS:
+                clave = (year, sexo)
+                acceso[clave] = acceso.get(clave, 0) + datos[sexo]['via_acceso']['PAU']
+    return edad, facultad, acceso
+
+
+def cargar_json(ficheros):
+    por_year = {}
+    for year, filename in ficheros.items():
+        with open(filename) as f:
+            por_year[year] = json.load(f)
+    return por_year
+
+
+def sql_edad(bd):
+    return dict(bd.consulta(
+        'SELECT year, SUM(n) FROM edades WHERE sexo = ? AND edad = ? '
+        'GROUP BY year', ('mujeres', 18)))
+
+
+def sql_facultad(bd):
+    return {(year, nombre): total for year, nombre, total in bd.consulta(
+        'SELECT year, facultades.nombre, SUM(total) FROM cursos '
+        'JOIN facultades ON facultades.id = cursos.facultad '
+        'GROUP BY facultad, year')}
+
+
+def sql_acceso(bd):
+    return {(year, sexo): n for year, sexo, n in bd.consulta(
+        'SELECT year, sexo, SUM(n) FROM accesos WHERE via = ? '
+        'GROUP BY sexo, year', ('PAU',))}
+
+
+def con_sql(bd):
+    return sql_edad(bd), sql_facultad(bd), sql_acceso(bd)
+
+
+def medir(nombre, funcion, *args):
+    inicio = time.perf_counter()
+    resultado = funcion(*args)
+    print('%-36s %10.4f s' % (nombre, time.perf_counter() - inicio))
+    return resultado
+
+
+def cargar_sql(bd, por_year):
+    for year, data in por_year.items():
+        bd.guardar(year, data)
+
+
+if __name__ == '__main__':
+    n_years = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    n_titulaciones = int(sys.argv[2]) if len(sys.argv) > 2 else 2000
+
+    por_year = sintetico(n_years, n_titulaciones)
+    print('Datos sintéticos: %d años, %d titulaciones' % (n_years, n_titulaciones))
+
+    directorio = tempfile.mkdtemp()
+    try:
+        ficheros = {}
+        for year, data in por_year.items():
+            ficheros[year] = os.path.join(directorio, year + '.json')
+            with open(ficheros[year], 'w') as f:
+                json.dump(data, f)
+
+        # Los JSON cargados tienen las claves de las edades como textos
+        cargados = medir('json: carga', cargar_json, ficheros)
+        esperado = medir('json: consultas (ya cargados)', con_json, cargados)
+        medir('json: carga y consultas', lambda: con_json(cargar_json(ficheros)))
+
+        with BaseDatos(os.path.join(directorio, 'grados.sqlite')) as bd:
+            medir('sqlite: carga de todos los años', cargar_sql, bd, por_year)
+            year = max(por_year)
+            medir('sqlite: sustitución de un año', bd.guardar, year, por_year[year])
+            resultado = medir('sqlite: consultas', con_sql, bd)
+            for nombre, consulta in (('edad', sql_edad), ('facultad', sql_facultad),
+                                     ('acceso', sql_acceso)):
+                medir('sqlite: consulta ' + nombre, consulta, bd)
+    finally:
+        shutil.rmtree(directorio)
+
+    assert resultado == esperado
+    print('Resultados correctos')
@@ -0,0 +1,111 @@
+"""
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+
+"""
+Descripción:
+============
+Compara la lectura de filas con BeautifulSoup (árbol completo) y con el
+lector incremental de grados.tabla, con html.parser y con la lectura rápida
+(expresiones regulares), sobre un informe sintético por edades.
+
+Para cada método se muestra el tiempo empleado y el pico de memoria
+(tracemalloc), y se comprueba que ambos obtienen las mismas celdas
+(resumen SHA-1 del texto de todas las filas).
+
+Argumentos:
+- titulaciones: Argumento opcional. Número de titulaciones del informe
+  sintético (benchmarks/sintetico.py), con dos filas cada una (por defecto
+  50000).
+
+Requisitos:
+===========
+- Python 3
+- BeautifulSoup (versión 4), sólo para la comparación
+"""
+
+import hashlib
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+from grados.tabla import filas
+from sintetico import informe_edades, titulaciones
+
+
+def con_beautifulsoup(filename):
+    from bs4 import BeautifulSoup
+    html_doc = open(filename, 'r', encoding='latin-1')
+    soup = BeautifulSoup(html_doc, 'html.parser')
+    resumen = hashlib.sha1()
+    for tr in soup.body.tbody.find_all('tr')[10:]:
+        td_list = [td.get_text() for td in tr.find_all('td')]
+        resumen.update('\t'.join(td_list).encode('utf-8') + b'\n')
+    html_doc.close()
+    return resumen.hexdigest()
+
+
+def con_lector(filename, rapido=False):
+    html_doc = open(filename, 'r', encoding='latin-1')
+    resumen = hashlib.sha1()
+    for td_list in filas(html_doc, cabecera=10, rapido=rapido):
+        resumen.update('\t'.join(td_list).encode('utf-8') + b'\n')
+    html_doc.close()
+    return resumen.hexdigest()
+
+
+def con_lector_rapido(filename):
+    return con_lector(filename, rapido=True)
+
+
+def medir(nombre, funcion, filename):
+    # El tiempo se mide sin tracemalloc, que ralentiza mucho la ejecución
+    inicio = time.perf_counter()
+    resumen = funcion(filename)
+    tiempo = time.perf_counter() - inicio
+    tracemalloc.start()
+    funcion(filename)
+    pico = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    print('%-20s %10.2f s %10.1f MiB  %s' % (
+        nombre, tiempo, pico / 2**20, resumen[:12]))
+    return resumen
+
+
+if __name__ == '__main__':
+    n_titulaciones = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+
+    with tempfile.NamedTemporaryFile('w', encoding='latin-1', suffix='.html',
+                                     delete=False) as output:
+        informe_edades(output, titulaciones(n_titulaciones))
+    print('Informe sintético: %d filas, %.1f MiB' % (
+        2 * n_titulaciones, os.path.getsize(output.name) / 2**20))
+
+    try:
+        resumen = medir('grados.tabla', con_lector, output.name)
+        if medir('grados.tabla rápido', con_lector_rapido, output.name) != resumen:
+            sys.exit('La lectura rápida no obtiene las mismas celdas')
+        try:
+            import bs4
+        except ImportError:
+            print('BeautifulSoup no está instalado, se omite la comparación')
+        else:
+            if medir('BeautifulSoup', con_beautifulsoup, output.name) != resumen:
+                sys.exit('Los dos métodos no obtienen las mismas celdas')
+    finally:
+        os.remove(output.name)
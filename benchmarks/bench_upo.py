@@ -0,0 +1,91 @@
+"""
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+
+"""
+Descripción:
+============
+Compara la agregación del CSV de la UPO en una sola pasada (upo.agregar)
+con la agregación por trozos en paralelo (upo.trozos, upo.agregar_trozo y
+upo.combinar, como en upo2json.py con el argumento procesos) con 1, 2, 4...
+procesos, hasta el número de núcleos.
+
+Se genera un CSV sintético (benchmarks/sintetico.py) y se comprueba que
+todas las formas obtienen los mismos contadores, con las titulaciones en el
+mismo orden.
+
+Argumentos:
+- alumnos: Argumento opcional. Número de filas del CSV (por defecto
+  1000000).
+"""
+
+import csv
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+from grados import upo
+from sintetico import csv_upo
+
+
+def una_pasada(filename):
+    with open(filename, 'r', encoding='utf-8', newline='') as f:
+        return dict(upo.agregar(csv.reader(f)))
+
+
+def en_paralelo(filename, procesos):
+    data = {}
+    with ProcessPoolExecutor(procesos) as executor:
+        futuros = [executor.submit(upo.agregar_trozo, filename, inicio, fin, 'utf-8')
+                   for inicio, fin in upo.trozos(filename, procesos)]
+        for futuro in futuros:
+            upo.combinar(data, futuro.result())
+    return data
+
+
+def medir(nombre, funcion, *args):
+    inicio = time.perf_counter()
+    resultado = funcion(*args)
+    tiempo = time.perf_counter() - inicio
+    print('%-16s %8.2f s' % (nombre, tiempo))
+    return resultado
+
+
+def ordenado(data):
+    return [(curso, list(titulaciones.items())) for curso, titulaciones in data.items()]
+
+
+if __name__ == '__main__':
+    n_alumnos = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+
+    with tempfile.NamedTemporaryFile('w', encoding='utf-8', newline='', suffix='.csv',
+                                     delete=False) as output:
+        csv_upo(output, n_alumnos)
+    print('CSV sintético: %d filas, %.1f MiB, %d núcleos' % (
+        n_alumnos, os.path.getsize(output.name) / 2**20, os.cpu_count()))
+
+    try:
+        referencia = ordenado(medir('una pasada', una_pasada, output.name))
+        procesos = 1
+        while procesos <= max(os.cpu_count(), 1):
+            data = medir('%d procesos' % procesos, en_paralelo, output.name, procesos)
+            if ordenado(data) != referencia:
+                sys.exit('Con %d procesos no se obtienen los mismos datos' % procesos)
+            procesos = procesos * 2
+    finally:
+        os.remove(output.name)
@@ -0,0 +1,271 @@
+"""
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+
+"""
+Descripción:
+============
+Generador de datos sintéticos con la forma de los datos reales, que no están
+en el repositorio:
+
+- Informes de Acceso Identificado por edades y por vías de acceso (HTML en
+  latin-1): filas de cabecera (10 y 11, con colspan, rowspan y entidades),
+  una pareja de filas hombres/mujeres por titulación, la celda de la facultad
+  vacía cuando se repite, nombres con tildes, miles con punto, porcentajes
+  con coma y, en el informe por vías de acceso, celdas vacías unidas con
+  colspan. Los dos informes tienen los mismos totales, así que se pueden unir.
+- CSV por alumno de la UPO (curso, titulacion, ingreso, edad, sexo y otros
+  campos), ordenado por curso.
+
+Los datos dependen sólo de la semilla, así que dos ejecuciones generan los
+mismos ficheros.
+
+Ejemplo (genera edades.html, acceso.html y upo.csv en el directorio):
+
+    python benchmarks/sintetico.py /tmp/sintetico 2000 500000
+
+Argumentos:
+- directorio: Directorio de salida.
+- titulaciones: Argumento opcional. Número de titulaciones de los informes
+  (por defecto 300).
+- alumnos: Argumento opcional. Número de filas del CSV (por defecto 100000).
+"""
+
+import csv
+import os
+import random
+import sys
+
+
+FACULTADES = (
+    'FACULTAD DE CIENCIAS',
+    'FACULTAD DE FILOSOFÍA Y LETRAS',
+    'E.T.S. DE INGENIERÍAS INFORMÁTICA Y DE TELECOMUNICACIÓN',
+    'FACULTAD DE CIENCIAS DE LA EDUCACIÓN',
+    'FACULTAD DE TRADUCCIÓN E INTERPRETACIÓN',
+    'FACULTAD DE CIENCIAS ECONÓMICAS Y EMPRESARIALES',
+    'FACULTAD DE PSICOLOGÍA',
+    'E.T.S. DE ARQUITECTURA',
+)
+
+TITULACIONES = (
+    'GRADO EN BIOLOGÍA',
+    'GRADO EN FILOLOGÍA HISPÁNICA',
+    'GRADO EN INGENIERÍA INFORMÁTICA',
+    'GRADO EN EDUCACIÓN PRIMARIA',
+    'GRADO EN TRADUCCIÓN E INTERPRETACIÓN',
+    'GRADO EN ADMINISTRACIÓN Y DIRECCIÓN DE EMPRESAS',
+    'GRADO EN PSICOLOGÍA',
+    'GRADO EN ESTUDIOS DE ARQUITECTURA',
+    'LICENCIADO EN QUÍMICA',
+    'DIPLOMADO EN CIENCIAS EMPRESARIALES',
+    'MAESTRO-ESPECIALIDAD DE EDUCACIÓN FÍSICA',
+    'INGENIERO TÉCNICO EN INFORMÁTICA DE SISTEMAS',
+)
+
+# Peso relativo de cada grupo de edad (18 o menos, 19, ..., 29, 30-34,
+# 35-39, 40 o más) y de cada vía de acceso
+PESOS_EDADES = (40, 25, 10, 6, 4, 3, 2, 2, 1, 1, 1, 1, 2, 1, 1)
+PESOS_ACCESO = (70, 0, 10, 6, 3, 2)
+
+VIAS_ACCESO = ('PAU', 'Credencial', 'Formación Profesional', 'Titulados',
+               'Mayores de 25 años', 'Otros')
+
+INGRESOS = (
+    ('SELECTIVIDAD LOGSE', 60), ('PAU', 15), ('CREDENCIAL UNED', 1),
+    ('FORMACIÓN PROFESIONAL', 10), ('TITULADOS UNIVERSITARIOS', 6),
+    ('MAYORES DE 25 AÑOS', 3), ('TRASLADO DE EXPEDIENTE', 5),
+)
+
+
+def miles(n):
+    """
+    Número con los miles separados por puntos, como en los informes.
+    """
+    return '{:,}'.format(n).replace(',', '.')
+
+
+def repartir(aleatorio, total, pesos):
+    """
+    Reparte total en len(pesos) grupos al azar, según los pesos.
+    """
+    grupos = [0] * len(pesos)
+    for i in aleatorio.choices(range(len(pesos)), weights=pesos, k=total):
+        grupos[i] = grupos[i] + 1
+    return grupos
+
+
+def titulaciones(n, semilla=1):
+    """
+    Devuelve una lista de (facultad, titulacion, sexos) ordenada por
+    facultad, con sexos = [(edades, accesos) de hombres, de mujeres].
+    """
+    aleatorio = random.Random(semilla)
+    lista = []
+    for i in range(n):
+        titulacion = TITULACIONES[i % len(TITULACIONES)]
+        if i >= len(TITULACIONES):
+            titulacion = '%s %d' % (titulacion, i // len(TITULACIONES))
+        facultad = FACULTADES[i % len(FACULTADES)]
+        if i >= len(FACULTADES) * 4:
+            facultad = '%s %d' % (facultad, i // (len(FACULTADES) * 4))
+        sexos = []
+        for _ in range(2):
+            total = int(aleatorio.paretovariate(1.5) * 20)
+            sexos.append((repartir(aleatorio, total, PESOS_EDADES),
+                          repartir(aleatorio, total, PESOS_ACCESO)))
+        lista.append((facultad, titulacion, sexos))
+    lista.sort(key=lambda t: t[0])
+    return lista
+
+
+def _principio(output, titulo):
+    output.write('<!DOCTYPE HTML PUBLIC "-//W3C//DTD HTML 4.01 Transitional//EN">\n')
+    output.write('<html><head><meta http-equiv="Content-Type" '
+                 'content="text/html; charset=ISO-8859-1">\n')
+    output.write('<title>Acceso Identificado &ndash; %s</title></head>\n' % titulo)
+    output.write('<body>\n<table border="1" cellspacing="0"><tbody>\n')
+
+
+def _filas(output, datos, celdas_sexo, salto=''):
+    """
+    Escribe las parejas de filas de datos. celdas_sexo(edades, accesos)
+    devuelve el HTML de las celdas propias de cada informe y salto va antes
+    del nombre de la titulación (en el informe por edades es '\\n ').
+    """
+    anterior = None
+    totales_facultad = {}
+    for facultad, _, sexos in datos:
+        totales_facultad[facultad] = totales_facultad.get(facultad, 0) + \
+            sum(sum(edades) for edades, _ in sexos)
+
+    for facultad, titulacion, sexos in datos:
+        total = sum(sum(edades) for edades, _ in sexos)
+        for s, (edades, accesos) in enumerate(sexos):
+            if s == 0 and facultad != anterior:
+                cabeza = '<td>%s</td><td>%s</td>' % (
+                    facultad, miles(totales_facultad[facultad]))
+            else:
+                cabeza = '<td></td><td></td>'
+            porcentaje = '%.2f' % (100.0 * sum(edades) / total) if total else '0.00'
+            output.write(
+                '<tr>%s<td>%s%s</td><td>%s</td><td>%s</td>%s<td>%s</td><td>%s</td></tr>\n'
+                % (cabeza, salto, titulacion, miles(total), ('Hombre', 'Mujer')[s],
+                   celdas_sexo(edades, accesos), miles(sum(edades)),
+                   porcentaje.replace('.', ',')))
+        anterior = facultad
+    output.write('</tbody></table>\n</body></html>\n')
+
+
+def informe_edades(output, datos):
+    """
+    Escribe en output el informe por edades de los datos de titulaciones().
+    """
+    _principio(output, 'Nuevo ingreso por edades')
+    for i in range(9):
+        output.write('<tr><td colspan="22">Universidad de Granada &amp; '
+                     'Acceso Identificado (%d)</td></tr>\n' % i)
+    output.write('<tr><td>Centro</td><td>Total</td><td>Titulación</td>'
+                 '<td>Total</td><td>Sexo</td>%s<td>Total</td><td>%%</td></tr>\n'
+                 % ''.join('<td>%s</td>' % e for e in (
+                     '&lt;=18', 19, 20, 21, 22, 23, 24, 25, 26, 27, 28, 29,
+                     '30-34', '35-39', '&gt;=40')))
+
+    def celdas(edades, accesos):
+        return ''.join('<td>%s</td>' % miles(n) for n in edades)
+    _filas(output, datos, celdas, salto='\n ')
+
+
+def informe_acceso(output, datos, orden=range(6)):
+    """
+    Escribe en output el informe por vías de acceso de los datos de
+    titulaciones(), con las vías en el orden indicado. Las vías sin
+    matriculaciones se dejan vacías y, si hay dos seguidas, se unen con
+    colspan.
+    """
+    _principio(output, 'Nuevo ingreso por vías de acceso')
+    for i in range(9):
+        output.write('<tr><td colspan="13">Universidad de Granada &amp; '
+                     'Acceso Identificado (%d)</td></tr>\n' % i)
+    output.write('<tr><td rowspan="2">Centro</td><td rowspan="2">Total</td>'
+                 '<td rowspan="2">Titulación</td><td rowspan="2">Total</td>'
+                 '<td rowspan="2">Sexo</td><td colspan="6">Vía de acceso</td>'
+                 '<td rowspan="2">Total</td><td rowspan="2">%</td></tr>\n')
+    output.write('<tr>%s</tr>\n' % ''.join(
+        '<td>%s</td>' % VIAS_ACCESO[v] for v in orden))
+
+    def celdas(edades, accesos):
+        html = []
+        j = 0
+        while j < 6:
+            actual = accesos[orden[j]]
+            if not actual and j < 5 and not accesos[orden[j + 1]]:
+                html.append('<td colspan="2"></td>')
+                j = j + 2
+            else:
+                html.append('<td>%s</td>' % (miles(actual) if actual else ''))
+                j = j + 1
+        return ''.join(html)
+    _filas(output, datos, celdas)
+
+
+def csv_upo(output, n_alumnos, years=range(2008, 2014), n_titulaciones=60, semilla=1):
+    """
+    Escribe en output (abierto con newline='') un CSV por alumno de la UPO
+    con n_alumnos filas repartidas entre los cursos indicados.
+    """
+    aleatorio = random.Random(semilla)
+    nombres = [t[1] for t in titulaciones(n_titulaciones, semilla)]
+    ingresos, pesos = zip(*INGRESOS)
+    writer = csv.writer(output)
+    writer.writerow(('curso', 'titulacion', 'ingreso', 'edad', 'sexo', 'nacionalidad',
+                     'pais', 'comunidad', 'provincia', 'localidad', 'beca'))
+    years = list(years)
+    for i in range(n_alumnos):
+        year = years[i * len(years) // n_alumnos]
+        edad = 17 + min(int(aleatorio.expovariate(0.35)), 45)
+        writer.writerow((
+            year, aleatorio.choice(nombres),
+            aleatorio.choices(ingresos, weights=pesos)[0], edad,
+            aleatorio.choice('HM'), 'ES', 'ESPAÑA', 'AND', 'SE', 'Sevilla',
+            aleatorio.choice('SN')))
+
+
+def generar(directorio, n_titulaciones=300, n_alumnos=100000, semilla=1):
+    """
+    Genera edades.html, acceso.html y upo.csv en directorio y devuelve sus
+    rutas.
+    """
+    os.makedirs(directorio, exist_ok=True)
+    datos = titulaciones(n_titulaciones, semilla)
+    rutas = {}
+    for nombre, funcion in (('edades.html', informe_edades),
+                            ('acceso.html', informe_acceso)):
+        rutas[nombre] = os.path.join(directorio, nombre)
+        with open(rutas[nombre], 'w', encoding='latin-1') as output:
+            funcion(output, datos)
+    rutas['upo.csv'] = os.path.join(directorio, 'upo.csv')
+    with open(rutas['upo.csv'], 'w', encoding='utf-8', newline='') as output:
+        csv_upo(output, n_alumnos, semilla=semilla)
+    return rutas
+
+
+if __name__ == '__main__':
+    if len(sys.argv) < 2:
+        sys.exit('USO: %s directorio [titulaciones] [alumnos]' % sys.argv[0])
+    n_titulaciones = int(sys.argv[2]) if len(sys.argv) > 2 else 300
+    n_alumnos = int(sys.argv[3]) if len(sys.argv) > 3 else 100000
+    for nombre, ruta in sorted(generar(sys.argv[1], n_titulaciones, n_alumnos).items()):
+        print('%-12s %10d bytes' % (nombre, os.path.getsize(ruta)))
@@ -0,0 +1,310 @@
+"""
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+
+"""
+Descripción:
+============
+Mide el rendimiento de todos los parsers sobre datos sintéticos
+(benchmarks/sintetico.py) y guarda el resultado en JSON, para poder seguir
+su evolución entre commits.
+
+Cada prueba se ejecuta en un proceso nuevo, de modo que el pico de memoria
+(RSS máximo del proceso) corresponde sólo a esa prueba:
+
+- ugr: lectura de las filas del HTML, parse_edades, parse_acceso, merge y
+  escritura del JSON de nuevas_matriculaciones_grado.py, y las mismas etapas
+  juntas con los dos informes leídos a la vez (ugr.fusionar).
+- upo: lectura del CSV, agregación (upo.agregar) y escritura de los JSON
+  de upo2json.py.
+
+Para cada etapa se guardan los segundos, las filas procesadas y las filas
+por segundo (el mejor de varios intentos). El resultado incluye el commit
+actual, la versión de Python y el tamaño de los datos:
+
+    {"commit": "e69501a", "python": "3.12.1", "escala": {...},
+     "pruebas": {"ugr": {"rss_max_kib": 23456, "etapas": {
+         "parse_edades": {"segundos": 0.41, "filas": 40000,
+                          "filas_por_segundo": 97561}, ...}}, ...}}
+
+Ejemplo: guardar el resultado del commit actual y compararlo con otro (se
+indica cada etapa que haya empeorado más de la tolerancia y se termina con
+error):
+
+    python benchmarks/suite.py --salida resultados/$(git rev-parse --short HEAD).json \\
+        --comparar resultados/e69501a.json
+
+Argumentos:
+- --titulaciones: Número de titulaciones de los informes (por defecto 2000).
+- --alumnos: Número de filas del CSV de la UPO (por defecto 200000).
+- --repeticiones: Número de ejecuciones de cada prueba (por defecto 3).
+- --datos: Directorio donde se generan (o reutilizan) los datos sintéticos.
+  Por defecto se usa un directorio temporal.
+- --salida: Fichero JSON del resultado (por defecto, la salida estándar).
+- --comparar: Resultado anterior con el que se compara.
+- --tolerancia: Pérdida de filas por segundo admitida (por defecto 0.2).
+"""
+
+import argparse
+import csv
+import datetime
+import json
+import os
+import platform
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+RAIZ = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, RAIZ)
+
+
+def etapa(etapas, nombre, funcion, *args):
+    """
+    Ejecuta funcion(*args), que devuelve (resultado, filas), y guarda en
+    etapas su tiempo y sus filas por segundo.
+    """
+    inicio = time.perf_counter()
+    resultado, filas = funcion(*args)
+    segundos = time.perf_counter() - inicio
+    etapas[nombre] = {
+        'segundos': round(segundos, 4),
+        'filas': filas,
+        'filas_por_segundo': round(filas / segundos) if segundos else None,
+    }
+    return resultado
+
+
+def prueba_ugr(directorio):
+    from grados import salida, ugr
+    from grados.tabla import filas
+
+    edades = os.path.join(directorio, 'edades.html')
+    acceso = os.path.join(directorio, 'acceso.html')
+
+    def leer_filas(filename):
+        with open(filename, 'r', encoding='latin-1') as f:
+            return None, sum(1 for _ in filas(f))
+
+    def parse(filename, parser):
+        with open(filename, 'r', encoding='latin-1') as f:
+            data = dict(parser(f))
+        return data, 2 * len(data)
+
+    def merge(data, parcial):
+        return ugr.merge(data, parcial), len(parcial)
+
+    def escribir(data):
+        with open(os.devnull, 'w') as output:
+            salida.escribir_json(data.items(), output)
+        return None, len(data)
+
+    def fusionado():
+        with open(edades, 'r', encoding='latin-1') as f_edades, \
+                open(acceso, 'r', encoding='latin-1') as f_acceso, \
+                open(os.devnull, 'w') as output:
+            contador = []
+            def entradas():
+                for entrada in ugr.fusionar(ugr.parse_edades(f_edades),
+                                            ugr.parse_acceso(f_acceso)):
+                    contador.append(None)
+                    yield entrada
+            salida.escribir_json(entradas(), output)
+        return None, 2 * len(contador)
+
+    etapas = {}
+    etapa(etapas, 'filas_html', leer_filas, edades)
+    data = etapa(etapas, 'parse_edades', parse, edades, ugr.parse_edades)
+    parcial = etapa(etapas, 'parse_acceso', parse, acceso, ugr.parse_acceso)
+    data = etapa(etapas, 'merge', merge, data, parcial)
+    etapa(etapas, 'json', escribir, data)
+    etapa(etapas, 'fusionado', fusionado)
+    return etapas
+
+
+def prueba_upo(directorio):
+    from grados import upo
+
+    filename = os.path.join(directorio, 'upo.csv')
+
+    def leer_csv():
+        with open(filename, 'r', newline='') as f:
+            return None, sum(1 for _ in csv.reader(f))
+
+    def agregar():
+        with open(filename, 'r', newline='') as f:
+            contador = []
+            def filas():
+                for row in csv.reader(f):
+                    contador.append(None)
+                    yield row
+            por_year = dict(upo.agregar(filas()))
+        return por_year, len(contador)
+
+    def escribir(por_year):
+        with open(os.devnull, 'w') as output:
+            for year, titulaciones in por_year.items():
+                json.dump(upo.year_data(titulaciones), output)
+        return None, sum(len(t) for t in por_year.values())
+
+    etapas = {}
+    etapa(etapas, 'csv', leer_csv)
+    por_year = etapa(etapas, 'agregar', agregar)
+    etapa(etapas, 'json', escribir, por_year)
+    return etapas
+
+
+PRUEBAS = {
+    'ugr': prueba_ugr,
+    'upo': prueba_upo,
+}
+
+
+def rss_max_kib():
+    """
+    Pico de memoria residente de este proceso en KiB.
+    """
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # En macOS ru_maxrss está en bytes
+    return rss // 1024 if sys.platform == 'darwin' else rss
+
+
+def ejecutar(prueba, directorio, repeticiones):
+    """
+    Ejecuta una prueba varias veces, cada una en un proceso nuevo, y
+    devuelve el mejor tiempo de cada etapa y el mayor pico de memoria.
+    """
+    mejor = None
+    for _ in range(repeticiones):
+        proceso = subprocess.run(
+            [sys.executable, __file__, '--prueba', prueba, directorio],
+            stdout=subprocess.PIPE, universal_newlines=True, check=True)
+        resultado = json.loads(proceso.stdout)
+        if mejor is None:
+            mejor = resultado
+            continue
+        mejor['rss_max_kib'] = max(mejor['rss_max_kib'], resultado['rss_max_kib'])
+        for nombre, datos in resultado['etapas'].items():
+            if datos['segundos'] < mejor['etapas'][nombre]['segundos']:
+                mejor['etapas'][nombre] = datos
+    return mejor
+
+
+def git(*args):
+    try:
+        return subprocess.run(['git'] + list(args), cwd=RAIZ, stdout=subprocess.PIPE,
+                              stderr=subprocess.DEVNULL, universal_newlines=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def comparar(resultado, anterior, tolerancia):
+    """
+    Muestra la variación de las filas por segundo de cada etapa respecto a
+    un resultado anterior. Devuelve las etapas que han empeorado más de la
+    tolerancia.
+    """
+    peores = []
+    print('comparación con %s' % anterior.get('commit'), file=sys.stderr)
+    for prueba, datos in sorted(resultado['pruebas'].items()):
+        for nombre, actual in sorted(datos['etapas'].items()):
+            try:
+                antes = anterior['pruebas'][prueba]['etapas'][nombre]['filas_por_segundo']
+            except KeyError:
+                continue
+            if not antes or not actual['filas_por_segundo']:
+                continue
+            razon = actual['filas_por_segundo'] / antes
+            marca = ''
+            if razon < 1 - tolerancia:
+                marca = '  <-- empeora'
+                peores.append('%s.%s' % (prueba, nombre))
+            print('  %-20s %10d -> %10d filas/s (%+.1f%%)%s' % (
+                '%s.%s' % (prueba, nombre), antes, actual['filas_por_segundo'],
+                100 * (razon - 1), marca), file=sys.stderr)
+    return peores
+
+
+if __name__ == '__main__':
+    if len(sys.argv) == 4 and sys.argv[1] == '--prueba':
+        # Proceso hijo: una sola prueba
+        etapas = PRUEBAS[sys.argv[2]](sys.argv[3])
+        print(json.dumps({'rss_max_kib': rss_max_kib(), 'etapas': etapas}))
+        sys.exit()
+
+    parser = argparse.ArgumentParser(description='Pruebas de rendimiento de los parsers')
+    parser.add_argument('--titulaciones', type=int, default=2000)
+    parser.add_argument('--alumnos', type=int, default=200000)
+    parser.add_argument('--repeticiones', type=int, default=3)
+    parser.add_argument('--datos')
+    parser.add_argument('--salida')
+    parser.add_argument('--comparar')
+    parser.add_argument('--tolerancia', type=float, default=0.2)
+    args = parser.parse_args()
+
+    from sintetico import generar
+
+    directorio = args.datos or tempfile.mkdtemp(prefix='grados-')
+    try:
+        escala = {'titulaciones': args.titulaciones, 'alumnos': args.alumnos}
+        fichero_escala = os.path.join(directorio, 'escala.json')
+        try:
+            with open(fichero_escala) as f:
+                generados = json.load(f) == escala
+        except (OSError, ValueError):
+            generados = False
+        if not generados:
+            generar(directorio, args.titulaciones, args.alumnos)
+            with open(fichero_escala, 'w') as f:
+                json.dump(escala, f)
+
+        resultado = {
+            'commit': git('rev-parse', '--short', 'HEAD'),
+            'cambios_locales': bool(git('status', '--porcelain', '--untracked-files=no')),
+            'fecha': datetime.datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'plataforma': platform.platform(),
+            'escala': escala,
+            'entradas': {nombre: os.path.getsize(os.path.join(directorio, nombre))
+                         for nombre in ('edades.html', 'acceso.html', 'upo.csv')},
+            'pruebas': {},
+        }
+        for prueba in sorted(PRUEBAS):
+            resultado['pruebas'][prueba] = ejecutar(prueba, directorio, args.repeticiones)
+            print('%s: %s' % (prueba, ', '.join(
+                '%s %d filas/s' % (nombre, datos['filas_por_segundo'] or 0)
+                for nombre, datos in resultado['pruebas'][prueba]['etapas'].items())),
+                file=sys.stderr)
+    finally:
+        if not args.datos:
+            shutil.rmtree(directorio)
+
+    texto = json.dumps(resultado, indent=2, sort_keys=True)
+    if args.salida:
+        os.makedirs(os.path.dirname(os.path.abspath(args.salida)), exist_ok=True)
+        with open(args.salida, 'w') as f:
+            f.write(texto + '\n')
+    else:
+        print(texto)
+
+    if args.comparar:
+        with open(args.comparar) as f:
+            peores = comparar(resultado, json.load(f), args.tolerancia)
+        if peores:
+            sys.exit('Empeoran: %s' % ', '.join(peores))
@@ -0,0 +1,91 @@
+"""
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+
+"""
+Descripción:
+============
+Búsquedas sobre los ficheros JSON por año generados con
+nuevas_matriculaciones_grado.py --batch. La primera consulta construye un
+índice (grados/consulta.py) que se guarda en el mismo directorio y se reutiliza
+mientras los JSON no cambien.
+
+Muestra una línea por (año, titulación) con el número de matriculaciones
+seleccionado y, al final, la suma. El tiempo de la búsqueda se muestra por la
+salida de error.
+
+Ejemplo: mujeres de 18 años en los grados de Ciencias de 2010 a 2013
+
+    python consulta.py datos --titulacion 'GRADO EN *' --facultad ciencias \
+        --years 2010-2013 --sexo mujeres --edad 18
+
+Argumentos:
+- directorio: Directorio con los ficheros JSON (AÑO.json).
+- --titulacion: Nombre o patrón (glob) de la titulación. No se distinguen
+  mayúsculas ni tildes.
+- --facultad: Texto (o patrón glob) contenido en el nombre de la facultad.
+- --years: Año o intervalo de años (p. ej. 2012 o 2010-2013).
+- --tipo: grado, licenciatura, diplomatura, ingenieria, arquitectura,
+  maestro, master u otro.
+- --sexo: hombres o mujeres.
+- --edad: Grupo de edad (18 a 29, 30, 35 o 40).
+- --acceso: Vía de acceso (PAU, Credencial, F.P., Titulados, Mayores 25, Otros).
+- --profile: Argumento opcional (también --profile=FICHERO.pstats). Muestra al
+  terminar el tiempo y la memoria de cada etapa (ver grados/perfil.py).
+"""
+
+import argparse
+import sys
+import time
+from grados import perfil
+from grados.consulta import Indice
+
+
+def intervalo(texto):
+    inicio, _, fin = texto.partition('-')
+    return range(int(inicio), int(fin or inicio) + 1)
+
+
+if __name__ == '__main__':
+    perfil.desde_argv(sys.argv)
+
+    parser = argparse.ArgumentParser(description='Búsquedas en los datos de grados')
+    parser.add_argument('directorio')
+    parser.add_argument('--titulacion')
+    parser.add_argument('--facultad')
+    parser.add_argument('--years', type=intervalo)
+    parser.add_argument('--tipo')
+    parser.add_argument('--sexo', choices=('hombres', 'mujeres'))
+    parser.add_argument('--edad', type=int)
+    parser.add_argument('--acceso')
+    args = parser.parse_args()
+
+    with perfil.etapa('indice'):
+        indice = Indice.cargar(args.directorio)
+
+    inicio = time.perf_counter()
+    with perfil.etapa('consulta'):
+        resultados = list(indice.consultar(
+            titulacion=args.titulacion, facultad=args.facultad, years=args.years,
+            tipo=args.tipo, sexo=args.sexo, edad=args.edad, acceso=args.acceso))
+    segundos = time.perf_counter() - inicio
+    perfil.contar('consulta', len(resultados))
+
+    suma = 0
+    for year, titulacion, valor in resultados:
+        print('%s\t%s\t%s' % (year, titulacion, '' if valor is None else valor))
+        suma = suma + (valor or 0)
+    print('TOTAL\t\t%d' % suma)
+    print('%d resultados en %.3f ms' % (len(resultados), 1000 * segundos), file=sys.stderr)
@@ -0,0 +1,70 @@
+"""
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+
+
+"""
+Descripción:
+============
+Guarda en una base de datos SQLite (grados/basedatos.py) los ficheros JSON por
+año que generan los scripts (nuevas_matriculaciones_grado.py --batch o
+upo2json.py), para consultarlos en SQL.
+
+El año se toma del nombre de cada fichero (el primer número de cuatro cifras;
+los ficheros cuyo nombre no lo tiene se rechazan). Cada año se guarda en una sola
+transacción y, si ya estaba en la base de datos, se reemplaza sin tocar los
+demás:
+
+    python exportar_sqlite.py grados.sqlite datos/2012.json datos/2013.json
+    sqlite3 grados.sqlite "SELECT year, SUM(n) FROM edades
+                           WHERE sexo = 'mujeres' AND edad = 18 GROUP BY year"
+
+Argumentos:
+- base: Fichero de la base de datos (se crea si no existe).
+- ficheros: Ficheros JSON que se guardan. Pueden estar comprimidos con gzip
+  (.gz) o zstd (.zst).
+- --profile: Argumento opcional (también --profile=FICHERO.pstats). Muestra al
+  terminar el tiempo y la memoria de cada etapa (ver grados/perfil.py).
+"""
+
+import argparse
+import json
+import sys
+from grados import comprimido, perfil
+from grados.basedatos import BaseDatos
+from grados.consulta import por_year
+
+
+if __name__ == '__main__':
+    perfil.desde_argv(sys.argv)
+
+    parser = argparse.ArgumentParser(description='Exporta los JSON por año a SQLite')
+    parser.add_argument('base')
+    parser.add_argument('ficheros', nargs='+')
+    args = parser.parse_args()
+
+    try:
+        ficheros = por_year(args.ficheros)
+    except ValueError as e:
+        parser.error(str(e))
+
+    with BaseDatos(args.base) as bd:
+        for year, filename in ficheros:
+            with perfil.etapa('json'), comprimido.abrir(filename) as f:
+                data = json.load(f)
+            with perfil.etapa('sqlite'):
+                n = bd.guardar(year, data)
+            perfil.contar('sqlite', n)
+            print('%s: %d titulaciones' % (year, n), file=sys.stderr)
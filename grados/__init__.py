@@ -0,0 +1,35 @@
+"""
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+--------------------------------------------------------------------------------
+
+Código compartido por los scripts que extraen los datos de grados.
+"""
+
+"""
+Los parsers se exponen en el paquete, pero los módulos sólo se importan la
+primera vez que se usan, para que importar grados sea inmediato:
+
+    import grados
+    data = dict(grados.parse_edades(open(filename, 'r', encoding='latin-1')))
+"""
+
+__all__ = ['parse_edades', 'parse_acceso', 'merge', 'fusionar']
+
+
+def __getattr__(nombre):
+    if nombre in __all__:
+        from grados import ugr
+        return getattr(ugr, nombre)
+    raise AttributeError("module 'grados' has no attribute %r" % nombre)
@@ -0,0 +1,193 @@
+"""
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+
+"""
+Descripción:
+============
+Totales agregados por facultad y de toda la universidad, calculados a medida
+que las titulaciones pasan del parser a la salida (titulación -> facultad ->
+universidad). Cada nivel es un grados.registro.Titulacion con la suma de los
+totales y de los contadores (edades y vías de acceso) por sexo, así que
+consultar el total de una facultad o de la universidad no recorre las
+titulaciones.
+
+Los informes de la UGR dan también el total de cada facultad (columna 1 de
+su primera fila); comprobar() lo compara con la suma de sus titulaciones y
+anota las diferencias en el validador (regla 'facultad', ver
+grados/validacion.py).
+
+El formato de la salida (opción --agregados de los scripts) es:
+
+{
+    'universidad': {'total': 5430, 'titulaciones': 71, 'hombres': {...},
+                    'mujeres': {...}},
+    'facultades': {
+        'FACULTAD': {
+            'total': 230, # Suma de las titulaciones de FACULTAD
+            'total_informe': 230, # Total de FACULTAD según el informe
+            'titulaciones': 3, # Número de titulaciones de FACULTAD
+            'hombres': {'total': 88, 'edades': {...}, 'via_acceso': {...}},
+            'mujeres': {...},
+        },
+        ...
+    }
+}
+
+Ejemplo de uso:
+
+    acumulado = agregados.desde_argv(sys.argv)
+    salida.escribir_json(acumulado.acumular(ugr.parse_edades(html_doc)), output)
+    acumulado.comprobar(validador)
+    acumulado.facultad('FACULTAD DE CIENCIAS').mujeres.contador('edades', 18)
+"""
+
+import json
+from operator import add
+
+from grados import comprimido
+from grados.registro import Sexo, Titulacion
+
+
+def desde_argv(argv):
+    """
+    Quita de argv la opción --agregados=RUTA y devuelve un Agregados con esa
+    ruta (None si no estaba).
+    """
+    for i, argumento in enumerate(argv[1:], 1):
+        if argumento.startswith('--agregados='):
+            del argv[i]
+            return Agregados(argumento.partition('=')[2])
+    return Agregados()
+
+
+def _nivel(facultad=None):
+    return Titulacion(0, facultad, Sexo(0), Sexo(0))
+
+
+def _sumar_sexo(suma, sexo):
+    if sexo is None:
+        return
+    if sexo.total is not None:
+        suma.total += sexo.total
+    for campo in sexo.campos():
+        valores = getattr(sexo, campo)
+        if valores is None:
+            continue
+        anteriores = getattr(suma, campo, None)
+        if anteriores is None:
+            setattr(suma, campo, tuple(valores))
+        else:
+            setattr(suma, campo, tuple(map(add, anteriores, valores)))
+
+
+def _sumar(suma, datos):
+    if datos.total is not None:
+        suma.total += datos.total
+    _sumar_sexo(suma.hombres, datos.hombres)
+    _sumar_sexo(suma.mujeres, datos.mujeres)
+
+
+class Agregados(object):
+    """
+    Totales por facultad y de la universidad de las titulaciones que se le
+    pasan.
+    - ruta - Fichero (o directorio, en el modo por lotes) donde se escriben,
+      o None
+    - universidad - Suma de todas las titulaciones (un Titulacion)
+    - facultades - {facultad: Titulacion con la suma de sus titulaciones}
+    - totales_informe - {facultad: total de la facultad según el informe}
+    - titulaciones - {facultad: número de titulaciones}
+    """
+
+    def __init__(self, ruta=None):
+        self.ruta = ruta
+        self.universidad = _nivel()
+        self.facultades = {}
+        self.totales_informe = {}
+        self.titulaciones = {}
+
+    def sumar(self, titulacion, datos):
+        """
+        Suma los datos (grados.registro.Titulacion) de una titulación a su
+        facultad y a la universidad.
+        """
+        if titulacion is None or not isinstance(datos, Titulacion):
+            # Filas sin titulación o datos sin registro (p. ej. de un JSON)
+            return
+        facultad = datos.facultad
+        try:
+            suma = self.facultades[facultad]
+        except KeyError:
+            suma = self.facultades[facultad] = _nivel(facultad)
+            self.titulaciones[facultad] = 0
+        _sumar(suma, datos)
+        _sumar(self.universidad, datos)
+        self.titulaciones[facultad] += 1
+        if datos.total_facultad is not None:
+            self.totales_informe.setdefault(facultad, datos.total_facultad)
+
+    def acumular(self, entradas):
+        """
+        Devuelve las entradas (pares (titulacion, datos)) y suma cada una
+        cuando pasa.
+        """
+        for titulacion, datos in entradas:
+            self.sumar(titulacion, datos)
+            yield titulacion, datos
+
+    def facultad(self, nombre):
+        """
+        Totales de una facultad (un Titulacion).
+        """
+        return self.facultades[nombre]
+
+    def comprobar(self, validador):
+        """
+        Anota en validador (grados.validacion.Validador) las facultades cuyo
+        total según el informe no es la suma de sus titulaciones.
+        """
+        if not validador.activo:
+            return
+        for facultad, total in self.totales_informe.items():
+            suma = self.facultades[facultad].total
+            if total != suma:
+                validador.anotar(facultad, None, 'facultad', None, total, suma)
+
+    def a_json(self):
+        """
+        Diccionario del formato de salida de --agregados.
+        """
+        universidad = self.universidad.a_json()
+        del universidad['facultad']
+        universidad['titulaciones'] = sum(self.titulaciones.values())
+        facultades = {}
+        for facultad, suma in self.facultades.items():
+            facultades[facultad] = {
+                'total': suma.total,
+                'total_informe': self.totales_informe.get(facultad),
+                'titulaciones': self.titulaciones[facultad],
+                'hombres': suma.hombres.a_json(),
+                'mujeres': suma.mujeres.a_json(),
+            }
+        return {'universidad': universidad, 'facultades': facultades}
+
+    def escribir(self, filename=None):
+        """
+        Escribe los totales en JSON en filename (por defecto, en ruta),
+        comprimidos si termina en .gz o .zst.
+        """
+        with comprimido.abrir(filename or self.ruta, 'w') as output:
+            json.dump(self.a_json(), output)
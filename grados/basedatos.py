@@ -0,0 +1,205 @@
+"""
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+
+"""
+Descripción:
+============
+Base de datos SQLite con los datos de matriculaciones de varios cursos, para
+hacer consultas agregadas en SQL sin cargar los JSON.
+
+Esquema (los informes dan por separado las edades y las vías de acceso, no su
+cruce, así que hay una tabla para cada una):
+
+- titulaciones(id, nombre) y facultades(id, nombre): nombres de titulaciones
+  y facultades, que las demás tablas referencian por id.
+- cursos(year, titulacion, facultad, total): una fila por curso y titulación.
+- sexos(year, titulacion, sexo, total): sexo es 'hombres' o 'mujeres'.
+- edades(year, titulacion, sexo, edad, n): edad es el grupo de edad (ver
+  grados.upo.EDADES).
+- accesos(year, titulacion, sexo, via, n): via es la vía de acceso (ver
+  grados.upo.VIAS_ACCESO).
+
+Las tablas de hechos no tienen rowid: la clave primaria empieza por el año,
+así que filtrar por curso o reemplazarlo lee sólo sus filas. Además tienen
+índices que cubren los filtros habituales (por sexo y edad, por vía de
+acceso y por facultad) sin leer la tabla.
+
+Cada curso se guarda (o se reemplaza, si ya estaba) en una sola transacción,
+con un executemany por tabla, sin tocar los demás cursos.
+
+Ejemplo de uso:
+
+    with BaseDatos('grados.sqlite') as bd:
+        bd.guardar('2013', json.load(open('2013.json')))
+        bd.consulta('SELECT year, SUM(n) FROM edades '
+                    'WHERE sexo = ? AND edad = ? GROUP BY year', ('mujeres', 18))
+"""
+
+import sqlite3
+
+from grados import salida
+
+
+SEXOS = ('hombres', 'mujeres')
+
+ESQUEMA = '''
+CREATE TABLE IF NOT EXISTS titulaciones (
+    id INTEGER PRIMARY KEY,
+    nombre TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS facultades (
+    id INTEGER PRIMARY KEY,
+    nombre TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS cursos (
+    year TEXT NOT NULL,
+    titulacion INTEGER NOT NULL REFERENCES titulaciones,
+    facultad INTEGER REFERENCES facultades,
+    total INTEGER,
+    PRIMARY KEY (year, titulacion)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS sexos (
+    year TEXT NOT NULL,
+    titulacion INTEGER NOT NULL REFERENCES titulaciones,
+    sexo TEXT NOT NULL,
+    total INTEGER,
+    PRIMARY KEY (year, titulacion, sexo)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS edades (
+    year TEXT NOT NULL,
+    titulacion INTEGER NOT NULL REFERENCES titulaciones,
+    sexo TEXT NOT NULL,
+    edad INTEGER NOT NULL,
+    n INTEGER NOT NULL,
+    PRIMARY KEY (year, titulacion, sexo, edad)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS accesos (
+    year TEXT NOT NULL,
+    titulacion INTEGER NOT NULL REFERENCES titulaciones,
+    sexo TEXT NOT NULL,
+    via TEXT NOT NULL,
+    n INTEGER NOT NULL,
+    PRIMARY KEY (year, titulacion, sexo, via)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS edades_sexo_edad ON edades (sexo, edad, year, titulacion, n);
+CREATE INDEX IF NOT EXISTS accesos_via ON accesos (via, sexo, year, titulacion, n);
+CREATE INDEX IF NOT EXISTS cursos_facultad ON cursos (facultad, year, titulacion, total);
+'''
+
+# Tablas con datos de cada curso y su número de columnas
+TABLAS_CURSO = {'cursos': 4, 'sexos': 4, 'edades': 5, 'accesos': 5}
+
+
+class BaseDatos(object):
+    """
+    Base de datos SQLite de matriculaciones.
+    - filename - Fichero de la base de datos (se crea si no existe)
+    """
+
+    def __init__(self, filename):
+        self.conexion = sqlite3.connect(filename)
+        self.conexion.executescript(ESQUEMA)
+        self._vaciar_ids()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *excepcion):
+        self.cerrar()
+        return False
+
+    def cerrar(self):
+        self.conexion.close()
+
+    def _vaciar_ids(self):
+        # ids ya consultados de titulaciones y facultades
+        self._ids = {'titulaciones': {}, 'facultades': {}}
+
+    @property
+    def years(self):
+        """
+        Cursos guardados, ordenados.
+        """
+        return [year for year, in self.conexion.execute(
+            'SELECT DISTINCT year FROM cursos ORDER BY year')]
+
+    def _id(self, tabla, nombre):
+        """
+        id de nombre en tabla (titulaciones o facultades); lo añade si no
+        está.
+        """
+        if nombre is None:
+            return None
+        ids = self._ids[tabla]
+        try:
+            return ids[nombre]
+        except KeyError:
+            pass
+        self.conexion.execute(
+            'INSERT OR IGNORE INTO %s (nombre) VALUES (?)' % tabla, (nombre,))
+        ids[nombre], = self.conexion.execute(
+            'SELECT id FROM %s WHERE nombre = ?' % tabla, (nombre,)).fetchone()
+        return ids[nombre]
+
+    def _filas(self, year, data):
+        """
+        Filas de cada tabla de un curso: {tabla: [tupla, ...]}.
+        """
+        filas = {tabla: [] for tabla in TABLAS_CURSO}
+        for titulacion, datos in data.items():
+            if salida.sin_titulacion(titulacion):
+                # Filas sin titulación (None, o 'null' si data viene de un JSON)
+                continue
+            t = self._id('titulaciones', titulacion)
+            filas['cursos'].append(
+                (year, t, self._id('facultades', datos.get('facultad')), datos.get('total')))
+            for sexo in SEXOS:
+                sexo_data = datos.get(sexo)
+                if not sexo_data:
+                    continue
+                filas['sexos'].append((year, t, sexo, sexo_data.get('total')))
+                for edad, n in (sexo_data.get('edades') or {}).items():
+                    filas['edades'].append((year, t, sexo, int(edad), n))
+                for via, n in (sexo_data.get('via_acceso') or {}).items():
+                    filas['accesos'].append((year, t, sexo, via, n))
+        return filas
+
+    def guardar(self, year, data):
+        """
+        Guarda los datos de un curso (en el formato de salida de los scripts,
+        p. ej. cargados de un JSON), reemplazando los que hubiera de ese
+        curso. Devuelve el número de titulaciones guardadas.
+        """
+        data = salida.normalizar(data)
+        try:
+            with self.conexion:
+                filas = self._filas(year, data)
+                for tabla, columnas in TABLAS_CURSO.items():
+                    self.conexion.execute('DELETE FROM %s WHERE year = ?' % tabla, (year,))
+                    self.conexion.executemany(
+                        'INSERT INTO %s VALUES (%s)' % (tabla, ', '.join('?' * columnas)),
+                        filas[tabla])
+        except BaseException:
+            # Los ids añadidos en la transacción ya no existen
+            self._vaciar_ids()
+            raise
+        return len(filas['cursos'])
+
+    def consulta(self, sql, parametros=()):
+        """
+        Devuelve las filas (tuplas) de una consulta SQL.
+        """
+        return self.conexion.execute(sql, parametros).fetchall()
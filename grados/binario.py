@@ -0,0 +1,333 @@
+"""
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+
+"""
+Descripción:
+============
+Formato binario de salida, alternativo a JSON, pensado para abrirse con mmap y
+consultar una titulación sin leer ni deserializar el resto del fichero.
+
+Todos los enteros son de 32 bits, little-endian:
+
+    cabecera:   'GRAD', versión, n_titulaciones, n_huecos, tamaño de los
+                nombres, n_facultades, tamaño de los nombres de facultades
+    registros:  n_titulaciones x CAMPOS enteros (ver abajo)
+    índice:     n_titulaciones x (posición, longitud) del nombre en la tabla
+    huecos:     tabla hash (n_huecos, potencia de 2) con 1 + número de registro
+                (0 = hueco vacío); el hash es crc32 del nombre en UTF-8 y las
+                colisiones se resuelven probando el siguiente hueco
+    facultades: n_facultades x (posición, longitud) del nombre en su tabla
+    nombres:    nombres de las titulaciones en UTF-8, uno detrás de otro
+    nombres de las facultades, igual
+
+Las filas sin titulación (clave None, o 'null' si los datos vienen de un
+JSON; ver grados.salida.sin_titulacion) se guardan con el nombre vacío, y el
+lector las devuelve con titulación None.
+
+Cada registro tiene el total de la titulación, el número de su facultad y,
+para hombres y para mujeres, el total, una máscara (ver CON_EDADES y
+siguientes), las 15 edades y las 6 vías de acceso. Los totales y la facultad
+que faltan (None) se guardan como NINGUNO (-1). Así, lector[titulacion] es
+igual que datos.a_json() de los registros de grados.registro escritos: los
+campos edades o via_acceso que no tenía un sexo no aparecen, y los que eran
+None vuelven como None.
+
+Ejemplo de uso:
+
+    lector = Lector('salida.bin')
+    lector['GRADO EN SOCIOLOGÍA']['mujeres']['edades'][18]
+    lector.contadores('GRADO EN SOCIOLOGÍA')  # memoryview, sin copias
+"""
+
+import mmap
+import struct
+import sys
+import zlib
+from array import array
+
+from grados.registro import Sexo, Titulacion
+from grados.salida import sin_titulacion
+from grados.upo import EDADES, VIAS_ACCESO
+
+
+MAGIC = b'GRAD'
+VERSION = 2
+CABECERA = struct.Struct('<4sIIIIII')
+
+SEXOS = ('hombres', 'mujeres')
+CAMPOS_SEXO = 2 + len(EDADES) + len(VIAS_ACCESO)
+CAMPOS = 2 + len(SEXOS) * CAMPOS_SEXO
+
+# Totales y facultad desconocidos (None)
+NINGUNO = -1
+
+# Máscara de cada sexo: campos de contadores que tiene y cuáles son None
+CON_EDADES = 1
+CON_ACCESOS = 2
+EDADES_NONE = 4
+ACCESOS_NONE = 8
+
+
+def _little_endian(valores):
+    if sys.byteorder == 'big':
+        valores.byteswap()
+    return valores
+
+
+def _huecos(n):
+    """
+    Número de huecos de la tabla hash: potencia de 2, al menos el doble de n.
+    """
+    huecos = 1
+    while huecos < 2 * n:
+        huecos = huecos * 2
+    return huecos
+
+
+def _contadores(sexo_data, campo, claves):
+    """
+    Devuelve (tiene el campo, contadores) de campo (edades o via_acceso) de un
+    sexo, con los contadores en el orden de claves o None. sexo_data es un
+    grados.registro.Sexo, que ya los tiene en ese orden, o un diccionario del
+    formato de salida.
+    """
+    if isinstance(sexo_data, Sexo):
+        if not hasattr(sexo_data, campo):
+            return False, None
+        return True, getattr(sexo_data, campo)
+    if campo not in sexo_data:
+        return False, None
+    valores = sexo_data[campo]
+    if valores is None:
+        return True, None
+    # Las claves son cadenas si los datos vienen de un JSON
+    return True, [valores[c] if c in valores else valores[str(c)] for c in claves]
+
+
+def _numero(valor):
+    return NINGUNO if valor is None else valor
+
+
+def _indice_nombres(nombres):
+    """
+    Array con (posición, longitud) de cada nombre, uno detrás de otro.
+    """
+    indice = array('I')
+    posicion = 0
+    for nombre in nombres:
+        indice.extend((posicion, len(nombre)))
+        posicion = posicion + len(nombre)
+    return indice
+
+
+def _nombre(titulacion):
+    """
+    Nombre en UTF-8 de una titulación (vacío para las filas sin titulación).
+    """
+    if sin_titulacion(titulacion):
+        return b''
+    return titulacion.encode('utf-8')
+
+
+def escribir(data, output):
+    """
+    Escribe data (formato de salida de los scripts o registros de
+    grados.registro) en output, un fichero abierto en modo binario.
+    """
+    nombres = [_nombre(titulacion) for titulacion in data]
+    n_huecos = _huecos(len(nombres))
+    facultades = {} # {facultad: número}
+
+    registros = array('i')
+    for datos in data.values():
+        if isinstance(datos, Titulacion):
+            total, facultad = datos.total, datos.facultad
+            sexos = (datos.hombres, datos.mujeres)
+        else:
+            total, facultad = datos['total'], datos.get('facultad')
+            sexos = [datos.get(sexo) or {} for sexo in SEXOS]
+        if facultad is not None:
+            facultad = facultades.setdefault(facultad, len(facultades))
+        registros.append(_numero(total))
+        registros.append(_numero(facultad))
+        for sexo_data in sexos:
+            if isinstance(sexo_data, Sexo):
+                registros.append(_numero(sexo_data.total))
+            else:
+                registros.append(_numero(sexo_data.get('total')))
+            mascara = 0
+            campos = []
+            for campo, claves, con, con_none in (
+                    ('edades', EDADES, CON_EDADES, EDADES_NONE),
+                    ('via_acceso', VIAS_ACCESO, CON_ACCESOS, ACCESOS_NONE)):
+                tiene, valores = _contadores(sexo_data, campo, claves)
+                if tiene:
+                    mascara = mascara | con
+                if valores is None:
+                    if tiene:
+                        mascara = mascara | con_none
+                    valores = [0] * len(claves)
+                campos.extend(valores)
+            registros.append(mascara)
+            registros.extend(campos)
+
+    indice = _indice_nombres(nombres)
+    huecos = array('I', [0]) * n_huecos
+    for i, nombre in enumerate(nombres):
+        h = zlib.crc32(nombre) & (n_huecos - 1)
+        while huecos[h]:
+            h = (h + 1) & (n_huecos - 1)
+        huecos[h] = i + 1
+    nombres_facultades = [f.encode('utf-8') for f in facultades]
+    indice_facultades = _indice_nombres(nombres_facultades)
+
+    output.write(CABECERA.pack(MAGIC, VERSION, len(nombres), n_huecos,
+                               sum(map(len, nombres)), len(nombres_facultades),
+                               sum(map(len, nombres_facultades))))
+    for valores in (registros, indice, huecos, indice_facultades):
+        output.write(_little_endian(valores).tobytes())
+    for nombre in nombres + nombres_facultades:
+        output.write(nombre)
+
+
+class Lector(object):
+    """
+    Acceso a un fichero binario mediante mmap. Sólo se leen las páginas de
+    la titulación consultada.
+    """
+
+    def __init__(self, filename):
+        with open(filename, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        # La versión se comprueba antes de leer el resto de la cabecera, que
+        # cambia de una versión a otra
+        magic, version = struct.unpack_from('<4sI', self._mmap)
+        if magic != MAGIC or version != VERSION:
+            self._mmap.close()
+            raise ValueError('%s no es un fichero binario de grados (versión %d)'
+                             % (filename, VERSION))
+        (_, _, self.n, self._n_huecos, tamano, n_facultades,
+         tamano_facultades) = CABECERA.unpack_from(self._mmap)
+
+        vista = self._vista = memoryview(self._mmap)
+        inicio = CABECERA.size
+        fin = inicio + 4 * CAMPOS * self.n
+        self._registros = vista[inicio:fin].cast('i')
+        inicio, fin = fin, fin + 8 * self.n
+        self._indice = vista[inicio:fin].cast('I')
+        inicio, fin = fin, fin + 4 * self._n_huecos
+        self._huecos = vista[inicio:fin].cast('I')
+        inicio, fin = fin, fin + 8 * n_facultades
+        indice_facultades = vista[inicio:fin].cast('I')
+        self._nombres = vista[fin:fin + tamano]
+        inicio = fin + tamano
+        nombres_facultades = vista[inicio:inicio + tamano_facultades]
+        if sys.byteorder == 'big':
+            # Las vistas no pueden cambiar el orden de los bytes: se copian
+            self._registros = _little_endian(array('i', self._registros))
+            self._indice = _little_endian(array('I', self._indice))
+            self._huecos = _little_endian(array('I', self._huecos))
+            indice_facultades = _little_endian(array('I', indice_facultades))
+        # Hay pocas facultades: se decodifican todas al abrir
+        self.facultades = [
+            bytes(nombres_facultades[p:p + l]).decode('utf-8')
+            for p, l in zip(indice_facultades[::2], indice_facultades[1::2])]
+        for vista in (indice_facultades, nombres_facultades):
+            if isinstance(vista, memoryview):
+                vista.release()
+
+    def close(self):
+        for vista in (self._registros, self._indice, self._huecos,
+                      self._nombres, self._vista):
+            if isinstance(vista, memoryview):
+                vista.release()
+        self._mmap.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self):
+        return self.n
+
+    def nombre(self, i):
+        """
+        Nombre de la titulación del registro i (None si es la de las filas
+        sin titulación).
+        """
+        posicion, longitud = self._indice[2 * i], self._indice[2 * i + 1]
+        if not longitud:
+            return None
+        return bytes(self._nombres[posicion:posicion + longitud]).decode('utf-8')
+
+    def __iter__(self):
+        return (self.nombre(i) for i in range(self.n))
+
+    def posicion(self, titulacion):
+        """
+        Número de registro de una titulación (None si no existe).
+        """
+        nombre = _nombre(titulacion)
+        mascara = self._n_huecos - 1
+        h = zlib.crc32(nombre) & mascara
+        while self._huecos[h]:
+            i = self._huecos[h] - 1
+            posicion, longitud = self._indice[2 * i], self._indice[2 * i + 1]
+            if self._nombres[posicion:posicion + longitud] == nombre:
+                return i
+            h = (h + 1) & mascara
+        return None
+
+    def __contains__(self, titulacion):
+        return self.posicion(titulacion) is not None
+
+    def contadores(self, titulacion):
+        """
+        Devuelve los CAMPOS enteros del registro de una titulación sin
+        copiarlos (una vista del fichero).
+        """
+        i = self.posicion(titulacion)
+        if i is None:
+            raise KeyError(titulacion)
+        return self._registros[i * CAMPOS:(i + 1) * CAMPOS]
+
+    def __getitem__(self, titulacion):
+        """
+        Datos de una titulación con el formato de salida de los scripts.
+        """
+        campos = self.contadores(titulacion).tolist()
+        total, facultad = campos[0], campos[1]
+        datos = {
+            'total': None if total == NINGUNO else total,
+            'facultad': None if facultad == NINGUNO else self.facultades[facultad],
+        }
+        inicio = 2
+        for sexo in SEXOS:
+            total, mascara = campos[inicio], campos[inicio + 1]
+            sexo_data = {'total': None if total == NINGUNO else total}
+            edades = campos[inicio + 2:inicio + 2 + len(EDADES)]
+            accesos = campos[inicio + 2 + len(EDADES):inicio + CAMPOS_SEXO]
+            if mascara & CON_EDADES:
+                sexo_data['edades'] = None if mascara & EDADES_NONE \
+                    else dict(zip(EDADES, edades))
+            if mascara & CON_ACCESOS:
+                sexo_data['via_acceso'] = None if mascara & ACCESOS_NONE \
+                    else dict(zip(VIAS_ACCESO, accesos))
+            datos[sexo] = sexo_data
+            inicio = inicio + CAMPOS_SEXO
+        return datos
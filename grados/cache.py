@@ -0,0 +1,167 @@
+"""
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+
+"""
+Descripción:
+============
+Caché en disco de los datos parseados de cada informe.
+
+La clave de cada entrada es el SHA-256 del contenido del fichero de entrada
+junto con el nombre y la versión del parser, de modo que un informe que no ha
+cambiado no se vuelve a parsear. Los datos se guardan con pickle (formato
+binario) y, cuando la caché supera el tamaño máximo, se borran las entradas
+usadas hace más tiempo (LRU, según la fecha de modificación, que se actualiza
+en cada acierto).
+
+Los aciertos y fallos se indican por la salida de error.
+
+Variables de entorno:
+- GRADOS_CACHE: Directorio de la caché (por defecto ~/.cache/grados). Si se
+  deja vacía, la caché se desactiva.
+- GRADOS_CACHE_MAX: Tamaño máximo de la caché en bytes (por defecto 256 MiB).
+"""
+
+import hashlib
+import os
+import pickle
+import sys
+import tempfile
+
+from grados import perfil
+
+
+DIRECTORIO = os.environ.get('GRADOS_CACHE',
+                            os.path.join(os.path.expanduser('~'), '.cache', 'grados'))
+TAMANO_MAXIMO = int(os.environ.get('GRADOS_CACHE_MAX', 256 * 2**20))
+
+
+def sha256(filename):
+    """
+    Devuelve el SHA-256 (hexadecimal) del contenido de un fichero.
+    """
+    resumen = hashlib.sha256()
+    with open(filename, 'rb') as f:
+        for bloque in iter(lambda: f.read(2**20), b''):
+            resumen.update(bloque)
+    return resumen.hexdigest()
+
+
+def _ruta(filename, parser, version):
+    with perfil.etapa('cache'):
+        clave = '%s-%s-%s' % (parser, version, sha256(filename))
+    return os.path.join(DIRECTORIO, clave + '.pickle')
+
+
+def _leer(ruta, parser, filename):
+    """
+    Devuelve los datos guardados en ruta, o None si no están en la caché.
+    """
+    try:
+        with perfil.etapa('cache'), open(ruta, 'rb') as f:
+            data = pickle.load(f)
+        os.utime(ruta)
+        print('caché: acierto', parser, filename, file=sys.stderr)
+        return data
+    except Exception:
+        # Además de un fichero que falta o está truncado, un pickle escrito
+        # antes de renombrar un módulo o una clase (AttributeError,
+        # ModuleNotFoundError): en cualquier caso se vuelve a parsear
+        print('caché: fallo', parser, filename, file=sys.stderr)
+        return None
+
+
+def cargar(filename, parser, version, funcion):
+    """
+    Devuelve los datos de filename, usando la caché si es posible.
+    - filename - Ruta del fichero de entrada
+    - parser - Nombre del parser (forma parte de la clave)
+    - version - Versión del parser; se debe cambiar si cambia el resultado
+    - funcion - Función que parsea el fichero: funcion(filename) -> data
+    """
+    if not DIRECTORIO:
+        return funcion(filename)
+
+    ruta = _ruta(filename, parser, version)
+    data = _leer(ruta, parser, filename)
+    if data is None:
+        data = funcion(filename)
+        guardar(ruta, data)
+    return data
+
+
+def entradas(filename, parser, version, generador):
+    """
+    Como cargar(), pero genera los pares (titulacion, datos) a medida que se
+    parsea el fichero, para poder escribirlos sin esperar al final.
+    - generador - Función que parsea el fichero:
+      generador(filename) -> iterable de (titulacion, datos)
+    """
+    if not DIRECTORIO:
+        yield from generador(filename)
+        return
+
+    ruta = _ruta(filename, parser, version)
+    data = _leer(ruta, parser, filename)
+    if data is not None:
+        yield from data.items()
+        return
+
+    data = {}
+    for titulacion, datos in generador(filename):
+        data[titulacion] = datos
+        yield titulacion, datos
+    guardar(ruta, data)
+
+
+def guardar(ruta, data):
+    """
+    Guarda data en la caché de forma atómica y aplica el tamaño máximo.
+    """
+    os.makedirs(DIRECTORIO, exist_ok=True)
+    fd, temporal = tempfile.mkstemp(dir=DIRECTORIO, suffix='.tmp')
+    try:
+        with perfil.etapa('cache'), os.fdopen(fd, 'wb') as f:
+            pickle.dump(data, f, pickle.HIGHEST_PROTOCOL)
+        os.replace(temporal, ruta)
+    except BaseException:
+        os.remove(temporal)
+        raise
+    limpiar()
+
+
+def limpiar(tamano_maximo=None):
+    """
+    Borra las entradas menos usadas hasta que la caché no supere el tamaño
+    máximo.
+    """
+    if tamano_maximo is None:
+        tamano_maximo = TAMANO_MAXIMO
+
+    entradas = []
+    for entrada in os.scandir(DIRECTORIO):
+        if entrada.name.endswith('.pickle'):
+            estado = entrada.stat()
+            entradas.append((estado.st_mtime, estado.st_size, entrada.path))
+
+    total = sum(tamano for _, tamano, _ in entradas)
+    for _, tamano, ruta in sorted(entradas):
+        if total <= tamano_maximo:
+            break
+        try:
+            os.remove(ruta)
+        except FileNotFoundError:
+            pass
+        total = total - tamano
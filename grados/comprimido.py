@@ -0,0 +1,166 @@
+"""
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+
+"""
+Descripción:
+============
+Apertura de ficheros comprimidos con gzip (.gz) o zstd (.zst) según su
+extensión. Los datos se comprimen y descomprimen a medida que se leen o
+escriben, sin ficheros temporales; el resto de ficheros se abren con open().
+
+Al escribir, flush() no vacía el compresor (con gzip y zstd cada vaciado
+cierra un bloque y empeora la compresión): los datos comprimidos llegan al
+disco a medida que se llenan los bloques y al cerrar el fichero.
+
+zstd necesita Python 3.14 (módulo compression.zstd) o el paquete
+zstandard; gzip está siempre disponible.
+
+Ejemplo de uso:
+
+    with abrir('2012_edades.html.gz', 'rb') as html_doc:
+        data = dict(ugr.parse_edades(html_doc))
+    with abrir('2012.json.zst', 'w') as output:
+        salida.escribir_json(data.items(), output)
+"""
+
+import io
+
+
+EXTENSIONES = ('.gz', '.zst')
+
+# Tamaño del búfer de escritura delante del compresor
+TAMANO_BUFFER = 2**16
+
+# Nivel de compresión de gzip (el 9 de gzip.open es mucho más lento y apenas
+# reduce el tamaño de estos ficheros)
+NIVEL_GZIP = 6
+
+
+def compresion(filename):
+    """
+    Extensión de compresión de filename ('.gz' o '.zst'), o '' si no está
+    comprimido.
+    """
+    for extension in EXTENSIONES:
+        if filename.endswith(extension):
+            return extension
+    return ''
+
+
+def sin_compresion(filename):
+    """
+    Devuelve filename sin la extensión de compresión (para saber el formato
+    del contenido, p. ej. 'salida.ndjson' de 'salida.ndjson.gz').
+    """
+    extension = compresion(filename)
+    return filename[:len(filename) - len(extension)]
+
+
+def desde_argv(argv):
+    """
+    Quita de argv la opción --compresion=gz o --compresion=zst y devuelve la
+    extensión que se debe añadir a los ficheros de salida ('' si no estaba).
+    """
+    for i, argumento in enumerate(argv[1:], 1):
+        if argumento.startswith('--compresion='):
+            del argv[i]
+            extension = '.' + argumento.partition('=')[2]
+            if extension not in EXTENSIONES:
+                raise ValueError('Compresión desconocida: %s' % argumento)
+            return extension
+    return ''
+
+
+def disponible(extension):
+    """
+    Indica si se pueden abrir los ficheros con la extensión de compresión
+    indicada.
+    """
+    if extension != '.zst':
+        return True
+    try:
+        from compression import zstd
+    except ImportError:
+        try:
+            import zstandard
+        except ImportError:
+            return False
+    return True
+
+
+class _SinVolcado(io.RawIOBase):
+    """
+    Fichero de escritura sobre un compresor, cuyo flush() no hace nada.
+    """
+
+    def __init__(self, comprimido):
+        self._comprimido = comprimido
+
+    def writable(self):
+        return True
+
+    def write(self, datos):
+        self._comprimido.write(datos)
+        return len(datos)
+
+    def flush(self):
+        pass
+
+    def close(self):
+        if not self.closed:
+            self._comprimido.close()
+        super().close()
+
+
+def _abrir_zstd(filename, modo):
+    try:
+        from compression import zstd
+        return zstd.open(filename, modo)
+    except ImportError:
+        pass
+    try:
+        import zstandard
+    except ImportError:
+        raise ImportError('Los ficheros .zst necesitan Python 3.14 o el paquete zstandard')
+    fichero = zstandard.open(filename, modo)
+    if modo == 'rb':
+        fichero = io.BufferedReader(fichero)
+    return fichero
+
+
+def abrir(filename, modo='r', encoding=None, newline=None):
+    """
+    Como open(filename, modo, encoding=encoding, newline=newline), pero si
+    filename termina en .gz o .zst los datos se (des)comprimen al leerlos o
+    escribirlos. modo es 'r', 'w', 'rb' o 'wb' (una '+' se ignora).
+    """
+    extension = compresion(filename)
+    if not extension:
+        return open(filename, modo, encoding=encoding, newline=newline)
+
+    escritura = 'w' in modo
+    modo_binario = 'wb' if escritura else 'rb'
+    if extension == '.gz':
+        import gzip
+        fichero = gzip.open(filename, modo_binario, compresslevel=NIVEL_GZIP)
+    else:
+        fichero = _abrir_zstd(filename, modo_binario)
+    if escritura:
+        fichero = io.BufferedWriter(_SinVolcado(fichero), TAMANO_BUFFER)
+
+    if 'b' in modo:
+        return fichero
+    return io.TextIOWrapper(fichero, encoding=encoding, newline=newline)
@@ -0,0 +1,263 @@
+"""
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+
+"""
+Descripción:
+============
+Índices para buscar en los ficheros JSON por año que genera
+nuevas_matriculaciones_grado.py (modo --batch).
+
+El índice guarda los datos de todas las (año, titulación) y, para cada
+criterio de búsqueda, un diccionario {clave: conjunto de registros}:
+
+- year: año del fichero
+- titulacion: nombre de la titulación normalizado (minúsculas, sin tildes)
+- facultad: nombre de la facultad normalizado
+- tipo: grado, licenciatura, diplomatura, ingenieria, arquitectura, maestro,
+  master u otro, según el comienzo del nombre de la titulación
+
+Las filas sin titulación de los informes (la clave "null" de los JSON) no se
+indexan.
+
+Se guarda con pickle junto a los JSON (indice.pickle) y se reconstruye cuando
+alguno de los ficheros cambia, de modo que las consultas no vuelven a leer
+los JSON.
+
+Ejemplo de uso:
+
+    indice = Indice.cargar('datos')
+    for year, titulacion, valor in indice.consultar(
+            titulacion='grado en *', facultad='ciencias', years=range(2010, 2014),
+            sexo='mujeres', edad=18):
+        ...
+"""
+
+import bisect
+import fnmatch
+import glob
+import json
+import os
+import pickle
+import re
+import unicodedata
+
+from grados.salida import sin_titulacion
+from grados.vigilancia import estado
+
+
+FICHERO_INDICE = 'indice.pickle'
+VERSION = 3
+
+# Tipos de titulación según el comienzo de su nombre normalizado
+TIPOS = (
+    ('grado', 'grado'),
+    ('licenciad', 'licenciatura'),
+    ('diplomad', 'diplomatura'),
+    ('ingenier', 'ingenieria'),
+    ('arquitect', 'arquitectura'),
+    ('maestro', 'maestro'),
+    ('master', 'master'),
+)
+
+
+def normalizar(texto):
+    """
+    Pasa texto a minúsculas, quita las tildes y une los espacios.
+    """
+    texto = unicodedata.normalize('NFKD', texto or '')
+    texto = ''.join(c for c in texto if not unicodedata.combining(c))
+    return ' '.join(texto.lower().split())
+
+
+def tipo(titulacion):
+    """
+    Tipo de una titulación (ver TIPOS).
+    """
+    nombre = normalizar(titulacion)
+    for prefijo, nombre_tipo in TIPOS:
+        if nombre.startswith(prefijo):
+            return nombre_tipo
+    return 'otro'
+
+
+def year_de(filename):
+    """
+    Año de un fichero: el primer número de cuatro cifras (19xx o 20xx) del
+    nombre, o None si no tiene ninguno.
+    """
+    year = re.search(r'(?<![0-9])(19|20)[0-9]{2}(?![0-9])', os.path.basename(filename))
+    return year.group(0) if year else None
+
+
+def por_year(ficheros):
+    """
+    Devuelve la lista de (año, fichero) ordenada por año. Lanza ValueError si
+    el nombre de algún fichero no indica el año.
+    """
+    resultado = []
+    for filename in ficheros:
+        year = year_de(filename)
+        if year is None:
+            raise ValueError('El nombre de %s no indica el año' % filename)
+        resultado.append((year, filename))
+    return sorted(resultado)
+
+
+class Indice(object):
+    """
+    Datos e índices secundarios de un directorio de ficheros JSON por año.
+    """
+
+    def __init__(self, ficheros):
+        self.estado = estado(ficheros)
+        self.registros = [] # (year, titulacion, datos)
+        self.por_year = {}
+        self.por_titulacion = {}
+        self.por_facultad = {}
+        self.por_tipo = {}
+
+        for filename in sorted(ficheros):
+            year = year_de(filename)
+            if year is None:
+                # Ficheros que no son de un curso
+                continue
+            with open(filename) as f:
+                data = json.load(f)
+            for titulacion, datos in data.items():
+                if sin_titulacion(titulacion):
+                    # Totales de la facultad o de la universidad
+                    continue
+                i = len(self.registros)
+                self.registros.append((year, titulacion, datos))
+                self.por_year.setdefault(year, set()).add(i)
+                self.por_titulacion.setdefault(normalizar(titulacion), set()).add(i)
+                self.por_facultad.setdefault(normalizar(datos.get('facultad')), set()).add(i)
+                self.por_tipo.setdefault(tipo(titulacion), set()).add(i)
+
+        # Nombres ordenados para buscar prefijos ('grado en *') con bisect
+        self.titulaciones = sorted(self.por_titulacion)
+
+    @classmethod
+    def cargar(cls, directorio):
+        """
+        Carga el índice de un directorio, construyéndolo (y guardándolo) si
+        no existe o si algún JSON ha cambiado.
+        """
+        ficheros = glob.glob(os.path.join(directorio, '*.json'))
+        ruta = os.path.join(directorio, FICHERO_INDICE)
+        try:
+            with open(ruta, 'rb') as f:
+                version, indice = pickle.load(f)
+            if version == VERSION and indice.estado == estado(ficheros):
+                return indice
+        except (OSError, pickle.UnpicklingError, EOFError, ValueError):
+            pass
+
+        indice = cls(ficheros)
+        with open(ruta, 'wb') as f:
+            pickle.dump((VERSION, indice), f, pickle.HIGHEST_PROTOCOL)
+        return indice
+
+    def _titulaciones(self, patron):
+        """
+        Registros cuya titulación cumple el patrón (glob, sin tildes).
+        """
+        patron = normalizar(patron)
+        if not any(c in patron for c in '*?['):
+            return self.por_titulacion.get(patron, set())
+
+        if patron.endswith('*') and not any(c in patron[:-1] for c in '*?['):
+            prefijo = patron[:-1]
+            inicio = bisect.bisect_left(self.titulaciones, prefijo)
+            nombres = []
+            for nombre in self.titulaciones[inicio:]:
+                if not nombre.startswith(prefijo):
+                    break
+                nombres.append(nombre)
+        else:
+            nombres = fnmatch.filter(self.titulaciones, patron)
+        return set().union(*(self.por_titulacion[n] for n in nombres))
+
+    def _facultades(self, patron):
+        """
+        Registros cuya facultad contiene el texto (o cumple el patrón glob).
+        """
+        patron = normalizar(patron)
+        if any(c in patron for c in '*?['):
+            nombres = fnmatch.filter(self.por_facultad, patron)
+        else:
+            nombres = [n for n in self.por_facultad if patron in n]
+        return set().union(*(self.por_facultad[n] for n in nombres))
+
+    def buscar(self, titulacion=None, facultad=None, years=None, tipo=None):
+        """
+        Devuelve los números de registro (ordenados) que cumplen todos los
+        criterios indicados.
+        """
+        conjuntos = []
+        if years is not None:
+            conjuntos.append(set().union(*(self.por_year.get(str(y), set()) for y in years)))
+        if tipo is not None:
+            conjuntos.append(self.por_tipo.get(tipo, set()))
+        if facultad is not None:
+            conjuntos.append(self._facultades(facultad))
+        if titulacion is not None:
+            conjuntos.append(self._titulaciones(titulacion))
+
+        if not conjuntos:
+            return list(range(len(self.registros)))
+        conjuntos.sort(key=len)
+        return sorted(conjuntos[0].intersection(*conjuntos[1:]))
+
+    def consultar(self, sexo=None, edad=None, acceso=None, **criterios):
+        """
+        Genera (year, titulacion, valor) para los registros que cumplen los
+        criterios de buscar(). El valor es el número de matriculaciones del
+        sexo, grupo de edad y vía de acceso indicados (None si no hay datos).
+        """
+        for i in self.buscar(**criterios):
+            year, titulacion, datos = self.registros[i]
+            yield year, titulacion, valor(datos, sexo, edad, acceso)
+
+
+def valor(datos, sexo=None, edad=None, acceso=None):
+    """
+    Número de matriculaciones de una titulación para un sexo ('hombres' o
+    'mujeres'), un grupo de edad y una vía de acceso. No se pueden indicar a
+    la vez edad y acceso, porque los informes no dan su cruce.
+    """
+    if edad is not None and acceso is not None:
+        raise ValueError('No se puede consultar a la vez la edad y la vía de acceso')
+
+    sexos = [sexo] if sexo else ['hombres', 'mujeres']
+    if edad is None and acceso is None:
+        if sexo is None:
+            return datos.get('total')
+        return datos.get(sexo, {}).get('total')
+
+    total = 0
+    for s in sexos:
+        sexo_data = datos.get(s, {})
+        if edad is not None:
+            valores = sexo_data.get('edades')
+            clave = str(edad)
+        else:
+            valores = sexo_data.get('via_acceso')
+            clave = acceso
+        if valores is None or clave not in valores:
+            return None
+        total = total + valores[clave]
+    return total
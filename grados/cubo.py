@@ -0,0 +1,199 @@
+"""
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+
+"""
+Descripción:
+============
+Carga los datos de matriculaciones en arrays densos de NumPy para poder
+calcular totales, porcentajes y agrupaciones sin recorrer diccionarios.
+
+Los informes de la UGR dan por separado la distribución por edades y por vías
+de acceso (no su cruce), así que el cubo tiene dos arrays con los mismos
+primeros ejes:
+
+    edades[año, titulación, sexo, grupo de edad]
+    accesos[año, titulación, sexo, vía de acceso]
+
+Además se guardan totales[año, titulación] (-1 si el informe no lo indica),
+totales_sexo[año, titulación, sexo] y qué titulaciones tienen datos de edades
+(con_edades) y de vías de acceso (con_accesos) cada año. Los nombres de los
+años y de las titulaciones están en cubo.years y cubo.titulaciones, y su
+posición en cubo.indice_year y cubo.indice_titulacion.
+
+Ejemplo de uso:
+
+    cubo = Cubo.desde_ficheros(['2012.json', '2013.json'])
+    mujeres = cubo.totales_sexo[:, :, MUJERES].sum(axis=1)
+    facultades, edades = cubo.agrupar(cubo.edades, facultad_de)
+
+Requisitos:
+===========
+- Python 3
+- NumPy
+"""
+
+import csv
+import json
+
+import numpy as np
+
+from grados import consulta, salida, upo
+from grados.upo import EDADES, VIAS_ACCESO
+
+
+SEXOS = ('hombres', 'mujeres')
+HOMBRES = 0
+MUJERES = 1
+
+
+class Cubo(object):
+    """
+    Matriculaciones por año, titulación, sexo, grupo de edad y vía de acceso.
+    """
+
+    def __init__(self, years, titulaciones):
+        self.years = list(years)
+        self.titulaciones = list(titulaciones)
+        self.indice_year = {year: i for i, year in enumerate(self.years)}
+        self.indice_titulacion = {t: i for i, t in enumerate(self.titulaciones)}
+
+        forma = (len(self.years), len(self.titulaciones))
+        self.totales = np.full(forma, -1, dtype=np.int64)
+        self.totales_sexo = np.zeros(forma + (len(SEXOS),), dtype=np.int64)
+        self.edades = np.zeros(forma + (len(SEXOS), len(EDADES)), dtype=np.int64)
+        self.accesos = np.zeros(forma + (len(SEXOS), len(VIAS_ACCESO)), dtype=np.int64)
+        self.con_edades = np.zeros(forma, dtype=bool)
+        self.con_accesos = np.zeros(forma, dtype=bool)
+
+    @classmethod
+    def desde_json(cls, por_year):
+        """
+        Crea el cubo a partir de {año: data}, con data en el formato de
+        salida de los scripts (ya sea cargado de JSON o no).
+        """
+        por_year = {year: salida.normalizar(data) for year, data in por_year.items()}
+        titulaciones = {}
+        for data in por_year.values():
+            titulaciones.update(dict.fromkeys(data))
+        cubo = cls(sorted(por_year), titulaciones)
+
+        for year, data in por_year.items():
+            y = cubo.indice_year[year]
+            for titulacion, datos in data.items():
+                t = cubo.indice_titulacion[titulacion]
+                if datos.get('total') is not None:
+                    cubo.totales[y, t] = datos['total']
+                for s, sexo in enumerate(SEXOS):
+                    # Los sexos y contadores que faltan o son None (titulaciones
+                    # que sólo están en uno de los informes) se quedan a 0
+                    sexo_data = datos.get(sexo) or {}
+                    cubo.totales_sexo[y, t, s] = sexo_data.get('total') or 0
+                    if sexo_data.get('edades') is not None:
+                        edades = {int(e): n for e, n in sexo_data['edades'].items()}
+                        cubo.edades[y, t, s] = [edades[e] for e in EDADES]
+                        cubo.con_edades[y, t] = True
+                    if sexo_data.get('via_acceso') is not None:
+                        accesos = sexo_data['via_acceso']
+                        cubo.accesos[y, t, s] = [accesos[v] for v in VIAS_ACCESO]
+                        cubo.con_accesos[y, t] = True
+        return cubo
+
+    @classmethod
+    def desde_ficheros(cls, filenames):
+        """
+        Crea el cubo a partir de ficheros JSON generados por los scripts. El
+        año se toma del nombre de cada fichero (ver grados.consulta.por_year).
+        """
+        por_year = {}
+        for year, filename in consulta.por_year(filenames):
+            with open(filename) as f:
+                por_year[year] = json.load(f)
+        return cls.desde_json(por_year)
+
+    @classmethod
+    def desde_csv(cls, filename):
+        """
+        Crea el cubo a partir del CSV por alumno de la UPO.
+        """
+        with open(filename, 'r', newline='') as f:
+            por_year = dict(upo.agregar(csv.reader(f)))
+
+        titulaciones = {}
+        for data in por_year.values():
+            titulaciones.update(dict.fromkeys(data))
+        cubo = cls(sorted(por_year), titulaciones)
+
+        n_edades = len(EDADES)
+        for year, data in por_year.items():
+            y = cubo.indice_year[year]
+            indices = [cubo.indice_titulacion[t] for t in data]
+            contadores = np.array(list(data.values()), dtype=np.int64)
+            contadores = contadores.reshape(len(indices), len(SEXOS), -1)
+            cubo.edades[y, indices] = contadores[:, :, :n_edades]
+            cubo.accesos[y, indices] = contadores[:, :, n_edades:]
+            cubo.totales_sexo[y, indices] = contadores[:, :, :n_edades].sum(axis=2)
+            cubo.totales[y, indices] = cubo.totales_sexo[y, indices].sum(axis=1)
+            cubo.con_edades[y, indices] = True
+            cubo.con_accesos[y, indices] = True
+        return cubo
+
+    def a_json(self, year):
+        """
+        Devuelve los datos de un año con el formato de salida de los scripts.
+        """
+        y = self.indice_year[year]
+        data = {}
+        for t in np.flatnonzero(self.con_edades[y] | self.con_accesos[y]):
+            total = int(self.totales[y, t])
+            datos = {'total': total if total >= 0 else None}
+            for s, sexo in enumerate(SEXOS):
+                sexo_data = {'total': int(self.totales_sexo[y, t, s])}
+                if self.con_edades[y, t]:
+                    sexo_data['edades'] = dict(zip(EDADES, self.edades[y, t, s].tolist()))
+                if self.con_accesos[y, t]:
+                    sexo_data['via_acceso'] = dict(zip(VIAS_ACCESO, self.accesos[y, t, s].tolist()))
+                datos[sexo] = sexo_data
+            data[self.titulaciones[t]] = datos
+        return data
+
+    def agrupar(self, array, grupo_de):
+        """
+        Suma los valores de array (con las titulaciones en el eje 1) por
+        grupos de titulaciones, p. ej. por facultad.
+        - array - Uno de los arrays del cubo
+        - grupo_de - Diccionario {titulacion: grupo}. Las titulaciones que no
+          aparecen se suman en el grupo None.
+        Devuelve la lista de grupos y el array agrupado.
+        """
+        grupos = [grupo_de.get(t) for t in self.titulaciones]
+        etiquetas = sorted(set(grupos), key=lambda g: (g is None, g))
+        indice = {g: i for i, g in enumerate(etiquetas)}
+        codigos = np.array([indice[g] for g in grupos], dtype=np.intp)
+
+        agrupado = np.zeros((array.shape[0], len(etiquetas)) + array.shape[2:],
+                            dtype=array.dtype)
+        np.add.at(agrupado, (slice(None), codigos), array)
+        return etiquetas, agrupado
+
+
+def cuotas(array, eje=-1):
+    """
+    Proporción de cada valor respecto a la suma a lo largo de eje (0 donde la
+    suma es 0). P. ej. cuotas(cubo.totales_sexo) da el porcentaje (en tanto
+    por uno) de hombres y mujeres de cada titulación y año.
+    """
+    suma = array.sum(axis=eje, keepdims=True)
+    return np.divide(array, suma, out=np.zeros(array.shape), where=suma != 0)
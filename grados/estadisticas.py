@@ -0,0 +1,250 @@
+"""
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+
+"""
+Descripción:
+============
+Estadísticas derivadas de los datos de varios cursos, calculadas a la vez
+para todos los años y titulaciones sobre los arrays de grados.cubo:
+
+- edad_media y edad_mediana: estimadas a partir de los grupos de edad.
+- cuota_mujeres: proporción de mujeres.
+- mezcla_acceso: proporción de cada vía de acceso.
+- variacion: cambio de cualquiera de las anteriores respecto al curso
+  anterior que haya en los datos.
+
+Cada una devuelve un array con los años en el eje 0 y las titulaciones en el
+eje 1 (en el orden de cubo.years y cubo.titulaciones), con NaN donde no hay
+datos.
+
+Los grupos de edad se tratan como intervalos de edades cumplidas: cada edad
+de 18 a 29 es un intervalo de un año (18 incluye a los menores), 30 y 35 son
+de cinco años y 40 se supone también de cinco (40 a 44). La media usa el
+centro de cada intervalo (MARCAS) y la mediana se interpola dentro del
+intervalo que la contiene.
+
+Los resultados se guardan por (versión de los datos, consulta): repetir una
+consulta no vuelve a calcularla, y los arrays devueltos son de sólo lectura.
+Estadisticas.desde_directorio devuelve la misma instancia (con sus resultados)
+mientras no cambie ningún JSON del directorio, así que refrescar un panel
+que vuelve a cargar el directorio no recalcula nada.
+
+Ejemplo de uso:
+
+    estadisticas = Estadisticas.desde_directorio('datos')
+    medias = estadisticas.edad_media(sexo='mujeres')
+    cambios = estadisticas.variacion('cuota_mujeres')
+    estadisticas.resumen('GRADO EN SOCIOLOGÍA')
+
+Requisitos:
+===========
+- Python 3
+- NumPy
+"""
+
+import glob
+import hashlib
+import os
+
+import numpy as np
+
+from grados.cubo import Cubo, SEXOS, MUJERES
+from grados.upo import EDADES, VIAS_ACCESO
+from grados.vigilancia import estado
+
+
+# Intervalo de edades cumplidas de cada grupo de EDADES: inicio y ancho
+ANCHOS = np.array([1.0] * 12 + [5.0, 5.0, 5.0])
+INICIOS = np.array(EDADES, dtype=float) - 0.5
+MARCAS = INICIOS + ANCHOS / 2
+
+# Instancias de desde_directorio: {directorio: Estadisticas}
+_INSTANCIAS = {}
+
+
+def _dividir(a, b):
+    """
+    a / b, con NaN donde b es 0.
+    """
+    return np.divide(a, b, out=np.full(np.broadcast(a, b).shape, np.nan), where=b != 0)
+
+
+def media(histograma):
+    """
+    Media estimada de los histogramas de edades (último eje en el orden de
+    EDADES).
+    """
+    return _dividir((histograma * MARCAS).sum(axis=-1), histograma.sum(axis=-1))
+
+
+def mediana(histograma):
+    """
+    Mediana estimada de los histogramas de edades (último eje en el orden de
+    EDADES), interpolada dentro del grupo que la contiene.
+    """
+    histograma = np.asarray(histograma, dtype=float)
+    acumulado = histograma.cumsum(axis=-1)
+    mitad = acumulado[..., -1] / 2
+    # Primer grupo en el que el acumulado llega a la mitad
+    grupo = np.minimum((acumulado < mitad[..., None]).sum(axis=-1), len(EDADES) - 1)
+    anteriores = np.take_along_axis(acumulado - histograma, grupo[..., None], axis=-1)[..., 0]
+    en_grupo = np.take_along_axis(histograma, grupo[..., None], axis=-1)[..., 0]
+    resultado = INICIOS[grupo] + ANCHOS[grupo] * _dividir(mitad - anteriores, en_grupo)
+    resultado[mitad == 0] = np.nan
+    return resultado
+
+
+def _version(ficheros):
+    """
+    Versión de un conjunto de ficheros: resumen de su nombre, fecha de
+    modificación y tamaño.
+    """
+    resumen = hashlib.sha256()
+    for filename, (mtime, tamano) in sorted(estado(ficheros).items()):
+        resumen.update(('%s\0%d\0%d\n' % (filename, mtime, tamano)).encode('utf-8'))
+    return resumen.hexdigest()
+
+
+class Estadisticas(object):
+    """
+    Estadísticas de un cubo (grados.cubo.Cubo).
+    - version - Identifica los datos del cubo (p. ej. el estado de los
+      ficheros de los que se ha cargado)
+    """
+
+    def __init__(self, cubo, version=None):
+        self.cubo = cubo
+        self.version = version
+        self._resultados = {}
+
+    @classmethod
+    def desde_ficheros(cls, filenames):
+        """
+        Estadísticas de los ficheros JSON generados por los scripts.
+        """
+        return cls(Cubo.desde_ficheros(filenames), _version(filenames))
+
+    @classmethod
+    def desde_directorio(cls, directorio):
+        """
+        Estadísticas de los ficheros JSON de un directorio. Si no ha cambiado
+        ninguno desde la última llamada, se devuelve la misma instancia.
+        """
+        ficheros = glob.glob(os.path.join(directorio, '*.json'))
+        version = _version(ficheros)
+        clave = os.path.abspath(directorio)
+        instancia = _INSTANCIAS.get(clave)
+        if instancia is None or instancia.version != version:
+            instancia = _INSTANCIAS[clave] = cls(Cubo.desde_ficheros(ficheros), version)
+        return instancia
+
+    def _consulta(self, nombre, *args):
+        """
+        Resultado de getattr(self, '_' + nombre)(*args), calculado sólo la
+        primera vez.
+        """
+        clave = (self.version, nombre, args)
+        try:
+            return self._resultados[clave]
+        except KeyError:
+            pass
+        resultado = getattr(self, '_' + nombre)(*args)
+        resultado.setflags(write=False)
+        self._resultados[clave] = resultado
+        return resultado
+
+    def _por_sexo(self, array, sexo):
+        # Suma de los dos sexos o sólo el indicado (eje 2)
+        if sexo is None:
+            return array.sum(axis=2)
+        return array[:, :, SEXOS.index(sexo)]
+
+    def _edad_media(self, sexo):
+        return media(self._por_sexo(self.cubo.edades, sexo))
+
+    def _edad_mediana(self, sexo):
+        return mediana(self._por_sexo(self.cubo.edades, sexo))
+
+    def _cuota_mujeres(self):
+        totales_sexo = self.cubo.totales_sexo
+        return _dividir(totales_sexo[:, :, MUJERES], totales_sexo.sum(axis=2))
+
+    def _mezcla_acceso(self, sexo):
+        accesos = self._por_sexo(self.cubo.accesos, sexo)
+        return _dividir(accesos, accesos.sum(axis=-1, keepdims=True))
+
+    def _variacion(self, nombre, *args):
+        valores = getattr(self, nombre)(*args)
+        resultado = np.full(valores.shape, np.nan)
+        resultado[1:] = valores[1:] - valores[:-1]
+        return resultado
+
+    def edad_media(self, sexo=None):
+        """
+        Edad media estimada [año, titulación] (de ambos sexos o del
+        indicado: 'hombres' o 'mujeres').
+        """
+        return self._consulta('edad_media', sexo)
+
+    def edad_mediana(self, sexo=None):
+        """
+        Edad mediana estimada [año, titulación].
+        """
+        return self._consulta('edad_mediana', sexo)
+
+    def cuota_mujeres(self):
+        """
+        Proporción de mujeres (en tanto por uno) [año, titulación].
+        """
+        return self._consulta('cuota_mujeres')
+
+    def mezcla_acceso(self, sexo=None):
+        """
+        Proporción de cada vía de acceso [año, titulación, vía] (en el orden
+        de VIAS_ACCESO).
+        """
+        return self._consulta('mezcla_acceso', sexo)
+
+    def variacion(self, nombre, *args):
+        """
+        Cambio de la consulta nombre(*args) (p. ej. 'edad_media' o
+        'cuota_mujeres') respecto al curso anterior de cubo.years; NaN en el
+        primero.
+        """
+        return self._consulta('variacion', nombre, *args)
+
+    def resumen(self, titulacion):
+        """
+        {año: estadísticas} de una titulación, con None donde no hay datos
+        (para enviarlo como JSON).
+        """
+        t = self.cubo.indice_titulacion[titulacion]
+
+        def valor(x):
+            x = float(x)
+            return None if np.isnan(x) else round(x, 4)
+
+        resultado = {}
+        for y, year in enumerate(self.cubo.years):
+            resultado[year] = {
+                'edad_media': valor(self.edad_media()[y, t]),
+                'edad_mediana': valor(self.edad_mediana()[y, t]),
+                'cuota_mujeres': valor(self.cuota_mujeres()[y, t]),
+                'variacion_cuota_mujeres': valor(self.variacion('cuota_mujeres')[y, t]),
+                'via_acceso': {via: valor(cuota) for via, cuota in
+                               zip(VIAS_ACCESO, self.mezcla_acceso()[y, t])},
+            }
+        return resultado
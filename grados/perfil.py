@@ -0,0 +1,265 @@
+"""
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+
+"""
+Descripción:
+============
+Medición por etapas del tiempo y la memoria de los scripts (opción
+--profile).
+
+Todos los scripts aceptan --profile o --profile=FICHERO.pstats. Con ella se
+mide cada etapa (lectura del fichero, decodificación, HTML, conversión de las
+celdas, JSON, escritura...) y al terminar se muestra por la salida de error
+una tabla con, para cada etapa, el número de llamadas y de filas, el tiempo
+real y de CPU y la memoria reservada (neta, con tracemalloc), además del
+total y del pico de memoria. Los tiempos y la memoria de cada etapa son
+exclusivos: no incluyen los de las etapas que se miden dentro de ella (p. ej.
+la conversión de las celdas dentro de la lectura del HTML), así que la suma
+de las etapas no supera el total. Si se indica un fichero, también se guarda en él
+un perfil de cProfile (se puede ver con python -m pstats FICHERO).
+
+tracemalloc hace más lento el código Python (el parser de HTML, sobre todo),
+así que los tiempos con --profile sirven para comparar etapas entre sí, no
+con los de una ejecución normal.
+
+Sin --profile no se mide nada: las funciones medir(), iterar() y etapa()
+devuelven lo que reciben (o un contexto vacío), y sólo se comprueba
+perfil.ACTIVO al preparar cada etapa, nunca por celda o por fila.
+
+Ejemplo de uso:
+
+    perfil.desde_argv(sys.argv)   # quita --profile de sys.argv
+    parse_tr = perfil.medir('conversion', parse_tr, filas=True)
+    with perfil.etapa('indice'):
+        indice = Indice.cargar(directorio)
+"""
+
+import atexit
+import contextlib
+import sys
+import threading
+import time
+
+
+ACTIVO = False
+
+# {nombre: [llamadas, filas, segundos, segundos de CPU, bytes]}
+ETAPAS = {}
+
+_inicio = None
+_perfilador = None
+_fichero_pstats = None
+
+# Pila (por hilo) de las medidas en curso, ver _Medida
+_local = threading.local()
+
+
+def activar(fichero_pstats=None, resumen_al_salir=True):
+    """
+    Empieza a medir. Si se indica fichero_pstats, se guarda en él el perfil
+    de cProfile al terminar.
+    """
+    global ACTIVO, _inicio, _perfilador, _fichero_pstats
+    import tracemalloc
+    tracemalloc.start()
+    ACTIVO = True
+    _inicio = (time.perf_counter(), time.process_time())
+    _fichero_pstats = fichero_pstats
+    if fichero_pstats:
+        import cProfile
+        _perfilador = cProfile.Profile()
+        _perfilador.enable()
+    if resumen_al_salir:
+        atexit.register(terminar)
+
+
+def desde_argv(argv):
+    """
+    Quita de argv la opción --profile[=FICHERO] y, si estaba, empieza a
+    medir. Devuelve argv.
+    """
+    for i, argumento in enumerate(argv[1:], 1):
+        if argumento == '--profile' or argumento.startswith('--profile='):
+            del argv[i]
+            activar(argumento.partition('=')[2] or None)
+            break
+    return argv
+
+
+def _etapa(nombre):
+    try:
+        return ETAPAS[nombre]
+    except KeyError:
+        datos = ETAPAS[nombre] = [0, 0, 0.0, 0.0, 0]
+        return datos
+
+
+def contar(nombre, filas):
+    """
+    Suma filas a las filas procesadas en una etapa.
+    """
+    if ACTIVO:
+        _etapa(nombre)[1] += filas
+
+
+def _pila():
+    try:
+        return _local.pila
+    except AttributeError:
+        pila = _local.pila = []
+        return pila
+
+
+class _Medida(object):
+    """
+    Contexto que suma a una etapa el tiempo y la memoria de su bloque, menos
+    los de las medidas que se hacen dentro de él. El inicio de cada bloque se
+    guarda en una pila, así que el mismo _Medida se puede usar en llamadas
+    anidadas o recursivas.
+    """
+    __slots__ = ('datos',)
+
+    def __init__(self, nombre):
+        self.datos = _etapa(nombre)
+
+    def __enter__(self):
+        import tracemalloc
+        # Inicio (real, CPU, memoria) y lo medido dentro por otras medidas
+        _pila().append([time.perf_counter(), time.process_time(),
+                        tracemalloc.get_traced_memory()[0], 0.0, 0.0, 0])
+        return self
+
+    def __exit__(self, *excepcion):
+        import tracemalloc
+        pared = time.perf_counter()
+        cpu = time.process_time()
+        memoria = tracemalloc.get_traced_memory()[0]
+        pila = _pila()
+        inicio = pila.pop()
+        pared, cpu, memoria = pared - inicio[0], cpu - inicio[1], memoria - inicio[2]
+        datos = self.datos
+        datos[0] += 1
+        datos[2] += pared - inicio[3]
+        datos[3] += cpu - inicio[4]
+        datos[4] += memoria - inicio[5]
+        if pila:
+            # El bloque completo se descuenta de la medida que lo contiene
+            padre = pila[-1]
+            padre[3] += pared
+            padre[4] += cpu
+            padre[5] += memoria
+        return False
+
+
+def etapa(nombre):
+    """
+    Contexto que mide su bloque como una llamada a la etapa nombre.
+    """
+    if not ACTIVO:
+        return contextlib.nullcontext()
+    return _Medida(nombre)
+
+
+def medir(nombre, funcion, filas=False):
+    """
+    Devuelve funcion tal cual o, si se está midiendo, una función que mide
+    cada llamada en la etapa nombre (y la cuenta como una fila si filas).
+    """
+    if not ACTIVO:
+        return funcion
+    medida = _Medida(nombre)
+    datos = medida.datos
+
+    def medida_funcion(*args, **kwargs):
+        with medida:
+            resultado = funcion(*args, **kwargs)
+        if filas:
+            datos[1] += 1
+        return resultado
+    return medida_funcion
+
+
+def iterar(nombre, iterable):
+    """
+    Devuelve iterable tal cual o, si se está midiendo, un generador que mide
+    cada next() en la etapa nombre y cuenta los elementos como filas.
+    """
+    if not ACTIVO:
+        return iterable
+
+    def medido():
+        iterador = iter(iterable)
+        siguiente = medir(nombre, iterador.__next__, filas=True)
+        while True:
+            try:
+                elemento = siguiente()
+            except StopIteration:
+                return
+            yield elemento
+    return medido()
+
+
+def extraer():
+    """
+    Devuelve las etapas medidas hasta ahora y las pone a cero (para enviar
+    las de un proceso a otro, ver sumar).
+    """
+    etapas = {nombre: list(datos) for nombre, datos in ETAPAS.items()}
+    for datos in ETAPAS.values():
+        datos[:] = [0, 0, 0.0, 0.0, 0]
+    return etapas
+
+
+def sumar(etapas):
+    """
+    Suma las etapas de extraer() (p. ej. de otro proceso) a las de éste.
+    """
+    for nombre, otros in etapas.items():
+        datos = _etapa(nombre)
+        for i, valor in enumerate(otros):
+            datos[i] += valor
+
+
+def resumen(output=sys.stderr):
+    """
+    Muestra la tabla de etapas.
+    """
+    import tracemalloc
+    print('%-16s %9s %10s %10s %10s %12s' % (
+        'etapa', 'llamadas', 'filas', 'real (s)', 'CPU (s)', 'memoria KiB'), file=output)
+    for nombre, (llamadas, filas, pared, cpu, memoria) in ETAPAS.items():
+        print('%-16s %9d %10s %10.3f %10.3f %12.1f' % (
+            nombre, llamadas, filas or '', pared, cpu, memoria / 1024), file=output)
+    if _inicio is not None:
+        pico = tracemalloc.get_traced_memory()[1] if tracemalloc.is_tracing() else 0
+        print('%-16s %9s %10s %10.3f %10.3f %12s' % (
+            'total', '', '', time.perf_counter() - _inicio[0],
+            time.process_time() - _inicio[1], 'pico %.1f' % (pico / 1024)), file=output)
+
+
+def terminar():
+    """
+    Deja de medir, guarda el perfil de cProfile y muestra el resumen.
+    """
+    global ACTIVO
+    if not ACTIVO:
+        return
+    if _perfilador is not None:
+        _perfilador.disable()
+        _perfilador.dump_stats(_fichero_pstats)
+        print('perfil de cProfile guardado en %s' % _fichero_pstats, file=sys.stderr)
+    resumen()
+    ACTIVO = False
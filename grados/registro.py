@@ -0,0 +1,141 @@
+"""
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+
+"""
+Descripción:
+============
+Registros compactos de los datos parseados de cada titulación.
+
+Los parsers de grados.ugr no construyen los diccionarios del formato de
+salida: cada titulación es un Titulacion (total, facultad, hombres y
+mujeres) y cada sexo un Sexo, con los contadores en tuplas de posición fija
+(en el orden de EDADES y de VIAS_ACCESO) en lugar de diccionarios. Ambas
+clases usan __slots__, así que no tienen un __dict__ por instancia.
+
+Los diccionarios del formato de salida sólo se construyen al escribir
+(a_json()), una titulación cada vez. Los campos edades y via_acceso de un
+Sexo que no se han asignado no aparecen en la salida, como las claves que
+no estaban en los diccionarios.
+
+Ejemplo de uso:
+
+    datos = Titulacion(54, 'FACULTAD DE CIENCIAS POLÍTICAS Y SOCIOLOGÍA',
+                       Sexo(20, edades=(...)), Sexo(34, edades=(...)))
+    datos.mujeres.contador('edades', 18)
+    json.dumps(datos.a_json())
+"""
+
+from grados.upo import EDADES, VIAS_ACCESO
+
+
+# Claves de los contadores de cada campo de Sexo
+CLAVES = {
+    'edades': EDADES,
+    'via_acceso': VIAS_ACCESO,
+}
+
+
+class Sexo(object):
+    """
+    Total y contadores de los matriculados de un sexo en una titulación.
+    - edades - Tupla con un contador por grupo de edad (EDADES), o None
+    - via_acceso - Tupla con un contador por vía de acceso (VIAS_ACCESO), o
+      None
+    """
+    __slots__ = ('total', 'edades', 'via_acceso')
+
+    def __init__(self, total, **contadores):
+        self.total = total
+        for campo, valores in contadores.items():
+            setattr(self, campo, valores)
+
+    def campos(self):
+        """
+        Nombres de los campos de contadores asignados.
+        """
+        return [campo for campo in CLAVES if hasattr(self, campo)]
+
+    def contador(self, campo, clave):
+        """
+        Valor del contador de clave (una edad o una vía de acceso) en campo.
+        """
+        return getattr(self, campo)[CLAVES[campo].index(clave)]
+
+    def update(self, otro):
+        """
+        Copia en este registro el total y los contadores asignados de otro.
+        """
+        self.total = otro.total
+        for campo in otro.campos():
+            setattr(self, campo, getattr(otro, campo))
+
+    def a_json(self):
+        datos = {'total': self.total}
+        for campo in self.campos():
+            valores = getattr(self, campo)
+            datos[campo] = None if valores is None else dict(zip(CLAVES[campo], valores))
+        return datos
+
+    def __eq__(self, otro):
+        return isinstance(otro, Sexo) and self.a_json() == otro.a_json()
+
+    def __repr__(self):
+        return 'Sexo(%s)' % ', '.join(
+            [repr(self.total)] + ['%s=%r' % (c, getattr(self, c)) for c in self.campos()])
+
+
+class Titulacion(object):
+    """
+    Datos de una titulación: total, facultad y un Sexo para hombres y otro
+    para mujeres. total_facultad es el total de la facultad según el informe
+    (no forma parte de la salida, ver grados.agregados).
+    """
+    __slots__ = ('total', 'facultad', 'hombres', 'mujeres', 'total_facultad')
+
+    def __init__(self, total, facultad, hombres, mujeres, total_facultad=None):
+        self.total = total
+        self.facultad = facultad
+        self.hombres = hombres
+        self.mujeres = mujeres
+        self.total_facultad = total_facultad
+
+    def a_json(self):
+        """
+        Diccionario del formato de salida de los scripts.
+        """
+        return {
+            'total': self.total,
+            'facultad': self.facultad,
+            'hombres': self.hombres.a_json(),
+            'mujeres': self.mujeres.a_json(),
+        }
+
+    def __eq__(self, otro):
+        return isinstance(otro, Titulacion) and self.a_json() == otro.a_json()
+
+    def __repr__(self):
+        return 'Titulacion(%r, %r, %r, %r)' % (
+            self.total, self.facultad, self.hombres, self.mujeres)
+
+
+def a_json(datos):
+    """
+    Devuelve datos en el formato de salida: convierte los registros y deja
+    igual los diccionarios (p. ej. los leídos de un JSON).
+    """
+    if isinstance(datos, Titulacion):
+        return datos.a_json()
+    return datos
@@ -0,0 +1,144 @@
+"""
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+
+"""
+Descripción:
+============
+Escritura incremental de los resultados. Cada titulación se escribe (y se
+vuelca a disco) en cuanto está disponible, sin construir antes la cadena JSON
+completa.
+
+- escribir_json genera exactamente los mismos bytes que
+  json.dumps(dict(entradas)) si ninguna titulación se repite. Si se repite
+  (p. ej. varias filas sin titulación), su clave se escribe cada vez, porque
+  las anteriores ya están escritas; json.load da entonces el mismo
+  diccionario que dict(entradas): la última de las repetidas, en la posición
+  de la primera.
+- escribir_ndjson escribe una línea JSON por titulación, con el nombre en la
+  clave 'titulacion':
+
+    {"titulacion": "GRADO EN SOCIOLOGÍA", "total": 54, "hombres": {...}, ...}
+
+- normalizar convierte el formato antiguo de data/nuevo_edad.json al formato
+  de salida actual.
+- permisos_por_defecto da a un temporal de tempfile.mkstemp (que se crea con
+  permisos 0600) los permisos de un fichero nuevo, antes de cambiarlo por el
+  definitivo con os.replace.
+
+Los informes tienen filas sin titulación, que los parsers generan con
+titulacion None. Como json.dump, escribir_json escribe su clave como "null",
+así que al leer el JSON vuelve como la cadena 'null'; sin_titulacion()
+reconoce ambas.
+"""
+
+import json
+import os
+
+from grados import perfil
+from grados.registro import a_json
+
+# Umask del proceso. os.umask sólo la devuelve cambiándola, lo que afectaría
+# a los demás hilos: se lee una vez, al importar el módulo
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+
+def sin_titulacion(titulacion):
+    """
+    Indica si titulacion es la de las filas sin titulación: None, o 'null' en
+    los datos leídos de un JSON.
+    """
+    return titulacion is None or titulacion == 'null'
+
+
+def escribir_json(entradas, output):
+    """
+    Escribe un objeto JSON {titulacion: datos}. Las titulaciones repetidas se
+    escriben cada vez (ver la descripción del módulo).
+    - entradas - Iterable de pares (titulacion, datos), con datos en un
+      registro de grados.registro o ya en el formato de salida
+    - output - Fichero abierto en modo texto
+    """
+    dumps = perfil.medir('json', json.dumps)
+    escribir = perfil.medir('escritura', output.write)
+    volcar = perfil.medir('escritura', output.flush)
+
+    separador = ''
+    escribir('{')
+    for titulacion, datos in entradas:
+        # La clave None se escribe como json.dump: "null"
+        clave = '"null"' if titulacion is None else dumps(titulacion)
+        escribir(separador + clave + ': ' + dumps(a_json(datos)))
+        volcar()
+        separador = ', '
+    escribir('}')
+
+
+def escribir_ndjson(entradas, output):
+    """
+    Escribe una línea JSON por titulación.
+    - entradas - Iterable de pares (titulacion, datos), como en escribir_json
+    - output - Fichero abierto en modo texto
+    """
+    dumps = perfil.medir('json', json.dumps)
+    escribir = perfil.medir('escritura', output.write)
+    volcar = perfil.medir('escritura', output.flush)
+
+    for titulacion, datos in entradas:
+        linea = {'titulacion': titulacion}
+        linea.update(a_json(datos))
+        escribir(dumps(linea) + '\n')
+        volcar()
+
+
+def leer_ndjson(stream):
+    """
+    Genera los pares (titulacion, datos) de un fichero NDJSON.
+    """
+    for linea in stream:
+        if linea.strip():
+            datos = json.loads(linea)
+            yield datos.pop('titulacion'), datos
+
+
+def normalizar(data):
+    """
+    Devuelve data en el formato de nuevas_matriculaciones_grado.py. Admite
+    también el formato antiguo de data/nuevo_edad.json: una lista
+    [hombres, mujeres] de diccionarios {titulacion: [total, edades]}.
+    """
+    if not isinstance(data, list):
+        return data
+
+    normalizado = {}
+    for sexo, por_titulacion in zip(('hombres', 'mujeres'), data):
+        for titulacion, (total_sexo, edades) in por_titulacion.items():
+            if total_sexo is None:
+                # Filas sin titulación
+                continue
+            datos = normalizado.setdefault(titulacion, {'total': 0})
+            datos['total'] = datos['total'] + total_sexo
+            datos[sexo] = {'total': total_sexo, 'edades': edades}
+    return normalizado
+
+
+def permisos_por_defecto(filename):
+    """
+    Da a filename los permisos de un fichero nuevo: 0666 menos la umask del
+    proceso al empezar (p. ej. 0644), los mismos que tendría escrito con
+    open().
+    """
+    os.chmod(filename, 0o666 & ~_UMASK)
@@ -0,0 +1,201 @@
+"""
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+
+"""
+Descripción:
+============
+Serie temporal de matriculaciones en un directorio, a la que se añade cada
+curso sin reescribir los anteriores.
+
+El directorio contiene tres ficheros:
+
+- datos.ndjson: los datos completos de cada curso, una línea por titulación
+  (ver grados.salida.escribir_ndjson). Los cursos se añaden al final.
+- resumen.ndjson: una línea por curso y titulación con los totales y su
+  variación respecto al curso anterior, calculada al añadir el curso:
+
+    {"year": "2013", "titulacion": "GRADO EN SOCIOLOGÍA", "total": 54,
+     "hombres": 20, "mujeres": 34, "delta": -3, "crecimiento": -0.0526}
+
+  delta y crecimiento son None si la titulación no estaba el curso anterior
+  (o no tenía total). Las gráficas de evolución sólo necesitan leer este
+  fichero.
+- indice.json: la posición de cada curso en datos.ndjson, la longitud de
+  resumen.ndjson y los totales del último curso. Se reemplaza de forma
+  atómica después de escribir los otros dos ficheros, así que lo que quede
+  tras un fallo a medias se descarta al añadir el siguiente curso.
+
+Los cursos deben añadirse en orden (como textos, p. ej. '2012' o '2012-13') y
+deben contener el año (ver grados.consulta.year_de).
+
+Ejemplo de uso:
+
+    serie = Serie('serie')
+    serie.append('2013', json.load(open('2013.json')))
+    for fila in serie.resumen(titulacion='GRADO EN SOCIOLOGÍA'):
+        print(fila['year'], fila['total'], fila['crecimiento'])
+"""
+
+import io
+import json
+import os
+import tempfile
+
+from grados import salida
+from grados.consulta import year_de
+
+
+DATOS = 'datos.ndjson'
+RESUMEN = 'resumen.ndjson'
+INDICE = 'indice.json'
+VERSION = 1
+
+
+def _variacion(actual, anterior):
+    """
+    Devuelve (delta, crecimiento) de actual respecto a anterior.
+    """
+    if actual is None or anterior is None:
+        return None, None
+    delta = actual - anterior
+    return delta, round(delta / anterior, 4) if anterior else None
+
+
+class Serie(object):
+    """
+    Serie temporal guardada en un directorio.
+    """
+
+    def __init__(self, directorio):
+        self.directorio = directorio
+        try:
+            with open(self._ruta(INDICE)) as f:
+                self.indice = json.load(f)
+        except FileNotFoundError:
+            self.indice = {'version': VERSION, 'years': {}, 'resumen': 0, 'anterior': {}}
+        if self.indice['version'] != VERSION:
+            raise ValueError('Versión de la serie no soportada: %s' % self.indice['version'])
+
+    def _ruta(self, nombre):
+        return os.path.join(self.directorio, nombre)
+
+    @property
+    def years(self):
+        """
+        Cursos de la serie, en orden.
+        """
+        return list(self.indice['years'])
+
+    def _final_datos(self):
+        years = self.indice['years']
+        return years[self.years[-1]][1] if years else 0
+
+    def _escribir(self, nombre, longitud, lineas):
+        """
+        Añade lineas al fichero nombre a partir de la posición longitud (lo
+        que haya después no está en el índice) y devuelve la nueva longitud.
+        """
+        with open(self._ruta(nombre), 'a+b') as f:
+            f.truncate(longitud)
+            texto = io.TextIOWrapper(f, encoding='utf-8', newline='\n')
+            lineas(texto)
+            texto.flush()
+            os.fsync(f.fileno())
+            longitud = f.seek(0, os.SEEK_END)
+            texto.detach()
+        return longitud
+
+    def append(self, year, data):
+        """
+        Añade al final de la serie los datos de un curso, con el formato de
+        salida de los scripts (también se admite el formato antiguo de
+        data/nuevo_edad.json).
+        """
+        year = str(year)
+        if year_de(year) is None:
+            raise ValueError('El curso %s no indica el año' % year)
+        if self.years and year <= self.years[-1]:
+            raise ValueError('El curso %s no es posterior a %s' % (year, self.years[-1]))
+        data = salida.normalizar(data)
+        os.makedirs(self.directorio, exist_ok=True)
+
+        inicio = self._final_datos()
+        fin = self._escribir(DATOS, inicio,
+                             lambda f: salida.escribir_ndjson(data.items(), f))
+
+        anterior = self.indice['anterior']
+        filas = []
+        for titulacion, datos in data.items():
+            fila = {
+                'year': year,
+                'titulacion': titulacion,
+                'total': datos.get('total'),
+                'hombres': datos.get('hombres', {}).get('total'),
+                'mujeres': datos.get('mujeres', {}).get('total'),
+            }
+            fila['delta'], fila['crecimiento'] = _variacion(
+                fila['total'], anterior.get(titulacion))
+            filas.append(fila)
+
+        def escribir_resumen(f):
+            for fila in filas:
+                f.write(json.dumps(fila) + '\n')
+        longitud = self._escribir(RESUMEN, self.indice['resumen'], escribir_resumen)
+
+        indice = {
+            'version': VERSION,
+            'years': dict(self.indice['years']),
+            'resumen': longitud,
+            'anterior': {fila['titulacion']: fila['total'] for fila in filas},
+        }
+        indice['years'][year] = [inicio, fin]
+        fd, temporal = tempfile.mkstemp(dir=self.directorio, suffix='.tmp')
+        with os.fdopen(fd, 'w') as f:
+            json.dump(indice, f)
+        salida.permisos_por_defecto(temporal)
+        os.replace(temporal, self._ruta(INDICE))
+        self.indice = indice
+        return filas
+
+    def datos(self, year):
+        """
+        Devuelve los datos de un curso ({titulacion: datos}). Sólo se lee la
+        parte de datos.ndjson de ese curso.
+        """
+        inicio, fin = self.indice['years'][str(year)]
+        with open(self._ruta(DATOS), 'rb') as f:
+            f.seek(inicio)
+            texto = f.read(fin - inicio).decode('utf-8')
+        return dict(salida.leer_ndjson(texto.splitlines()))
+
+    def resumen(self, titulacion=None, years=None):
+        """
+        Genera las filas del resumen (ver la descripción del módulo), sólo
+        de una titulación o de unos cursos si se indican.
+        """
+        if not self.indice['resumen']:
+            return
+        if years is not None:
+            years = {str(year) for year in years}
+        with open(self._ruta(RESUMEN), 'rb') as f:
+            texto = f.read(self.indice['resumen']).decode('utf-8')
+        for linea in texto.splitlines():
+            fila = json.loads(linea)
+            if titulacion is not None and fila['titulacion'] != titulacion:
+                continue
+            if years is not None and fila['year'] not in years:
+                continue
+            yield fila
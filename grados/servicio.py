@@ -0,0 +1,355 @@
+"""
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+
+"""
+Descripción:
+============
+Servicio HTTP (asyncio, sólo biblioteca estándar) con los datos de un
+directorio de ficheros JSON por año, los que generan
+nuevas_matriculaciones_grado.py --batch o upo2json.py.
+
+Los datos se cargan una vez en un índice de grados.consulta y cada respuesta
+se serializa sólo la primera vez que se pide: después se sirve de memoria,
+con su ETag, y las peticiones con If-None-Match reciben 304 sin cuerpo. El
+directorio se revisa periódicamente y, cuando aparece o cambia un JSON, el
+índice se reconstruye (en otro hilo) y se vacía la caché de respuestas. Si
+no se puede reconstruir (p. ej. un JSON escrito a medias), se avisa por la
+salida de error, se siguen sirviendo los datos anteriores y se vuelve a
+intentar cuando los ficheros cambien otra vez.
+
+Los errores inesperados al calcular una respuesta se muestran por la salida
+de error y se responden con un 500, sin cerrar la conexión.
+
+Rutas (GET o HEAD; year es opcional en todas):
+
+- /years: lista de años.
+- /titulaciones?year=2012: nombres de las titulaciones.
+- /titulacion/NOMBRE?year=2012: {año: datos} de una titulación.
+- /facultad/NOMBRE?year=2012: {año: datos} sumando sus titulaciones.
+- /total?year=2012: {año: datos} sumando todas las titulaciones.
+- /consulta?titulacion=...&sexo=...: resultados de Indice.consultar, con los
+  mismos parámetros que consulta.py.
+
+Los nombres no distinguen mayúsculas ni tildes (ver grados.consulta.normalizar).
+Las filas sin titulación de los informes (la clave "null" de los JSON) no se
+listan ni se suman.
+
+Ejemplo de uso:
+
+    asyncio.run(servir('datos', port=8080))
+"""
+
+import asyncio
+import glob
+import hashlib
+import json
+import os
+import sys
+import traceback
+from urllib.parse import parse_qsl, unquote, urlsplit
+
+from grados import perfil, salida, vigilancia
+from grados.consulta import Indice, normalizar
+
+
+SEXOS = ('hombres', 'mujeres')
+
+# Número máximo de respuestas en la caché (se vacía al llegar a él)
+MAXIMO_RESPUESTAS = 4096
+
+ESTADOS = {
+    200: 'OK',
+    304: 'Not Modified',
+    400: 'Bad Request',
+    404: 'Not Found',
+    405: 'Method Not Allowed',
+    500: 'Internal Server Error',
+}
+
+
+class ErrorHTTP(Exception):
+    def __init__(self, estado, mensaje):
+        super().__init__(mensaje)
+        self.estado = estado
+
+
+def sumar(lista):
+    """
+    Suma los datos (formato de salida de los scripts) de varias titulaciones.
+    Los totales que faltan (None) no se suman; los grupos de edad y vías de
+    acceso se suman si alguna titulación los tiene (los que son None, de
+    titulaciones que sólo están en uno de los informes, no se suman).
+    """
+    suma = {'total': 0, 'titulaciones': 0}
+    for datos in lista:
+        suma['titulaciones'] = suma['titulaciones'] + 1
+        suma['total'] = suma['total'] + (datos.get('total') or 0)
+        for sexo in SEXOS:
+            sexo_data = datos.get(sexo)
+            if not sexo_data:
+                continue
+            sexo_suma = suma.setdefault(sexo, {'total': 0})
+            sexo_suma['total'] = sexo_suma['total'] + (sexo_data.get('total') or 0)
+            for clave in ('edades', 'via_acceso'):
+                if sexo_data.get(clave) is not None:
+                    grupos = sexo_suma.setdefault(clave, {})
+                    for grupo, n in sexo_data[clave].items():
+                        grupos[grupo] = grupos.get(grupo, 0) + n
+    return suma
+
+
+class Servicio(object):
+    """
+    Datos de un directorio y respuestas ya serializadas.
+    """
+
+    def __init__(self, directorio):
+        self.directorio = directorio
+        with perfil.etapa('indice'):
+            self.indice = Indice.cargar(directorio)
+        self.respuestas = {} # {ruta completa: (cuerpo, etag)}
+
+    def _ficheros(self):
+        return glob.glob(os.path.join(self.directorio, '*.json'))
+
+    def estado(self):
+        """
+        Estado actual de los JSON del directorio (ver grados.vigilancia.estado).
+        """
+        return vigilancia.estado(self._ficheros())
+
+    def cambiado(self):
+        """
+        Indica si algún JSON del directorio ha aparecido o cambiado.
+        """
+        return self.estado() != self.indice.estado
+
+    def recargar(self, indice=None):
+        """
+        Cambia el índice (si no se indica, se vuelve a cargar) y vacía la
+        caché de respuestas.
+        """
+        if indice is None:
+            indice = Indice.cargar(self.directorio)
+        self.indice, self.respuestas = indice, {}
+
+    def _registros(self, numeros, year):
+        resultado = {}
+        for i in numeros:
+            registro_year, titulacion, datos = self.indice.registros[i]
+            if salida.sin_titulacion(titulacion):
+                # Totales de la facultad o de la universidad, no una titulación
+                continue
+            if year is None or registro_year == year:
+                resultado.setdefault(registro_year, []).append((titulacion, datos))
+        return resultado
+
+    def _por_year(self, numeros, year):
+        """
+        {año: suma de los datos} de los registros indicados.
+        """
+        return {y: sumar(datos for _, datos in lista)
+                for y, lista in sorted(self._registros(numeros, year).items())}
+
+    def datos(self, ruta, parametros):
+        """
+        Devuelve el objeto (serializable con JSON) de una ruta.
+        """
+        indice = self.indice
+        year = parametros.get('year')
+        partes = ruta.strip('/').split('/', 1)
+        nombre = normalizar(unquote(partes[1])) if len(partes) > 1 else None
+
+        if partes == ['years']:
+            return sorted(indice.por_year)
+        if partes == ['titulaciones']:
+            numeros = indice.buscar(years=[year] if year else None)
+            return sorted({indice.registros[i][1] for i in numeros
+                           if not salida.sin_titulacion(indice.registros[i][1])})
+        if partes[0] == 'titulacion' and nombre:
+            if nombre not in indice.por_titulacion:
+                raise ErrorHTTP(404, 'No existe la titulación')
+            return {y: datos for y, lista in sorted(self._registros(
+                sorted(indice.por_titulacion[nombre]), year).items())
+                for _, datos in lista}
+        if partes[0] == 'facultad' and nombre:
+            if nombre not in indice.por_facultad:
+                raise ErrorHTTP(404, 'No existe la facultad')
+            return self._por_year(indice.por_facultad[nombre], year)
+        if partes == ['total']:
+            return self._por_year(range(len(indice.registros)), year)
+        if partes == ['consulta']:
+            criterios = dict(parametros)
+            if 'years' in criterios:
+                inicio, _, fin = criterios['years'].partition('-')
+                criterios['years'] = range(int(inicio), int(fin or inicio) + 1)
+            if 'edad' in criterios:
+                criterios['edad'] = int(criterios['edad'])
+            criterios.pop('year', None)
+            return [list(r) for r in indice.consultar(**criterios)]
+        raise ErrorHTTP(404, 'Ruta desconocida')
+
+    def respuesta(self, objetivo):
+        """
+        Devuelve (cuerpo, etag) de una ruta con sus parámetros, de la caché
+        si ya se ha servido antes.
+        """
+        try:
+            return self.respuestas[objetivo]
+        except KeyError:
+            pass
+        partes = urlsplit(objetivo)
+        try:
+            parametros = dict(parse_qsl(partes.query))
+            datos = self.datos(partes.path, parametros)
+            cuerpo = json.dumps(datos, ensure_ascii=False).encode('utf-8')
+        except ErrorHTTP:
+            raise
+        except (TypeError, ValueError) as e:
+            raise ErrorHTTP(400, str(e))
+        except Exception as e:
+            traceback.print_exc(file=sys.stderr)
+            raise ErrorHTTP(500, 'Error interno: %s' % e)
+        etag = '"%s"' % hashlib.sha1(cuerpo).hexdigest()[:20]
+        if len(self.respuestas) >= MAXIMO_RESPUESTAS:
+            self.respuestas = {}
+        self.respuestas[objetivo] = cuerpo, etag
+        return cuerpo, etag
+
+
+async def _leer_peticion(reader):
+    """
+    Lee una petición HTTP/1.x. Devuelve (método, objetivo, versión,
+    cabeceras) o None si la conexión se ha cerrado.
+    """
+    linea = await reader.readline()
+    if not linea.strip():
+        return None
+    metodo, objetivo, version = linea.decode('latin-1').split()
+    cabeceras = {}
+    while True:
+        linea = await reader.readline()
+        if not linea.strip():
+            break
+        nombre, _, valor = linea.decode('latin-1').partition(':')
+        cabeceras[nombre.strip().lower()] = valor.strip()
+    return metodo, objetivo, version, cabeceras
+
+
+def _escribir_respuesta(writer, estado, cuerpo=b'', etag=None, cabeza=False,
+                        cerrar=False):
+    cabeceras = [
+        'HTTP/1.1 %d %s' % (estado, ESTADOS[estado]),
+        'Content-Type: application/json; charset=utf-8',
+        'Content-Length: %d' % len(cuerpo),
+        'Cache-Control: no-cache',
+    ]
+    if etag:
+        cabeceras.append('ETag: %s' % etag)
+    if cerrar:
+        cabeceras.append('Connection: close')
+    writer.write(('\r\n'.join(cabeceras) + '\r\n\r\n').encode('latin-1'))
+    if not cabeza and estado != 304:
+        writer.write(cuerpo)
+
+
+def atender(servicio):
+    """
+    Devuelve la función que atiende cada conexión (para asyncio.start_server).
+    Las conexiones se mantienen abiertas entre peticiones (keep-alive).
+    """
+    respuesta = perfil.medir('respuesta', servicio.respuesta, filas=True)
+
+    async def conexion(reader, writer):
+        try:
+            while True:
+                try:
+                    peticion = await _leer_peticion(reader)
+                except ValueError:
+                    _escribir_respuesta(writer, 400, cerrar=True)
+                    break
+                if peticion is None:
+                    break
+                metodo, objetivo, version, cabeceras = peticion
+                cerrar = (cabeceras.get('connection', '').lower() == 'close' or
+                          version == 'HTTP/1.0')
+
+                if metodo not in ('GET', 'HEAD'):
+                    _escribir_respuesta(writer, 405, cerrar=cerrar)
+                else:
+                    try:
+                        cuerpo, etag = respuesta(objetivo)
+                    except ErrorHTTP as e:
+                        cuerpo = json.dumps({'error': str(e)}, ensure_ascii=False)
+                        _escribir_respuesta(writer, e.estado, cuerpo.encode('utf-8'),
+                                            cabeza=metodo == 'HEAD', cerrar=cerrar)
+                    else:
+                        estado = 304 if cabeceras.get('if-none-match') == etag else 200
+                        _escribir_respuesta(writer, estado, cuerpo, etag,
+                                            cabeza=metodo == 'HEAD', cerrar=cerrar)
+                await writer.drain()
+                if cerrar:
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+    return conexion
+
+
+async def vigilar(servicio, intervalo):
+    """
+    Revisa el directorio cada intervalo segundos y recarga los datos si ha
+    cambiado algún JSON. Si la recarga falla, se mantienen los datos
+    anteriores y no se vuelve a intentar hasta que los ficheros cambien.
+    """
+    loop = asyncio.get_running_loop()
+    cargar = perfil.medir('indice', Indice.cargar)
+    fallido = None # Estado de los ficheros con el que ha fallado la recarga
+    while True:
+        await asyncio.sleep(intervalo)
+        estado = servicio.estado()
+        if estado == servicio.indice.estado or estado == fallido:
+            continue
+        # El índice se construye en otro hilo, pero se cambia en éste
+        # para no mezclarlo con respuestas que se estén calculando
+        try:
+            indice = await loop.run_in_executor(None, cargar, servicio.directorio)
+        except Exception as e:
+            fallido = estado
+            print('no se ha podido recargar %s (%s: %s); se siguen sirviendo '
+                  'los datos anteriores' % (servicio.directorio, type(e).__name__, e),
+                  file=sys.stderr)
+            continue
+        fallido = None
+        servicio.recargar(indice)
+        print('recargado %s: %d registros' % (
+            servicio.directorio, len(servicio.indice.registros)), file=sys.stderr)
+
+
+async def servir(directorio, host='127.0.0.1', port=8080, intervalo=2.0):
+    """
+    Sirve los datos de directorio hasta que se interrumpa.
+    """
+    servicio = Servicio(directorio)
+    servidor = await asyncio.start_server(atender(servicio), host, port)
+    revision = asyncio.ensure_future(vigilar(servicio, intervalo))
+    print('sirviendo %s en http://%s:%d/' % (directorio, host, port), file=sys.stderr)
+    try:
+        async with servidor:
+            await servidor.serve_forever()
+    finally:
+        revision.cancel()
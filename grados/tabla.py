@@ -0,0 +1,349 @@
+"""
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+--------------------------------------------------------------------------------
+
+Data source: Acceso identificado de la Universidad de Granada
+
+"""
+
+"""
+Descripción:
+============
+Lectura incremental de las tablas HTML que exporta Acceso Identificado.
+
+En lugar de construir el árbol completo del documento (BeautifulSoup), el
+fichero se lee por bloques y se pasa a un parser por eventos (html.parser).
+Cada fila (<tr>) del primer <tbody> del <body> se entrega en cuanto se cierra,
+de modo que la memoria necesaria no depende del tamaño del informe.
+
+Cada fila es una lista con el texto de sus celdas (<td>), equivalente a
+td.get_text(). Las celdas que tienen los atributos colspan o rowspan se indican
+en los diccionarios fila.colspan y fila.rowspan ({posición: valor}).
+
+Como los informes son generados por un programa y todas las filas tienen la
+misma forma (<tr><td>texto</td>...</tr>), por defecto las filas se extraen
+directamente del texto con expresiones regulares precompiladas, sin pasar
+cada etiqueta por html.parser. El resultado es el mismo, y se comprueba:
+
+- La entrada al primer <tbody> se localiza con html.parser.
+- Cada fila debe estar formada sólo por celdas <td> con texto (sin otras
+  etiquetas ni comentarios); entre filas sólo puede haber texto.
+- Una de cada MUESTRA filas (y las primeras) se vuelve a leer con
+  html.parser y debe dar las mismas celdas.
+
+Si algo no se cumple, el resto del documento se lee con html.parser desde
+esa fila. Con la variable de entorno GRADOS_LECTOR=html (o rapido=False) se
+usa siempre html.parser.
+
+Ejemplo de uso:
+
+    html_doc = open(filename, 'r', encoding='latin-1')
+    for tr_male, tr_female in male_and_female(filas(html_doc, cabecera=10)):
+        titulacion = tr_male[2]
+        ...
+"""
+
+import codecs
+import html
+import os
+import re
+from html.parser import HTMLParser
+from itertools import chain, islice
+
+from grados import perfil
+
+
+# Tamaño de los bloques leídos del fichero de entrada
+TAMANO_BLOQUE = 64 * 1024
+
+# Lectura rápida con expresiones regulares (ver filas)
+RAPIDO = os.environ.get('GRADOS_LECTOR', 'rapido') != 'html'
+
+# Una de cada MUESTRA filas de la lectura rápida se comprueba con html.parser,
+# además de las PRIMERAS primeras
+MUESTRA = 256
+PRIMERAS = 16
+
+# Atributos de una etiqueta de apertura (no vacía, como <td/>)
+_ATRIBUTOS = r'(?:\s[^<>]*)?(?<!/)>'
+_BODY = re.compile(r'<body' + _ATRIBUTOS, re.I)
+_TBODY = re.compile(r'<tbody' + _ATRIBUTOS, re.I)
+# Una fila completa, sólo con celdas de texto (el texto que la precede se
+# ignora, como en LectorFilas)
+_TR = re.compile(r'[^<]*(<tr%s([^<]*(?:<td%s[^<]*</td\s*>[^<]*)*)</tr\s*>)'
+                 % (_ATRIBUTOS, _ATRIBUTOS), re.I)
+_TD = re.compile(r'<td((?:\s[^<>]*)?)(?<!/)>([^<]*)</td\s*>', re.I)
+_TEXTO_TD = re.compile(r'<td%s([^<]*)</td\s*>' % _ATRIBUTOS, re.I)
+_ATRIBUTO = re.compile(r'([^\s=/]+)\s*=\s*(?:"([^"]*)"|\'([^\']*)\'|([^\s"\'=<>`]+))')
+_FIN_TBODY = re.compile(r'[^<]*</tbody\s*>', re.I)
+_FIN_TR = re.compile(r'</tr\s*>', re.I)
+
+
+class Fila(list):
+    """
+    Lista con el texto de las celdas de una fila. Los atributos colspan y
+    rowspan son diccionarios {posición: valor} con las celdas que tienen ese
+    atributo.
+    """
+    __slots__ = ('colspan', 'rowspan')
+
+    def __init__(self):
+        super().__init__()
+        self.colspan = {}
+        self.rowspan = {}
+
+
+class LectorFilas(HTMLParser):
+    """
+    Parser por eventos que acumula en self.filas las filas completas del
+    primer <tbody> del documento. Quien lo use debe vaciar self.filas
+    después de cada llamada a feed().
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.filas = []
+        self._en_body = False
+        self._tbody = 0 # Profundidad dentro del primer <tbody>
+        self._tbody_leido = False
+        self._fila = None
+        self._celda = None
+
+    def handle_starttag(self, tag, attrs):
+        if tag == 'td':
+            if self._fila is not None:
+                self._cerrar_celda()
+                self._celda = []
+                for nombre, valor in attrs:
+                    if nombre == 'colspan':
+                        self._fila.colspan[len(self._fila)] = int(valor)
+                    elif nombre == 'rowspan':
+                        self._fila.rowspan[len(self._fila)] = int(valor)
+        elif tag == 'tr':
+            if self._tbody:
+                self._cerrar_fila()
+                self._fila = Fila()
+        elif tag == 'tbody':
+            if self._en_body and not self._tbody_leido:
+                self._tbody = self._tbody + 1
+        elif tag == 'body':
+            self._en_body = True
+
+    def handle_endtag(self, tag):
+        if tag == 'td':
+            self._cerrar_celda()
+        elif tag == 'tr':
+            self._cerrar_fila()
+        elif tag == 'tbody':
+            if self._tbody:
+                self._cerrar_fila()
+                self._tbody = self._tbody - 1
+                self._tbody_leido = self._tbody == 0
+
+    def handle_data(self, data):
+        if self._celda is not None:
+            self._celda.append(data)
+
+    def close(self):
+        super().close()
+        self._cerrar_fila()
+
+    def _cerrar_celda(self):
+        if self._celda is not None:
+            self._fila.append(''.join(self._celda))
+            self._celda = None
+
+    def _cerrar_fila(self):
+        if self._fila is not None:
+            self._cerrar_celda()
+            self.filas.append(self._fila)
+            self._fila = None
+
+
+def _fila(html_fila):
+    """
+    Fila con las celdas de html_fila (el contenido de un <tr> que sólo tiene
+    celdas con texto).
+    """
+    fila = Fila()
+    if '=' not in html_fila and '&' not in html_fila:
+        # Sin atributos ni entidades (lo habitual): el texto tal cual
+        fila.extend(_TEXTO_TD.findall(html_fila))
+        return fila
+    for atributos, texto in _TD.findall(html_fila):
+        if atributos.strip():
+            for nombre, *valores in _ATRIBUTO.findall(atributos):
+                nombre = nombre.lower()
+                if nombre == 'colspan':
+                    fila.colspan[len(fila)] = int(''.join(valores))
+                elif nombre == 'rowspan':
+                    fila.rowspan[len(fila)] = int(''.join(valores))
+        if '&' in texto:
+            texto = html.unescape(texto)
+        fila.append(texto)
+    return fila
+
+
+def _con_html_parser(html_fila, fila):
+    """
+    Indica si html.parser lee en html_fila (un <tr> completo) la misma fila.
+    """
+    lector = LectorFilas()
+    lector.feed('<body><tbody>' + html_fila)
+    lector.close()
+    return (len(lector.filas) == 1 and lector.filas[0] == fila
+            and lector.filas[0].colspan == fila.colspan
+            and lector.filas[0].rowspan == fila.rowspan)
+
+
+def _extraer(texto, numero):
+    """
+    Extrae con las expresiones regulares las filas completas del principio de
+    texto; numero es el de filas extraídas antes (para elegir las que se
+    comprueban con html.parser). Devuelve (filas, posición donde terminan,
+    rechazada), con rechazada True si la fila siguiente está completa pero no
+    tiene la forma esperada.
+    """
+    leidas = []
+    posicion = 0
+    tr = _TR.match(texto)
+    while tr is not None:
+        fila = _fila(tr.group(2))
+        if numero < PRIMERAS or numero % MUESTRA == 0:
+            if not _con_html_parser(tr.group(1), fila):
+                return leidas, posicion, True
+        numero = numero + 1
+        posicion = tr.end()
+        leidas.append(fila)
+        tr = _TR.match(texto, posicion)
+    return leidas, posicion, False
+
+
+def _rapidas(bloques):
+    """
+    Genera las filas de los bloques de texto con las expresiones regulares.
+    Si el documento se sale de la forma esperada, el texto que queda se lee
+    con html.parser.
+    """
+    texto = ''
+    bloques = iter(bloques)
+
+    # Inicio del primer <tbody> del <body>, comprobado con html.parser
+    inicio = None
+    for bloque in bloques:
+        texto = texto + bloque
+        body = _BODY.search(texto)
+        tbody = body and _TBODY.search(texto, body.end())
+        if tbody:
+            inicio = tbody.end()
+            break
+    if inicio is not None:
+        prueba = LectorFilas()
+        prueba.feed(texto[:inicio])
+        if prueba._tbody != 1 or prueba._fila is not None or prueba.filas:
+            inicio = None
+    if inicio is None:
+        # Sin un <tbody> reconocible: todo con html.parser
+        yield from _con_lector(LectorFilas(), texto, bloques)
+        return
+    texto = texto[inicio:]
+
+    # Con --profile, el tiempo de las expresiones regulares se mide como el
+    # de html.parser en _con_lector
+    extraer = perfil.medir('html_rapido', _extraer)
+    numero = 0
+    while True:
+        leidas, posicion, rechazada = extraer(texto, numero)
+        numero = numero + len(leidas)
+        perfil.contar('html_rapido', len(leidas))
+        yield from leidas
+        texto = texto[posicion:]
+
+        if _FIN_TBODY.match(texto):
+            # Fin de la tabla: lo que sigue no se lee
+            return
+        bloque = None
+        if not rechazada and not _FIN_TR.search(texto):
+            # Falta el final de la fila siguiente
+            bloque = next(bloques, None)
+        if bloque is None:
+            # Una fila completa que no tiene la forma esperada, o el
+            # documento termina sin cerrar la tabla
+            break
+        texto = texto + bloque
+
+    # El resto se lee con html.parser, como si estuviera dentro del <tbody>
+    lector = LectorFilas()
+    lector.feed('<body><tbody>')
+    yield from _con_lector(lector, texto, bloques)
+
+
+def _con_lector(lector, texto, bloques):
+    """
+    Genera las filas que lee lector (html.parser) en texto y en los bloques
+    que faltan.
+    """
+    alimentar = perfil.medir('html', lector.feed)
+    for bloque in chain((texto,), bloques):
+        alimentar(bloque)
+        listas, lector.filas = lector.filas, []
+        perfil.contar('html', len(listas))
+        yield from listas
+    perfil.medir('html', lector.close)()
+    perfil.contar('html', len(lector.filas))
+    yield from lector.filas
+
+
+def filas(stream, cabecera=0, encoding='latin-1', tamano=TAMANO_BLOQUE, rapido=None):
+    """
+    Generador de las filas del primer <tbody> de un documento HTML.
+
+    - stream - Fichero abierto en modo texto o binario (se decodifica con
+      encoding)
+    - cabecera - Número de filas iniciales que se descartan
+    - rapido - Si es False, se usa sólo html.parser (por defecto, RAPIDO)
+    """
+    if rapido is None:
+        rapido = RAPIDO
+    decoder = codecs.getincrementaldecoder(encoding)()
+
+    # Con --profile se mide cada etapa (ver grados.perfil)
+    leer = perfil.medir('lectura', stream.read)
+    decodificar = perfil.medir('decodificacion', decoder.decode)
+
+    def bloques():
+        bloque = leer(tamano)
+        while bloque:
+            if isinstance(bloque, bytes):
+                bloque = decodificar(bloque)
+            yield bloque
+            bloque = leer(tamano)
+        final = decodificar(b'', final=True)
+        if final:
+            yield final
+
+    if rapido:
+        leidas = _rapidas(bloques())
+    else:
+        leidas = _con_lector(LectorFilas(), '', bloques())
+    return islice(leidas, cabecera, None)
+
+
+def male_and_female(tr_list):
+    """
+    Agrupa las filas de dos en dos: (fila de hombres, fila de mujeres).
+    """
+    it = iter(tr_list)
+    return zip(it, it)
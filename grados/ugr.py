@@ -0,0 +1,474 @@
+"""
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+--------------------------------------------------------------------------------
+
+Data source: Acceso identificado de la Universidad de Granada
+
+"""
+
+"""
+Descripción:
+============
+Parsers de los informes de nuevas matriculaciones por edades y por vías de
+acceso. Importar este módulo no tiene efectos secundarios: el lector de HTML
+(grados.tabla, que carga html.parser) sólo se importa al parsear.
+
+- parse_edades(stream) y parse_acceso(stream) generan los pares
+  (titulacion, datos) a medida que se leen las filas del informe, con datos
+  en un registro grados.registro.Titulacion (total, facultad, hombres y
+  mujeres); datos.a_json() lo convierte al formato de salida de los
+  scripts. dict(parse_edades(stream)) devuelve todos los datos. Las filas
+  del informe por edades se convierten por lotes de LOTE_EDADES (ver
+  parse_lote_edades).
+- merge(data, parcial) une en data los datos de otro informe.
+- fusionar(edades, acceso) une los dos informes a medida que se parsean, sin
+  esperar a tener uno de ellos completo.
+
+Ejemplo de uso:
+
+    data = dict(parse_edades(open(input_edades, 'r', encoding='latin-1')))
+    merge(data, parse_acceso(open(input_acceso, 'r', encoding='latin-1')))
+"""
+
+# Versión de los parsers (forma parte de la clave de la caché)
+VERSION = 6
+
+# Filas del informe por edades que se convierten juntas (debe ser par, para
+# no separar las parejas hombres/mujeres)
+LOTE_EDADES = 256
+
+
+def parse_tr_edades(td_list):
+    titulacion = td_list[2].replace('\n ', '')
+    if titulacion:
+        facultad = td_list[0]
+        try:
+            total = int(td_list[1].replace('.', ''))
+        except ValueError as e:
+            total = None
+        try:
+            total_titulacion = int(td_list[3].replace('.', ''))
+        except ValueError as e:
+            total_titulacion = None
+        total_sexo = int(td_list[20].replace('.', ''))
+        # Contadores en el orden de grados.registro.EDADES
+        edades = (
+            int(td_list[5].replace('.', '')), # <= 18
+            int(td_list[6].replace('.', '')), # 19
+            int(td_list[7].replace('.', '')),
+            int(td_list[8].replace('.', '')),
+            int(td_list[9].replace('.', '')),
+            int(td_list[10].replace('.', '')),
+            int(td_list[11].replace('.', '')),
+            int(td_list[12].replace('.', '')),
+            int(td_list[13].replace('.', '')),
+            int(td_list[14].replace('.', '')),
+            int(td_list[15].replace('.', '')),
+            int(td_list[16].replace('.', '')), # 29
+            int(td_list[17].replace('.', '')), # 30-34
+            int(td_list[18].replace('.', '')), # 35-39
+            int(td_list[19].replace('.', '')), # >= 40
+        )
+        return facultad, total, titulacion, total_titulacion, total_sexo, edades
+
+    return None, None, None, None, None, None
+
+
+def _total(texto):
+    """
+    int(texto) sin los puntos de los miles, o None si no es un número. Las
+    celdas vacías (la mayoría: el total de la facultad sólo está en su
+    primera fila) se descartan sin lanzar la excepción de int(), que cuesta
+    más que toda la conversión.
+    """
+    if not texto:
+        return None
+    try:
+        return int(texto.replace('.', ''))
+    except ValueError:
+        return None
+
+
+def parse_lote_edades(td_lists):
+    """
+    Devuelve lo mismo que [parse_tr_edades(td_list) for td_list in td_lists],
+    pero los números de las columnas 5 a 20 (edades y total del sexo) de
+    todas las filas se convierten de una vez: se unen, sin los puntos de los
+    miles, en un único texto '[n,n,...]' que lee json.loads (en C), en lugar
+    de llamar a replace() e int() por cada celda. Los totales de la facultad
+    y de la titulación se convierten con _total.
+
+    Si alguna de esas celdas no es un número sin signo (o falta, o sale un
+    número de valores distinto de 16 por fila), se vuelve a parse_tr_edades
+    fila a fila, que da los mismos resultados o los mismos errores que antes.
+    """
+    import json
+
+    resultados = []
+    celdas = []
+    for td_list in td_lists:
+        titulacion = td_list[2].replace('\n ', '')
+        if not titulacion:
+            resultados.append((None, None, None, None, None, None))
+            continue
+        if len(td_list) < 21:
+            return [parse_tr_edades(td_list) for td_list in td_lists]
+        resultados.append((td_list[0], _total(td_list[1]), titulacion,
+                           _total(td_list[3])))
+        celdas.append(','.join(td_list[5:21]))
+    if not celdas:
+        return resultados
+
+    texto = ','.join(celdas)
+    if '.' in texto:
+        texto = texto.replace('.', '')
+    # Sólo dígitos y comas: json.loads devuelve enteros (o falla, p. ej. con
+    # una celda vacía o con ceros a la izquierda, y se vuelve a int())
+    if not (texto.isascii() and texto.replace(',', '').isdigit()):
+        return [parse_tr_edades(td_list) for td_list in td_lists]
+    try:
+        valores = json.loads('[' + texto + ']')
+    except ValueError:
+        return [parse_tr_edades(td_list) for td_list in td_lists]
+    # Una celda con una coma dentro ('1,2') da un valor de más y desplazaría
+    # todos los siguientes: fila a fila, int() la rechaza
+    if len(valores) != 16 * len(celdas):
+        return [parse_tr_edades(td_list) for td_list in td_lists]
+
+    i = 0
+    for r, resultado in enumerate(resultados):
+        if resultado[2] is not None:
+            resultados[r] = resultado + (valores[i + 15], tuple(valores[i:i + 15]))
+            i = i + 16
+    return resultados
+
+
+# Vías de acceso de la salida, en el orden de sus contadores
+VIAS_ACCESO = ('PAU', 'Credencial', 'F.P.', 'Titulados', 'Mayores 25', 'Otros')
+
+# Columna de la primera vía de acceso en las filas de datos (antes están la
+# facultad, el total, la titulación, su total y el sexo)
+PRIMERA_VIA = 5
+
+# Vía de acceso de cada columna de la tabla cuando la cabecera no permite
+# deducirla (la disposición habitual de los informes)
+COLUMNAS_ACCESO = (None,) * PRIMERA_VIA + tuple(range(len(VIAS_ACCESO)))
+
+
+def via_acceso(texto):
+    """
+    Posición en VIAS_ACCESO de la vía descrita por el texto de una celda de
+    la cabecera (o por el campo ingreso de los datos de la UPO, ver
+    grados.upo), o None si el texto no es el de una vía de acceso.
+    """
+    texto = texto.upper()
+    if 'CREDENCIAL' in texto:
+        return VIAS_ACCESO.index('Credencial')
+    if 'MAYOR' in texto:
+        # Las vías para mayores de 40 o 45 años de algunos cursos van a Otros
+        return VIAS_ACCESO.index('Mayores 25' if '25' in texto else 'Otros')
+    if 'TITULAD' in texto:
+        return VIAS_ACCESO.index('Titulados')
+    if 'F.P' in texto or 'FP' in texto or 'FORMACI' in texto or 'CICLO' in texto:
+        return VIAS_ACCESO.index('F.P.')
+    if 'PAU' in texto or 'P.A.U' in texto or 'SELECTIVIDAD' in texto or 'BACH' in texto:
+        return VIAS_ACCESO.index('PAU')
+    if 'OTR' in texto:
+        return VIAS_ACCESO.index('Otros')
+    return None
+
+
+def rejilla(filas_cabecera):
+    """
+    Coloca las celdas de las filas en la rejilla de la tabla, teniendo en
+    cuenta colspan y rowspan. Devuelve, para cada fila, el texto de cada
+    columna ({columna: texto}), incluidas las que cubren celdas de filas
+    anteriores con rowspan.
+    """
+    heredadas = {} # {(fila, columna): texto} de las celdas con rowspan
+    resultado = []
+    for f, fila in enumerate(filas_cabecera):
+        columnas = {}
+        columna = 0
+        for i, texto in enumerate(fila):
+            while (f, columna) in heredadas:
+                columna = columna + 1
+            ancho = max(fila.colspan.get(i, 1), 1)
+            for c in range(columna, columna + ancho):
+                columnas[c] = texto
+                for r in range(f + 1, f + fila.rowspan.get(i, 1)):
+                    heredadas[(r, c)] = texto
+            columna = columna + ancho
+        for (r, c), texto in heredadas.items():
+            if r == f:
+                columnas[c] = texto
+        resultado.append(columnas)
+    return resultado
+
+
+class PlanAcceso(object):
+    """
+    Plan de lectura de las filas del informe por vías de acceso.
+
+    columnas indica la vía de acceso (posición en VIAS_ACCESO, o None) de cada
+    columna de la tabla. Para cada forma de fila distinta (número de celdas y
+    celdas con colspan) se calcula una sola vez la lista de pasos
+    (celda, vía), de modo que leer una fila no recorre sus celdas buscando
+    colspan ni comprueba con expresiones regulares cada celda.
+    """
+
+    def __init__(self, columnas=COLUMNAS_ACCESO):
+        self.columnas = tuple(columnas)
+        self._pasos = {}
+
+    @classmethod
+    def desde_cabecera(cls, filas_cabecera):
+        """
+        Deduce el plan de las filas de cabecera del informe: se usa la fila
+        en la que más columnas tienen el nombre de una vía de acceso. Si
+        ninguna nombra al menos tres vías distintas, se usa COLUMNAS_ACCESO.
+        """
+        mejor = {}
+        for columnas in rejilla(filas_cabecera):
+            vias = {}
+            for columna, texto in columnas.items():
+                via = via_acceso(texto)
+                if via is not None:
+                    vias[columna] = via
+            if len(set(vias.values())) >= 3 and len(vias) >= len(mejor):
+                mejor = vias
+        if not mejor:
+            return cls()
+        return cls(mejor.get(c) for c in range(max(mejor) + 1))
+
+    def pasos(self, td_list):
+        """
+        Lista de (celda, vía) de las filas con la misma forma que td_list.
+        """
+        firma = (len(td_list), tuple(td_list.colspan.items()))
+        try:
+            return self._pasos[firma]
+        except KeyError:
+            pass
+
+        pasos = []
+        columna = 0
+        # Las dos últimas celdas son el total del sexo y el porcentaje
+        for celda in range(len(td_list) - 2):
+            ancho = td_list.colspan.get(celda)
+            if ancho is not None:
+                # Celdas vacías que ocupan varias vías
+                columna = columna + ancho
+                continue
+            if celda >= PRIMERA_VIA and columna < len(self.columnas) \
+                    and self.columnas[columna] is not None:
+                pasos.append((celda, self.columnas[columna]))
+            columna = columna + 1
+        self._pasos[firma] = pasos
+        return pasos
+
+    def __call__(self, td_list):
+        titulacion = td_list[2]
+        if titulacion:
+            facultad = td_list[0]
+            try:
+                total = int(td_list[1].replace('.', ''))
+            except ValueError as e:
+                total = None
+            try:
+                total_titulacion = int(td_list[3].replace('.', ''))
+            except ValueError as e:
+                total_titulacion = None
+
+            lista_accesos = [0, 0, 0, 0, 0, 0]
+            for celda, via in self.pasos(td_list):
+                texto = td_list[celda]
+                # Equivale a re.match('[0-9]+', ...)
+                if '0' <= texto[:1] <= '9':
+                    lista_accesos[via] = lista_accesos[via] + int(texto.replace('.', ''))
+            acceso = tuple(lista_accesos)
+
+            total_sexo = int(td_list[len(td_list) - 2].replace('.', ''))
+            return facultad, total, titulacion, total_titulacion, total_sexo, acceso
+
+        return None, None, None, None, None, None
+
+
+def parse_tr_acceso(td_list, plan=PlanAcceso()):
+    """
+    Parsea una fila del informe por vías de acceso con el plan indicado (por
+    defecto, la disposición habitual de las columnas).
+    """
+    return plan(td_list)
+
+
+def _por_filas(parse_tr):
+    # Función que parsea un lote de filas con la que parsea una fila
+    return lambda td_lists: [parse_tr(td_list) for td_list in td_lists]
+
+
+def _entradas(stream, cabecera, preparar, clave, lote=2):
+    """
+    Genera (titulacion, datos) para cada pareja de filas hombres/mujeres.
+    - cabecera - Número de filas de cabecera del informe
+    - preparar - Función que recibe las filas de cabecera y devuelve la
+      función que parsea una lista de filas
+    - clave - 'edades' o 'via_acceso'
+    - lote - Número (par) de filas que se leen y parsean juntas
+    """
+    from itertools import islice
+    from grados import perfil
+    from grados.registro import Sexo, Titulacion
+    from grados.tabla import filas, male_and_female
+
+    tabla = filas(stream)
+    parse_lote = perfil.medir('conversion', preparar(list(islice(tabla, cabecera))))
+
+    def parseadas():
+        while True:
+            td_lists = list(islice(tabla, lote))
+            if not td_lists:
+                return
+            perfil.contar('conversion', len(td_lists))
+            yield from parse_lote(td_lists)
+
+    facultad_actual = None
+    total_facultad = None
+    for fila_male, fila_female in male_and_female(parseadas()):
+        facultad, total, titulacion, total_titulacion, total_sexo, valores = fila_male
+        # Si la celda de la facultad está vacía, es la de la fila anterior (y
+        # su total, el de la primera fila de la facultad)
+        if facultad and facultad.strip():
+            facultad_actual = facultad.strip()
+            total_facultad = total
+        if titulacion is None:
+            # Las filas sin titulación (totales) no son de la facultad anterior
+            datos = Titulacion(total_titulacion, None,
+                               Sexo(total_sexo, **{clave: valores}), None)
+        else:
+            datos = Titulacion(total_titulacion, facultad_actual,
+                               Sexo(total_sexo, **{clave: valores}), None, total_facultad)
+
+        facultad, total, titulacion, total_titulacion, total_sexo, valores = fila_female
+        datos.mujeres = Sexo(total_sexo, **{clave: valores})
+        yield titulacion, datos
+
+
+def parse_edades(stream):
+    """
+    Genera (titulacion, datos) a partir de un informe por edades.
+    - stream - Fichero HTML abierto (en modo texto o binario)
+    """
+    return _entradas(stream, 10, lambda cabecera: parse_lote_edades, 'edades',
+                     LOTE_EDADES)
+
+
+def parse_acceso(stream):
+    """
+    Genera (titulacion, datos) a partir de un informe por vías de acceso. La
+    disposición de las columnas se deduce de la cabecera del informe (ver
+    PlanAcceso.desde_cabecera), por lo que puede cambiar de un curso a otro.
+    - stream - Fichero HTML abierto (en modo texto o binario)
+    """
+    return _entradas(stream, 11, lambda cabecera: _por_filas(
+        PlanAcceso.desde_cabecera(cabecera)), 'via_acceso')
+
+
+def merge(data, parcial, validador=None):
+    """
+    Une en data los datos de otro informe, comprobando que los totales de las
+    titulaciones comunes coinciden.
+    - data - Diccionario {titulacion: Titulacion} donde se añadirá la
+      información
+    - parcial - Diccionario o iterable de pares (titulacion, Titulacion) con
+      la información de otro informe
+    - validador - grados.validacion.Validador activo en el que se anotan los
+      totales que no coinciden (regla merge). Sin él, se lanza una excepción.
+    """
+    if isinstance(parcial, dict):
+        parcial = parcial.items()
+    for titulacion, datos in parcial:
+        if not titulacion in data:
+            data[titulacion] = datos
+            continue
+        _comprobar_totales(titulacion, data[titulacion], datos, validador)
+        data[titulacion].hombres.update(datos.hombres)
+        data[titulacion].mujeres.update(datos.mujeres)
+    return data
+
+
+def _comprobar_totales(titulacion, datos, otros, validador):
+    if datos.total != otros.total:
+        if validador is None or not validador.activo:
+            raise Exception('No coinciden datos en los archivos')
+        validador.anotar(datos.facultad, titulacion, 'merge', None,
+                         datos.total, otros.total)
+
+
+def _unir(titulacion, datos, otros, validador):
+    """
+    Devuelve un Titulacion nuevo con los datos de los dos informes (los de
+    entrada no se modifican: pueden estar guardándose en la caché).
+    """
+    from grados.registro import Sexo, Titulacion
+
+    _comprobar_totales(titulacion, datos, otros, validador)
+    sexos = []
+    for sexo, otro in ((datos.hombres, otros.hombres), (datos.mujeres, otros.mujeres)):
+        unido = Sexo(None)
+        unido.update(sexo)
+        unido.update(otro)
+        sexos.append(unido)
+    return Titulacion(datos.total, datos.facultad, sexos[0], sexos[1],
+                      datos.total_facultad)
+
+
+def fusionar(edades, acceso, validador=None):
+    """
+    Genera (titulacion, Titulacion) con los datos de los dos informes a medida
+    que se parsean, en el mismo orden que merge(dict(edades), acceso).
+    - edades, acceso - Iterables de pares (titulacion, Titulacion), p. ej.
+      parse_edades(stream) y parse_acceso(stream)
+    - validador - Como en merge
+
+    Los dos informes listan las mismas titulaciones en el mismo orden, así
+    que se avanza por ambos a la vez y cada pareja se une en cuanto se ha
+    leído, sin buscarla en un diccionario. Si el orden no coincide, las
+    titulaciones del informe de acceso que se leen por adelantado se guardan
+    en un diccionario hasta que aparece su pareja; las que no están en el de
+    edades se generan al final. Cada titulación debe aparecer una sola vez en
+    cada informe (si se repite, merge se queda con la última y aquí se
+    generan las dos).
+    """
+    acceso = iter(acceso)
+    pendientes = {}
+    for titulacion, datos in edades:
+        otros = None
+        if pendientes and titulacion in pendientes:
+            otros = pendientes.pop(titulacion)
+        else:
+            for titulacion_acceso, datos_acceso in acceso:
+                if titulacion_acceso == titulacion:
+                    otros = datos_acceso
+                    break
+                pendientes[titulacion_acceso] = datos_acceso
+        if otros is None:
+            # Titulación que no está en el informe de acceso
+            yield titulacion, datos
+        else:
+            yield titulacion, _unir(titulacion, datos, otros, validador)
+    yield from pendientes.items()
+    for titulacion, datos in acceso:
+        yield titulacion, datos
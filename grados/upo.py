@@ -0,0 +1,242 @@
+"""
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+--------------------------------------------------------------------------------
+
+Data source: Universidad Pablo de Olavide
+
+"""
+
+"""
+Descripción:
+============
+Agregación de los datos por alumno de la UPO en contadores de tamaño fijo.
+
+Para cada (curso, titulación) sólo se guarda una lista de contadores: para
+hombres y luego para mujeres, primero los grupos de edad y después las vías
+de acceso. Las edades se agrupan como en los datos de la UGR (18 o menos, 19
+a 29, 30-34, 35-39, 40 o más), el sexo se toma de la primera letra (H/V:
+hombres, M/F: mujeres) y la vía de acceso se deduce del texto del campo
+ingreso.
+
+Los contadores se pueden sumar en cualquier orden, así que un CSV grande se
+puede agregar por trozos en paralelo: trozos() lo divide en rangos de bytes
+que empiezan y terminan en un salto de línea, agregar_trozo() agrega uno de
+ellos y combinar() suma los resultados. Sumados en el orden de los trozos,
+las titulaciones quedan en el mismo orden que con una sola pasada. Los
+campos del CSV no deben contener saltos de línea.
+"""
+
+import csv
+import io
+import os
+
+# Las vías de acceso y su reconocimiento son los de los informes de la UGR
+from grados.ugr import VIAS_ACCESO, via_acceso
+
+# Claves de las edades, en el orden de los contadores (después van las de
+# VIAS_ACCESO)
+EDADES = (18, 19, 20, 21, 22, 23, 24, 25, 26, 27, 28, 29, 30, 35, 40)
+
+CONTADORES_SEXO = len(EDADES) + len(VIAS_ACCESO)
+HOMBRES = 0
+MUJERES = CONTADORES_SEXO
+
+
+def indice_edad(edad):
+    """
+    Posición en los contadores del grupo de edad de edad (texto).
+    """
+    edad = int(edad)
+    if edad <= 18:
+        return 0
+    if edad < 30:
+        return edad - 18
+    if edad < 35:
+        return EDADES.index(30)
+    if edad < 40:
+        return EDADES.index(35)
+    return EDADES.index(40)
+
+
+def indice_acceso(ingreso):
+    """
+    Posición en los contadores de la vía de acceso descrita en ingreso (ver
+    grados.ugr.via_acceso; lo que no es ninguna vía cuenta en Otros).
+    """
+    via = via_acceso(ingreso)
+    if via is None:
+        via = VIAS_ACCESO.index('Otros')
+    return len(EDADES) + via
+
+
+def indice_sexo(sexo):
+    """
+    Desplazamiento en los contadores del sexo indicado.
+    """
+    return HOMBRES if sexo.strip()[:1].upper() in ('H', 'V') else MUJERES
+
+
+def sexo_data(contadores, desplazamiento):
+    edades = contadores[desplazamiento:desplazamiento + len(EDADES)]
+    accesos = contadores[desplazamiento + len(EDADES):desplazamiento + CONTADORES_SEXO]
+    return {
+        'total': sum(edades),
+        'edades': dict(zip(EDADES, edades)),
+        'via_acceso': dict(zip(VIAS_ACCESO, accesos)),
+    }
+
+
+def year_data(titulaciones):
+    """
+    Convierte los contadores de un curso al formato de salida de upo2json.py
+    ({titulacion: {'total', 'hombres', 'mujeres'}}).
+    """
+    data = {}
+    for titulacion, contadores in titulaciones.items():
+        data[titulacion] = {
+            'total': sum(contadores[:len(EDADES)]) +
+                     sum(contadores[MUJERES:MUJERES + len(EDADES)]),
+            'hombres': sexo_data(contadores, HOMBRES),
+            'mujeres': sexo_data(contadores, MUJERES),
+        }
+    return data
+
+
+def agregar(reader):
+    """
+    Recorre una sola vez las filas del CSV y genera (curso, titulaciones),
+    donde titulaciones es {titulacion: contadores}. Si las filas están
+    ordenadas por curso, cada curso se genera en cuanto termina; un curso que
+    vuelve a aparecer se genera otra vez al final con los datos completos.
+    """
+    # Estructuras para almacenar los datos: {curso: {titulacion: contadores}}
+    data = {}
+    generados = set()
+
+    # Los índices de cada valor distinto se calculan una sola vez
+    indices_edad = {}
+    indices_acceso = {}
+    indices_sexo = {}
+
+    curso_actual = None
+    for row in reader:
+        if len(row) < 5:
+            # Líneas en blanco (csv devuelve []) o incompletas
+            continue
+        curso, titulacion, ingreso, edad, sexo = row[:5]
+
+        try:
+            i_edad = indices_edad[edad]
+        except KeyError:
+            try:
+                i_edad = indices_edad[edad] = indice_edad(edad)
+            except ValueError:
+                # Cabecera u otra fila sin edad válida
+                continue
+        try:
+            i_acceso = indices_acceso[ingreso]
+        except KeyError:
+            i_acceso = indices_acceso[ingreso] = indice_acceso(ingreso)
+        try:
+            i_sexo = indices_sexo[sexo]
+        except KeyError:
+            i_sexo = indices_sexo[sexo] = indice_sexo(sexo)
+
+        if curso != curso_actual:
+            # Con el fichero ordenado por curso, el anterior ya está completo
+            if curso_actual is not None:
+                yield curso_actual, data[curso_actual]
+                generados.add(curso_actual)
+            curso_actual = curso
+            generados.discard(curso)
+
+        titulaciones = data.get(curso)
+        if titulaciones is None:
+            titulaciones = data[curso] = {}
+        contadores = titulaciones.get(titulacion)
+        if contadores is None:
+            contadores = titulaciones[titulacion] = [0] * (2 * CONTADORES_SEXO)
+
+        contadores[i_sexo + i_edad] += 1
+        contadores[i_sexo + i_acceso] += 1
+
+    for curso, titulaciones in data.items():
+        if curso not in generados:
+            yield curso, titulaciones
+
+
+def trozos(filename, n):
+    """
+    Divide el fichero en (como mucho) n rangos de bytes (inicio, fin) de
+    tamaño parecido, cada uno formado por líneas completas.
+    """
+    tamano = os.path.getsize(filename)
+    limites = [0]
+    with open(filename, 'rb') as f:
+        for i in range(1, n):
+            f.seek(max(i * tamano // n - 1, limites[-1]))
+            # Se avanza hasta el principio de la línea siguiente
+            f.readline()
+            limites.append(min(f.tell(), tamano))
+    limites.append(tamano)
+    return [(inicio, fin) for inicio, fin in zip(limites, limites[1:]) if inicio < fin]
+
+
+def leer_trozo(filename, inicio, fin, encoding, lineas_bloque=10000):
+    """
+    Genera las filas del CSV que están entre los bytes inicio y fin. Las
+    líneas se decodifican por bloques y se leen como con open(filename,
+    encoding=encoding, newline='').
+    """
+    with open(filename, 'rb') as f:
+        f.seek(inicio)
+        posicion = inicio
+        bloque = []
+        for linea in f:
+            if posicion >= fin:
+                break
+            posicion = posicion + len(linea)
+            bloque.append(linea)
+            if len(bloque) == lineas_bloque:
+                yield from csv.reader(io.StringIO(b''.join(bloque).decode(encoding), newline=''))
+                bloque = []
+        yield from csv.reader(io.StringIO(b''.join(bloque).decode(encoding), newline=''))
+
+
+def agregar_trozo(filename, inicio, fin, encoding):
+    """
+    Agrega las filas de un trozo del CSV (ver trozos). Devuelve
+    {curso: {titulacion: contadores}}.
+    """
+    return dict(agregar(leer_trozo(filename, inicio, fin, encoding)))
+
+
+def combinar(data, parcial):
+    """
+    Suma a data ({curso: {titulacion: contadores}}) los contadores de parcial,
+    con la misma estructura. Devuelve data.
+    """
+    for curso, titulaciones in parcial.items():
+        destino = data.get(curso)
+        if destino is None:
+            data[curso] = titulaciones
+            continue
+        for titulacion, contadores in titulaciones.items():
+            actuales = destino.get(titulacion)
+            if actuales is None:
+                destino[titulacion] = contadores
+            else:
+                destino[titulacion] = [a + b for a, b in zip(actuales, contadores)]
+    return data
@@ -0,0 +1,180 @@
+"""
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+
+"""
+Descripción:
+============
+Comprobación de la coherencia de los datos de cada titulación a medida que
+pasan del parser a la salida, sin volver a recorrerlos.
+
+Reglas (cada discrepancia indica cuál no se cumple):
+
+- total: hombres + mujeres debe ser el total de la titulación.
+- edades: la suma de los grupos de edad de un sexo debe ser su total.
+- via_acceso: la suma de las vías de acceso de un sexo debe ser su total.
+- merge: los dos informes deben dar el mismo total para la titulación (ver
+  grados.ugr.merge).
+- facultad: el total de la facultad que da el informe debe ser la suma de
+  sus titulaciones (ver grados.agregados; titulacion es None).
+
+Las discrepancias no detienen el proceso: se acumulan en el Validador y al
+terminar se muestran todas, una línea JSON por discrepancia:
+
+    {"origen": "2012", "facultad": "FACULTAD DE CIENCIAS POLÍTICAS Y SOCIOLOGÍA",
+     "titulacion": "GRADO EN SOCIOLOGÍA", "regla": "edades", "sexo": "mujeres",
+     "esperado": 34, "obtenido": 33}
+
+Los datos se escriben igualmente, pero informe() devuelve
+ESTADO_DISCREPANCIAS (1) si ha habido alguna, y los scripts terminan con
+ese código de salida para que quien los ejecuta (cron, integración
+continua...) lo note, como cuando antes se detenían. Con la opción
+--tolerar-discrepancias de los scripts, informe() devuelve 0 aunque las haya.
+
+Un Validador inactivo (opción --sin-validacion de los scripts) no comprueba
+nada: revisar() devuelve las entradas tal cual, sin añadir ningún paso por
+titulación, y merge() vuelve a detenerse con una excepción si los totales no
+coinciden.
+
+Ejemplo de uso:
+
+    validador = validacion.desde_argv(sys.argv)
+    salida.escribir_json(validador.revisar(ugr.parse_edades(html_doc)), output)
+    sys.exit(validador.informe())
+"""
+
+import json
+import sys
+
+
+SEXOS = ('hombres', 'mujeres')
+
+# Código de salida de los scripts si hay discrepancias
+ESTADO_DISCREPANCIAS = 1
+
+
+def desde_argv(argv):
+    """
+    Quita de argv las opciones --sin-validacion y --tolerar-discrepancias y
+    devuelve un Validador, activo si no estaba la primera y que tolera las
+    discrepancias si estaba la segunda.
+    """
+    opciones = {}
+    for opcion in ('--sin-validacion', '--tolerar-discrepancias'):
+        opciones[opcion] = opcion in argv[1:]
+        if opciones[opcion]:
+            argv.remove(opcion)
+    return Validador(not opciones['--sin-validacion'],
+                     tolerar=opciones['--tolerar-discrepancias'])
+
+
+class Discrepancia(object):
+    """
+    Regla que no cumplen los datos de una titulación.
+    - sexo - 'hombres', 'mujeres' o None si la regla es de la titulación
+    - esperado, obtenido - Valor esperado y valor obtenido
+    """
+    __slots__ = ('origen', 'facultad', 'titulacion', 'regla', 'sexo', 'esperado',
+                 'obtenido')
+
+    def __init__(self, origen, facultad, titulacion, regla, sexo, esperado, obtenido):
+        self.origen = origen
+        self.facultad = facultad
+        self.titulacion = titulacion
+        self.regla = regla
+        self.sexo = sexo
+        self.esperado = esperado
+        self.obtenido = obtenido
+
+    def a_json(self):
+        return {campo: getattr(self, campo) for campo in self.__slots__}
+
+    def __repr__(self):
+        return 'Discrepancia(%s)' % ', '.join(
+            '%s=%r' % (campo, getattr(self, campo)) for campo in self.__slots__)
+
+
+class Validador(object):
+    """
+    Acumula las discrepancias de los datos que se le pasan.
+    - activo - Si es False no se comprueba nada
+    - origen - Texto que se añade a cada discrepancia (p. ej. el año o el
+      fichero); se puede cambiar entre una entrada y otra
+    - tolerar - Si es True, informe() devuelve 0 aunque haya discrepancias
+    """
+
+    def __init__(self, activo=True, origen=None, tolerar=False):
+        self.activo = activo
+        self.origen = origen
+        self.tolerar = tolerar
+        self.discrepancias = []
+
+    def anotar(self, facultad, titulacion, regla, sexo, esperado, obtenido):
+        self.discrepancias.append(Discrepancia(
+            self.origen, facultad, titulacion, regla, sexo, esperado, obtenido))
+
+    def titulacion(self, titulacion, datos):
+        """
+        Comprueba las reglas total, edades y via_acceso en los datos
+        (grados.registro.Titulacion) de una titulación.
+        """
+        if titulacion is None:
+            # Filas sin titulación
+            return
+        suma = 0
+        for sexo in SEXOS:
+            sexo_data = getattr(datos, sexo)
+            total = sexo_data.total
+            if total is None:
+                suma = None
+                continue
+            if suma is not None:
+                suma = suma + total
+            for campo in sexo_data.campos():
+                valores = getattr(sexo_data, campo)
+                if valores is not None and sum(valores) != total:
+                    self.anotar(datos.facultad, titulacion, campo, sexo, total,
+                                sum(valores))
+        if datos.total is not None and suma is not None and suma != datos.total:
+            self.anotar(datos.facultad, titulacion, 'total', None, datos.total, suma)
+
+    def revisar(self, entradas):
+        """
+        Devuelve las entradas (pares (titulacion, datos)) y comprueba cada una
+        cuando pasa. Si el validador no está activo, las devuelve tal cual.
+        """
+        if not self.activo:
+            return entradas
+        return self._revisar(entradas)
+
+    def _revisar(self, entradas):
+        for titulacion, datos in entradas:
+            self.titulacion(titulacion, datos)
+            yield titulacion, datos
+
+    def informe(self, output=sys.stderr):
+        """
+        Escribe las discrepancias, una línea JSON por discrepancia, y un
+        resumen. Devuelve el código de salida de los scripts:
+        ESTADO_DISCREPANCIAS si hay alguna (y no se toleran) y 0 si no.
+        """
+        if not self.activo:
+            return 0
+        for discrepancia in self.discrepancias:
+            print(json.dumps(discrepancia.a_json(), ensure_ascii=False), file=output)
+        print('validación: %d discrepancias' % len(self.discrepancias), file=output)
+        if self.discrepancias and not self.tolerar:
+            return ESTADO_DISCREPANCIAS
+        return 0
@@ -0,0 +1,152 @@
+"""
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+
+"""
+Descripción:
+============
+Vigilancia de los ficheros de un directorio: avisa de los que aparecen,
+cambian o desaparecen, cuando han dejado de cambiar.
+
+En Linux se usa inotify (a través de ctypes, sin dependencias), así que
+mientras no cambia nada el proceso está bloqueado en select() y no consume
+CPU. Si inotify no está disponible (otro sistema, o se ha alcanzado el límite
+de vigilancias), se revisa el directorio cada intervalo segundos.
+
+Los eventos sólo indican que algo ha cambiado: qué ficheros han cambiado se
+sabe comparando su fecha de modificación y su tamaño (como en
+grados.consulta). Un fichero que se está copiando cambia varias veces, así
+que sólo se avisa cuando durante espera segundos no ha habido eventos ni ha
+cambiado ningún fichero.
+
+Ejemplo de uso:
+
+    vigilante = Vigilante('datos-raw', '*.htm*')
+    for cambiados, borrados in vigilante.cambios():
+        print('cambiados:', cambiados, 'borrados:', borrados)
+"""
+
+import glob
+import os
+import select
+import time
+
+
+# Eventos de inotify (ver inotify(7)): IN_MODIFY, IN_ATTRIB, IN_CLOSE_WRITE,
+# IN_MOVED_FROM, IN_MOVED_TO, IN_CREATE, IN_DELETE
+EVENTOS = 0x002 | 0x004 | 0x008 | 0x040 | 0x080 | 0x100 | 0x200
+
+
+def _inotify(directorio):
+    """
+    Descriptor de inotify que vigila directorio, o None si no se puede usar.
+    """
+    try:
+        import ctypes
+        import ctypes.util
+        libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+        fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+    except (OSError, AttributeError, TypeError):
+        return None
+    if fd < 0:
+        return None
+    if libc.inotify_add_watch(fd, os.fsencode(directorio), EVENTOS) < 0:
+        os.close(fd)
+        return None
+    return fd
+
+
+def estado(ficheros):
+    """
+    {fichero: (fecha de modificación, tamaño)} de los ficheros que existen.
+    """
+    resultado = {}
+    for filename in ficheros:
+        try:
+            stat = os.stat(filename)
+        except FileNotFoundError:
+            continue
+        resultado[filename] = (stat.st_mtime_ns, stat.st_size)
+    return resultado
+
+
+class Vigilante(object):
+    """
+    Vigila los ficheros de directorio cuyo nombre cumple patron.
+    - espera - Segundos sin cambios tras los que se avisa
+    - intervalo - Segundos entre revisiones si no se usa inotify
+    - inotify - Si es False, se revisa siempre cada intervalo segundos
+    """
+
+    def __init__(self, directorio, patron='*', espera=1.0, intervalo=2.0,
+                 inotify=True):
+        self.directorio = directorio
+        self.patron = patron
+        self.espera = espera
+        self.intervalo = intervalo
+        self.fd = _inotify(directorio) if inotify else None
+
+    def ficheros(self):
+        return glob.glob(os.path.join(self.directorio, self.patron))
+
+    def _esperar(self, segundos):
+        """
+        Espera a que haya eventos (como mucho segundos; None es sin límite) y
+        los descarta. Sin inotify, espera los segundos indicados (o
+        intervalo). Devuelve True si ha habido eventos.
+        """
+        if self.fd is None:
+            time.sleep(self.intervalo if segundos is None else segundos)
+            return False
+        listos, _, _ = select.select([self.fd], [], [], segundos)
+        if not listos:
+            return False
+        try:
+            while os.read(self.fd, 65536):
+                pass
+        except BlockingIOError:
+            pass
+        return True
+
+    def cambios(self, anterior=None):
+        """
+        Genera (cambiados, borrados), listas ordenadas de ficheros, cada vez
+        que los ficheros dejan de cambiar respecto a la vez anterior. La
+        primera vez se compara con anterior (un estado(); por defecto, como
+        si no hubiera ninguno, así que se avisa de todos los que hay).
+        """
+        anterior = {} if anterior is None else anterior
+        actual = estado(self.ficheros())
+        while True:
+            if actual != anterior:
+                # Se espera a que pasen espera segundos sin cambios
+                while True:
+                    eventos = self._esperar(self.espera)
+                    nuevo = estado(self.ficheros())
+                    if not eventos and nuevo == actual:
+                        break
+                    actual = nuevo
+                cambiados = sorted(f for f in actual if actual[f] != anterior.get(f))
+                borrados = sorted(f for f in anterior if f not in actual)
+                anterior = actual
+                if cambiados or borrados:
+                    yield cambiados, borrados
+            self._esperar(None)
+            actual = estado(self.ficheros())
+
+    def cerrar(self):
+        if self.fd is not None:
+            os.close(self.fd)
+            self.fd = None
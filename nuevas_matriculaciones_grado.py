@@ -37,6 +37,8 @@ ejemplo de la estructura devuelta:
 {
     'TITULACION': {
         'total': 230, # Total de personas matriculadas en TITULACION
+        'facultad': 'FACULTAD', # Facultad o centro de TITULACION (None en
+                                # la fila sin titulación, de clave "null")
         'hombres': {
             'total': 88, # Total de hombres matriculados en TITULACION
             'edades': {
@@ -79,203 +81,262 @@ ejemplo de la estructura devuelta:
     ...
 }
 
+Las filas sin titulación del informe (totales) van con la clave "null". Como
+cada titulación se escribe en cuanto se ha parseado, si una clave se repite
+(p. ej. hay varias filas sin titulación) aparece varias veces en el JSON;
+json.load se queda con la última.
+
 Argumentos:
 - input_edades: Fichero de entrada que contiene la información ofrecida por la UGR
 - input_acceso: Fichero de entrada que contiene la información ofrecida por la UGR
 - output: Argumento opcional. Si se indica, los datos obtenidos se vuelcan al
   fichero indicado. En caso de que no se indique este argumento, se muestran
-  por salida estándar.
+  por salida estándar. Si el nombre termina en .bin, se usa el formato binario
+  de grados/binario.py en lugar de JSON, y si termina en .ndjson se escribe
+  una línea JSON por titulación. Si además termina en .gz o .zst (p. ej.
+  salida.json.gz), se comprime al escribirlo.
+
+Los dos informes se leen a la vez, fila a fila (ver grados.ugr.fusionar):
+salvo en formato binario, cada titulación se escribe en cuanto se ha leído
+en ambos, sin esperar a que termine ninguno de ellos.
+
+Los ficheros de entrada (también los del modo por lotes) pueden estar
+comprimidos con gzip (.gz) o zstd (.zst); se descomprimen a medida que se
+leen, sin ficheros temporales (ver grados/comprimido.py).
+
+Modo por lotes:
+- --batch: Procesa a la vez todos los informes de un directorio (o de un
+  patrón glob, p. ej. 'datos-raw/*.html'). Los ficheros se emparejan por
+  nombre: el de edades contiene 'edad' y el de acceso 'acceso', y el resto
+  del nombre debe coincidir (p. ej. 2012_edades_ciencias.html y
+  2012_acceso_ciencias.html). El año es el primer número de cuatro cifras
+  del nombre (los informes cuyo nombre no lo tiene se ignoran). Todos los
+  ficheros se parsean en paralelo y los datos de un mismo año se unen en un
+  único fichero output_dir/AÑO.json. Los tiempos de cada fichero se
+  muestran por la salida de error.
+- output_dir: Directorio donde se almacenarán los ficheros JSON.
+- procesos: Argumento opcional. Número de procesos (por defecto, uno por
+  núcleo).
+- --compresion=gz o --compresion=zst: Argumento opcional. Los ficheros
+  AÑO.json se escriben comprimidos (AÑO.json.gz o AÑO.json.zst).
+
+Validación:
+- --sin-validacion: Argumento opcional. Por defecto se comprueba, a medida que
+  se escribe cada titulación, que hombres y mujeres suman el total y que las
+  edades y las vías de acceso de cada sexo suman su total, y que los dos
+  informes dan el mismo total; las discrepancias se muestran al terminar por
+  la salida de error, una línea JSON por discrepancia (ver
+  grados/validacion.py) y, aunque se escriben los datos, se termina con
+  código de salida 1. Con esta opción no se comprueba nada y se termina con
+  error si los totales de los dos informes no coinciden.
+- --tolerar-discrepancias: Argumento opcional. Se muestran las discrepancias,
+  pero se termina con código de salida 0.
+
+Agregados:
+- --agregados=RUTA: Argumento opcional. Escribe en RUTA (JSON, comprimido si
+  termina en .gz o .zst) los totales por facultad y de toda la universidad,
+  sumados a medida que se escribe cada titulación (ver grados/agregados.py).
+  En el modo por lotes, RUTA es un directorio y se escribe un fichero
+  RUTA/AÑO.json por año (con la extensión de --compresion). El total de cada
+  facultad que da el informe de edades se compara con la suma de sus
+  titulaciones al validar.
+
+Medición:
+- --profile: Argumento opcional (también --profile=FICHERO.pstats). Muestra al
+  terminar el tiempo y la memoria de cada etapa (ver grados/perfil.py). En el
+  modo por lotes se suman las etapas de todos los procesos; el perfil de
+  cProfile es sólo el del proceso principal.
 
 
 
 Requisitos:
 ===========
 - Python 3
-- BeautifulSoup (versión 4)
 """
 
-import json
+import glob
+import os
 import re
 import sys
-from bs4 import BeautifulSoup
+import time
+from concurrent.futures import ProcessPoolExecutor
+from grados import agregados, binario, cache, comprimido, perfil, salida, ugr, validacion
+from grados.consulta import year_de
+
+
+def parse(tipo, filename):
+    """
+    Parsea un informe y genera los pares (titulacion, datos) a medida que se
+    leen las filas de cada titulación.
+    - tipo - 'edades' o 'acceso'
+    - filename - Ruta del fichero HTML
+    """
+    # Se lee en binario (descomprimido si es .gz o .zst) y grados.tabla lo
+    # decodifica (latin-1)
+    html_doc = comprimido.abrir(filename, 'rb')
+    if tipo == 'edades':
+        yield from ugr.parse_edades(html_doc)
+    else:
+        yield from ugr.parse_acceso(html_doc)
+    html_doc.close()
+
 
+def entradas_fichero(tipo, filename):
+    """
+    Como parse, pero toma los datos de la caché si el fichero no ha cambiado.
+    """
+    return cache.entradas(filename, 'ugr-' + tipo, ugr.VERSION,
+                          lambda filename: parse(tipo, filename))
+
+
+def parse_fichero(tipo, filename):
+    """
+    Parsea un informe y devuelve los datos obtenidos y el tiempo empleado.
+    - tipo - 'edades' o 'acceso'
+    - filename - Ruta del fichero HTML
+    """
+    inicio = time.perf_counter()
+    # Los datos se toman de la caché si el fichero no ha cambiado
+    data = cache.cargar(filename, 'ugr-' + tipo, ugr.VERSION,
+                        lambda filename: dict(parse(tipo, filename)))
+    return data, time.perf_counter() - inicio
 
-# Comprobamos los argumentos
-if len(sys.argv) < 3 or len(sys.argv) > 4:
-    sys.exit('USO:', sys.argv[0], 'input_edades input_acceso [output]')
 
-# Preparamos la salida
-output = sys.stdout
-if len(sys.argv) == 4:
-    output = open(sys.argv[3], 'w+')
+def parse_en_proceso(tipo, filename):
+    """
+    Como parse_fichero, pero devuelve además las etapas medidas en el proceso
+    con --profile (ver grados.perfil.extraer), para sumarlas en el principal.
+    """
+    return parse_fichero(tipo, filename) + (perfil.extraer(),)
 
-def male_and_female(tr_list):
-    it = iter(tr_list)
-    while True:
-        yield next(it), next(it)
 
-def nuevo_por_edades(html_doc, data):
+def parejas(patron):
     """
-    - html_doc - Contenido html del documento
-    - data - Diccionario donde se añadirá la información parseada
+    Empareja los informes de edades y de acceso de un directorio o patrón glob.
+    Devuelve un diccionario {año: [(input_edades, input_acceso), ...]}.
     """
-    # Cargamos el HTML con BeautifulSoup
-    soup = BeautifulSoup(html_doc)
-    tr_list = soup.body.tbody.find_all('tr')
-    
-    def parse_tr(td_list):
-        titulacion = td_list[2].get_text().replace('\n ', '')
-        if titulacion:
-            facultad = td_list[0].get_text()
-            try:
-                total = int(td_list[1].get_text().replace('.', ''))
-            except ValueError as e:
-                total = None
-            try:
-                total_titulacion = int(td_list[3].get_text().replace('.', ''))
-            except ValueError as e:
-                total_titulacion = None
-            total_sexo = int(td_list[20].get_text().replace('.', ''))
-            edades = {
-                18: int(td_list[5].get_text().replace('.', '')), # <= 18
-                19: int(td_list[6].get_text().replace('.', '')),
-                20: int(td_list[7].get_text().replace('.', '')),
-                21: int(td_list[8].get_text().replace('.', '')),
-                22: int(td_list[9].get_text().replace('.', '')),
-                23: int(td_list[10].get_text().replace('.', '')),
-                24: int(td_list[11].get_text().replace('.', '')),
-                25: int(td_list[12].get_text().replace('.', '')),
-                26: int(td_list[13].get_text().replace('.', '')),
-                27: int(td_list[14].get_text().replace('.', '')),
-                28: int(td_list[15].get_text().replace('.', '')),
-                29: int(td_list[16].get_text().replace('.', '')),
-                30: int(td_list[17].get_text().replace('.', '')), # 30-34
-                35: int(td_list[18].get_text().replace('.', '')), # 35-39
-                40: int(td_list[19].get_text().replace('.', '')), # >= 40
-            }
-            return facultad, total, titulacion, total_titulacion, total_sexo, edades
-        
-        return None, None, None, None, None, None
-        
-
-    for tr_male, tr_female in male_and_female(tr_list[10:]):
-        td_male_list = tr_male.find_all('td')
-        facultad, total, titulacion, total_titulacion, total_sexo, edades = parse_tr(td_male_list)
-        if not titulacion in data:
-            data[titulacion] = {
-                'total': total_titulacion,
-                'hombres': {},
-                'mujeres': {},
-            }
-        elif data[titulacion]['total'] != total_titulacion:
-            raise Exception('No coinciden datos en los archivos')
-        
-        data[titulacion]['hombres'].update({
-            'total': total_sexo,
-            'edades': edades,
-        })
-        
-        td_female_list = tr_female.find_all('td')
-        facultad, total, titulacion, total_titulacion, total_sexo, edades = parse_tr(td_female_list)
-        data[titulacion]['mujeres'].update({
-            'total': total_sexo,
-            'edades': edades,
-        })
-
-
-def nuevo_por_via_acceso(html_doc, data):
+    if os.path.isdir(patron):
+        patron = os.path.join(patron, '*.htm*')
+
+    informes = {}
+    for filename in sorted(glob.glob(patron)):
+        nombre = os.path.basename(filename).lower()
+        for tipo, token in (('edades', r'edad(es)?'), ('acceso', r'acceso')):
+            if re.search(token, nombre):
+                clave = re.sub(token, '', nombre, count=1)
+                informes.setdefault(clave, {})[tipo] = filename
+                break
+
+    por_year = {}
+    for clave, pareja in sorted(informes.items()):
+        if len(pareja) != 2:
+            print('Informe sin pareja, se ignora:', *pareja.values(),
+                  file=sys.stderr)
+            continue
+        year = year_de(clave)
+        if year is None:
+            print('Informe sin año en el nombre, se ignora:', *pareja.values(),
+                  file=sys.stderr)
+            continue
+        por_year.setdefault(year, []).append((pareja['edades'], pareja['acceso']))
+    return por_year
+
+
+def batch(patron, output_dir, procesos=None, validador=None, compresion='',
+          dir_agregados=None):
     """
-    - html_doc - Contenido html del documento
-    - data - Diccionario donde se añadirá la información parseada
+    Parsea en paralelo todos los informes indicados por patron y escribe un
+    fichero JSON por año en output_dir, comprimido si compresion es '.gz' o
+    '.zst'. Si se indica un validador
+    (grados.validacion.Validador), se comprueban los datos de cada año al
+    unirlos y al escribirlos. Si se indica dir_agregados, se escriben en él
+    los totales por facultad y de la universidad de cada año (ver
+    grados.agregados).
     """
-    # Cargamos el HTML con BeautifulSoup
-    soup = BeautifulSoup(html_doc)
-    tr_list = soup.body.tbody.find_all('tr')
-    
-    def parse_tr(td_list):
-        titulacion = td_list[2].get_text()
-        if titulacion:
-            facultad = td_list[0].get_text()
-            try:
-                total = int(td_list[1].get_text().replace('.', ''))
-            except ValueError as e:
-                total = None
-            try:
-                total_titulacion = int(td_list[3].get_text().replace('.', ''))
-            except ValueError as e:
-                total_titulacion = None
-            
-            # Es necesario salvar las irregularidades de la tabla (colspan)
-            lista_accesos = [0, 0, 0, 0, 0, 0]
-            lista_index = 0
-            index = 5
-
-            while index < len(td_list) - 2: # 1 porque empieza en 0 y otra por la ult. col.
-                if 'colspan' in td_list[index].attrs:
-                    lista_index = lista_index + int(td_list[index].attrs['colspan'])
-                else:
-                    if re.match('[0-9]+', td_list[index].get_text()):
-                        lista_accesos[lista_index] = int(td_list[index].get_text().replace('.', ''))
-                    lista_index = lista_index + 1
-                index = index + 1
-            
-            acceso = {
-                'PAU': lista_accesos[0],
-                'Credencial': lista_accesos[1],
-                'F.P.': lista_accesos[2],
-                'Titulados': lista_accesos[3],
-                'Mayores 25': lista_accesos[4],
-                'Otros': lista_accesos[5],
-            }
-
-            total_sexo = int(td_list[len(td_list) - 2].get_text().replace('.', ''))
-            return facultad, total, titulacion, total_titulacion, total_sexo, acceso
-        
-        return None, None, None, None, None, None
-        
-
-    for tr_male, tr_female in male_and_female(tr_list[11:]):
-        td_male_list = tr_male.find_all('td')
-        facultad, total, titulacion, total_titulacion, total_sexo, acceso = parse_tr(td_male_list)
-        
-        if not titulacion in data:
-            data[titulacion] = {
-                'total': total_titulacion,
-                'hombres': {},
-                'mujeres': {},
-            }
-        elif data[titulacion]['total'] != total_titulacion:
-            raise Exception('No coinciden datos en los archivos')
-        
-        data[titulacion]['hombres'].update({
-            'total': total_sexo,
-            'via_acceso': acceso,
-        })
-        
-        td_female_list = tr_female.find_all('td')
-        facultad, total, titulacion, total_titulacion, total_sexo, acceso = parse_tr(td_female_list)
-        data[titulacion]['mujeres'].update({
-            'total': total_sexo,
-            'via_acceso': acceso,
-        })
-
-# Estructuras para almacenar los datos
-data = {}
-
-# Apertura del fichero de entrada por edades
-filename = sys.argv[1]    
-html_doc = open(filename, 'r', encoding='latin-1')
-nuevo_por_edades(html_doc, data)
-html_doc.close()
-
-# Apertura del fichero de entrada por vías de acceso
-filename = sys.argv[2]    
-html_doc = open(filename, 'r', encoding='latin-1')
-nuevo_por_via_acceso(html_doc, data)
-html_doc.close()
-
-# Preparamos los datos en JSON
-json_data = json.dumps(data)
-# Mostramos el resultado
-output.write(json_data)
-output.close()
+    if validador is None:
+        validador = validacion.Validador(activo=False)
+
+    por_year = parejas(patron)
+    inicio = time.perf_counter()
+
+    # Con --profile, cada proceso mide sus etapas y las devuelve con los datos
+    inicializar = {}
+    if perfil.ACTIVO:
+        inicializar = {'initializer': perfil.activar, 'initargs': (None, False)}
+
+    with ProcessPoolExecutor(procesos, **inicializar) as executor:
+        # Los dos informes de cada pareja se parsean a la vez
+        futuros = {
+            year: [(executor.submit(parse_en_proceso, 'edades', input_edades),
+                    executor.submit(parse_en_proceso, 'acceso', input_acceso))
+                   for input_edades, input_acceso in lista]
+            for year, lista in por_year.items()
+        }
+
+        for year, lista in sorted(futuros.items()):
+            validador.origen = year
+            data = {}
+            for (input_edades, input_acceso), pareja in zip(por_year[year], lista):
+                for filename, futuro in zip((input_edades, input_acceso), pareja):
+                    parcial, segundos, etapas = futuro.result()
+                    perfil.sumar(etapas)
+                    print('%8.2f s  %s' % (segundos, filename), file=sys.stderr)
+                    ugr.merge(data, parcial, validador)
+
+            acumulado = agregados.Agregados()
+            output = comprimido.abrir(os.path.join(output_dir, year + '.json' + compresion), 'w')
+            salida.escribir_json(acumulado.acumular(validador.revisar(data.items())), output)
+            output.close()
+            acumulado.comprobar(validador)
+            if dir_agregados:
+                acumulado.escribir(os.path.join(dir_agregados, year + '.json' + compresion))
+
+    print('%8.2f s  total' % (time.perf_counter() - inicio), file=sys.stderr)
+
+
+if __name__ == '__main__':
+    perfil.desde_argv(sys.argv)
+    validador = validacion.desde_argv(sys.argv)
+    compresion = comprimido.desde_argv(sys.argv)
+    acumulado = agregados.desde_argv(sys.argv)
+
+    # Comprobamos los argumentos
+    if len(sys.argv) in (4, 5) and sys.argv[1] == '--batch':
+        procesos = int(sys.argv[4]) if len(sys.argv) == 5 else None
+        batch(sys.argv[2], sys.argv[3], procesos, validador, compresion,
+              acumulado.ruta)
+        sys.exit(validador.informe())
+
+    if len(sys.argv) < 3 or len(sys.argv) > 4:
+        sys.exit('USO: %s input_edades input_acceso [output]\n'
+                 '     %s --batch input_dir output_dir [procesos]'
+                 % (sys.argv[0], sys.argv[0]))
+
+    # Preparamos la salida (en formato binario si termina en .bin y una línea
+    # JSON por titulación si termina en .ndjson, antes de .gz o .zst)
+    output = sys.stdout
+    formato = comprimido.sin_compresion(sys.argv[3]) if len(sys.argv) == 4 else ''
+    salida_binaria = formato.endswith('.bin')
+    salida_ndjson = formato.endswith('.ndjson')
+    if len(sys.argv) == 4:
+        output = comprimido.abrir(sys.argv[3], 'wb' if salida_binaria else 'w')
+
+    # Los dos informes se parsean a la vez, fila a fila, y cada titulación se
+    # une con la del otro informe, se comprueba y se suma a su facultad al
+    # pasar hacia la salida
+    entradas = ugr.fusionar(entradas_fichero('edades', sys.argv[1]),
+                            entradas_fichero('acceso', sys.argv[2]), validador)
+    entradas = acumulado.acumular(validador.revisar(entradas))
+    if salida_binaria:
+        with perfil.etapa('binario'):
+            binario.escribir(dict(entradas), output)
+    elif salida_ndjson:
+        salida.escribir_ndjson(entradas, output)
+    else:
+        # Se escribe titulación a titulación, sin generar la cadena completa
+        salida.escribir_json(entradas, output)
+    output.close()
+    acumulado.comprobar(validador)
+    if acumulado.ruta:
+        acumulado.escribir()
+    sys.exit(validador.informe())
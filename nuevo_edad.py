@@ -37,6 +37,8 @@ ejemplo de la estructura devuelta:
 {
     'TITULACION': {
         'total': 230, # Total de personas matriculadas en TITULACION
+        'facultad': 'FACULTAD', # Facultad o centro de TITULACION (None en
+                                # la fila sin titulación, de clave "null")
         'hombres': {
             'total': 88, # Total de hombres matriculados en TITULACION
             'edades': {
@@ -63,107 +65,96 @@ ejemplo de la estructura devuelta:
     ...
 }
 
+Las filas sin titulación del informe (totales) van con la clave "null". Como
+cada titulación se escribe en cuanto se ha parseado, si una clave se repite
+(p. ej. hay varias filas sin titulación) aparece varias veces en el JSON;
+json.load se queda con la última.
+
 Argumentos:
-- input: Fichero de entrada que contiene la información ofrecida por la UGR
+- input: Fichero de entrada que contiene la información ofrecida por la UGR.
+  Puede estar comprimido con gzip (.gz) o zstd (.zst).
 - output: Argumento opcional. Si se indica, los datos obtenidos se vuelcan al
   fichero indicado. En caso de que no se indique este argumento, se muestran
-  por salida estándar.
+  por salida estándar. Si el nombre termina en .bin, se usa el formato binario
+  de grados/binario.py en lugar de JSON, y si termina en .ndjson se escribe
+  una línea JSON por titulación. Salvo en formato binario, cada titulación se
+  escribe en cuanto se ha parseado. Si además termina en .gz o .zst (p. ej.
+  salida.json.gz), se comprime al escribirlo (ver grados/comprimido.py).
+- --sin-validacion: Argumento opcional. Por defecto se comprueba, a medida que
+  se parsea cada titulación, que hombres y mujeres suman el total y que los
+  valores de cada sexo suman su total; las discrepancias se muestran al
+  terminar por la salida de error (ver grados/validacion.py) y, aunque se
+  escriben los datos, se termina con código de salida 1. Con esta opción no
+  se comprueba nada.
+- --tolerar-discrepancias: Argumento opcional. Se muestran las discrepancias,
+  pero se termina con código de salida 0.
+- --agregados=FICHERO: Argumento opcional. Escribe en FICHERO (JSON, comprimido
+  si termina en .gz o .zst) los totales por facultad y de toda la
+  universidad, sumados a medida que se parsea cada titulación (ver
+  grados/agregados.py). El total de cada facultad que da el informe se
+  compara con la suma de sus titulaciones al validar.
+- --profile: Argumento opcional (también --profile=FICHERO.pstats). Muestra al
+  terminar el tiempo y la memoria de cada etapa (ver grados/perfil.py).
 
 
 
 Requisitos:
 ===========
 - Python 3
-- BeautifulSoup (versión 4)
 """
 
-import json
 import sys
-from bs4 import BeautifulSoup
-
-
-# Comprobamos los argumentos
-if len(sys.argv) < 2 or len(sys.argv) > 3:
-    sys.exit('USO:', sys.argv[0], 'input [output]')
-
-# Preparamos la salida
-output = sys.stdout
-if len(sys.argv) == 3:
-    output = open(sys.argv[2], 'w+')
-
-# Apertura del fichero de entrada
-filename = sys.argv[1]    
-html_doc = open(filename, 'r', encoding='latin-1')
-
-# Cargamos el HTML con BeautifulSoup
-soup = BeautifulSoup(html_doc)
-tr_list = soup.body.tbody.find_all('tr')
-
-# Estructuras para almacenar los datos
-data = {}
-
-def male_and_female(tr_list):
-    it = iter(tr_list)
-    while True:
-        yield next(it), next(it)
-
-def parse_tr(td_list):
-    titulacion = td_list[2].get_text().replace('\n ', '')
-    if titulacion:
-        facultad = td_list[0].get_text()
-        try:
-            total = int(td_list[1].get_text().replace('.', ''))
-        except ValueError as e:
-            total = None
-        try:
-            total_titulacion = int(td_list[3].get_text().replace('.', ''))
-        except ValueError as e:
-            total_titulacion = None
-        total_sexo = int(td_list[20].get_text().replace('.', ''))
-        edades = {
-            18: int(td_list[5].get_text().replace('.', '')), # <= 18
-            19: int(td_list[6].get_text().replace('.', '')),
-            20: int(td_list[7].get_text().replace('.', '')),
-            21: int(td_list[8].get_text().replace('.', '')),
-            22: int(td_list[9].get_text().replace('.', '')),
-            23: int(td_list[10].get_text().replace('.', '')),
-            24: int(td_list[11].get_text().replace('.', '')),
-            25: int(td_list[12].get_text().replace('.', '')),
-            26: int(td_list[13].get_text().replace('.', '')),
-            27: int(td_list[14].get_text().replace('.', '')),
-            28: int(td_list[15].get_text().replace('.', '')),
-            29: int(td_list[16].get_text().replace('.', '')),
-            30: int(td_list[17].get_text().replace('.', '')), # 30-34
-            35: int(td_list[18].get_text().replace('.', '')), # 35-39
-            40: int(td_list[19].get_text().replace('.', '')), # >= 40
-        }
-        return facultad, total, titulacion, total_titulacion, total_sexo, edades
-    
-    return None, None, None, None, None, None
-    
-
-for tr_male, tr_female in male_and_female(tr_list[10:]):
-    td_male_list = tr_male.find_all('td')
-    facultad, total, titulacion, total_titulacion, total_sexo, edades = parse_tr(td_male_list)
-    print('2', titulacion)
-    data[titulacion] = {
-        'total': total_titulacion,
-        'hombres': {
-            'total': total_sexo,
-            'edades': edades,
-        }
-    }
-    
-    td_female_list = tr_female.find_all('td')
-    facultad, total, titulacion, total_titulacion, total_sexo, edades = parse_tr(td_female_list)
-    print('1', titulacion)
-    data[titulacion]['mujeres'] = {
-        'total': total_sexo,
-        'edades': edades,
-    }
-
-# Preparamos los datos en JSON
-json_data = json.dumps(data)
-# Mostramos el resultado
-output.write(json_data)
-output.close()
+from grados import agregados, binario, cache, comprimido, perfil, salida, ugr, validacion
+
+
+def parse(filename):
+    """
+    Parsea el fichero HTML indicado y genera los pares (titulacion, datos) a
+    medida que se leen las filas de cada titulación.
+    """
+    # Se lee en binario (descomprimido si es .gz o .zst) y grados.tabla lo
+    # decodifica (latin-1)
+    html_doc = comprimido.abrir(filename, 'rb')
+    yield from ugr.parse_edades(html_doc)
+    html_doc.close()
+
+
+if __name__ == '__main__':
+    perfil.desde_argv(sys.argv)
+    validador = validacion.desde_argv(sys.argv)
+    acumulado = agregados.desde_argv(sys.argv)
+
+    # Comprobamos los argumentos
+    if len(sys.argv) < 2 or len(sys.argv) > 3:
+        sys.exit('USO: %s input [output]' % sys.argv[0])
+
+    # Preparamos la salida (en formato binario si termina en .bin y una línea
+    # JSON por titulación si termina en .ndjson, antes de .gz o .zst)
+    output = sys.stdout
+    formato = comprimido.sin_compresion(sys.argv[2]) if len(sys.argv) == 3 else ''
+    salida_binaria = formato.endswith('.bin')
+    salida_ndjson = formato.endswith('.ndjson')
+    if len(sys.argv) == 3:
+        output = comprimido.abrir(sys.argv[2], 'wb' if salida_binaria else 'w')
+
+    # Los datos se toman de la caché si el fichero de entrada no ha cambiado y
+    # cada titulación se comprueba y se suma a su facultad al pasar hacia la
+    # salida
+    filename = sys.argv[1]
+    entradas = validador.revisar(cache.entradas(filename, 'ugr-edades', ugr.VERSION, parse))
+    entradas = acumulado.acumular(entradas)
+
+    if salida_binaria:
+        data = dict(entradas)
+        with perfil.etapa('binario'):
+            binario.escribir(data, output)
+    elif salida_ndjson:
+        salida.escribir_ndjson(entradas, output)
+    else:
+        # Cada titulación se escribe en cuanto se ha parseado
+        salida.escribir_json(entradas, output)
+    output.close()
+    acumulado.comprobar(validador)
+    if acumulado.ruta:
+        acumulado.escribir()
+    sys.exit(validador.informe())
@@ -0,0 +1,86 @@
+"""
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+
+"""
+Descripción:
+============
+Mantiene una serie temporal de matriculaciones (grados/serie.py) a partir de
+los ficheros JSON por año que generan los scripts (nuevas_matriculaciones_grado.py
+--batch o upo2json.py).
+
+Añadir cursos (el año se toma del nombre de cada fichero, que debe tener un
+número de cuatro cifras, y se añaden en orden; los cursos que ya están en la
+serie se omiten y uno anterior al último de la serie es un error):
+
+    python serie.py serie append datos/2012.json datos/2013.json
+
+Mostrar la evolución de una titulación (una línea por curso con el total, la
+variación y el crecimiento respecto al curso anterior):
+
+    python serie.py serie resumen --titulacion 'GRADO EN SOCIOLOGÍA'
+
+Argumentos:
+- directorio: Directorio de la serie.
+- orden: append o resumen.
+- ficheros: Ficheros JSON que se añaden (sólo con append).
+- --titulacion: Titulación del resumen (por defecto todas).
+- --profile: Argumento opcional (también --profile=FICHERO.pstats). Muestra al
+  terminar el tiempo y la memoria de cada etapa (ver grados/perfil.py).
+"""
+
+import argparse
+import json
+import sys
+from grados import perfil
+from grados.consulta import por_year
+from grados.serie import Serie
+
+
+if __name__ == '__main__':
+    perfil.desde_argv(sys.argv)
+
+    parser = argparse.ArgumentParser(description='Serie temporal de matriculaciones')
+    parser.add_argument('directorio')
+    parser.add_argument('orden', choices=('append', 'resumen'))
+    parser.add_argument('ficheros', nargs='*')
+    parser.add_argument('--titulacion')
+    args = parser.parse_args()
+
+    serie = Serie(args.directorio)
+
+    if args.orden == 'append':
+        try:
+            ficheros = por_year(args.ficheros)
+        except ValueError as e:
+            parser.error(str(e))
+        for year, filename in ficheros:
+            if year in serie.years:
+                print('%s ya está en la serie' % year, file=sys.stderr)
+                continue
+            with perfil.etapa('json'), open(filename) as f:
+                data = json.load(f)
+            try:
+                with perfil.etapa('serie'):
+                    filas = serie.append(year, data)
+            except ValueError as e:
+                # Un curso anterior al último de la serie
+                parser.error(str(e))
+            perfil.contar('serie', len(filas))
+            print('%s: %d titulaciones' % (year, len(filas)), file=sys.stderr)
+    else:
+        for fila in perfil.iterar('resumen', serie.resumen(titulacion=args.titulacion)):
+            print('\t'.join('' if fila[c] is None else str(fila[c]) for c in (
+                'year', 'titulacion', 'total', 'hombres', 'mujeres', 'delta', 'crecimiento')))
@@ -0,0 +1,59 @@
+"""
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+
+"""
+Descripción:
+============
+Servidor HTTP con los datos de un directorio de ficheros JSON por año (ver
+grados/servicio.py para las rutas disponibles). Cuando aparece o cambia un
+JSON en el directorio, los datos se recargan sin reiniciar el servidor.
+
+Ejemplo:
+
+    python servidor.py datos --port 8080
+    curl http://127.0.0.1:8080/facultad/facultad%20de%20ciencias?year=2012
+
+Argumentos:
+- directorio: Directorio con los ficheros JSON (AÑO.json o upoAÑO.json).
+- --host: Dirección en la que se escucha (por defecto 127.0.0.1).
+- --port: Puerto (por defecto 8080).
+- --intervalo: Segundos entre revisiones del directorio (por defecto 2).
+- --profile: Argumento opcional (también --profile=FICHERO.pstats). Al parar
+  el servidor muestra el tiempo y la memoria de cada etapa (carga del índice
+  y respuestas, ver grados/perfil.py).
+"""
+
+import argparse
+import asyncio
+import sys
+from grados import perfil
+from grados.servicio import servir
+
+
+if __name__ == '__main__':
+    perfil.desde_argv(sys.argv)
+
+    parser = argparse.ArgumentParser(description='Servidor HTTP de los datos de grados')
+    parser.add_argument('directorio')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--intervalo', type=float, default=2.0)
+    args = parser.parse_args()
+
+    try:
+        asyncio.run(servir(args.directorio, args.host, args.port, args.intervalo))
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,78 @@
+import gzip
+import io
+import json
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+from grados import agregados, ugr, validacion
+from grados.registro import Sexo, Titulacion
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'benchmarks'))
+import sintetico
+
+
+class TestAgregados(unittest.TestCase):
+
+    def setUp(self):
+        self.datos = sintetico.titulaciones(40)
+        output = io.StringIO()
+        sintetico.informe_edades(output, self.datos)
+        self.data = list(ugr.parse_edades(io.StringIO(output.getvalue())))
+        # Fila sin titulación, que no se suma
+        self.data.append((None, Titulacion(None, None, Sexo(None, edades=None),
+                                           Sexo(None, edades=None))))
+
+    def test_sumas(self):
+        acumulado = agregados.Agregados()
+        self.assertEqual(list(acumulado.acumular(self.data)), self.data)
+
+        registros = [datos for titulacion, datos in self.data if titulacion is not None]
+        universidad = acumulado.universidad
+        self.assertEqual(universidad.total, sum(d.total for d in registros))
+        self.assertEqual(universidad.mujeres.contador('edades', 18),
+                         sum(d.mujeres.contador('edades', 18) for d in registros))
+        facultad = self.datos[0][0]
+        suma = acumulado.facultad(facultad)
+        self.assertEqual(suma.total, sum(d.total for d in registros if d.facultad == facultad))
+        self.assertEqual(acumulado.titulaciones[facultad],
+                         sum(1 for f, _, _ in self.datos if f == facultad))
+
+        data = acumulado.a_json()
+        self.assertEqual(data['universidad']['titulaciones'], len(registros))
+        self.assertNotIn('facultad', data['universidad'])
+        self.assertEqual(data['facultades'][facultad]['total_informe'], suma.total)
+        with self.assertRaises(KeyError):
+            acumulado.facultad('FACULTAD QUE NO EXISTE')
+
+    def test_comprobar(self):
+        acumulado = agregados.Agregados()
+        list(acumulado.acumular(self.data))
+        validador = validacion.Validador()
+        acumulado.comprobar(validador)
+        self.assertEqual(validador.discrepancias, [])
+
+        # El informe da otro total para la primera facultad
+        facultad = self.datos[0][0]
+        acumulado.totales_informe[facultad] = acumulado.facultad(facultad).total + 1
+        acumulado.comprobar(validador)
+        self.assertEqual(len(validador.discrepancias), 1)
+        self.assertEqual(validador.discrepancias[0].regla, 'facultad')
+
+    def test_escribir(self):
+        directorio = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directorio)
+        argv = ['script', '--agregados=' + os.path.join(directorio, 'agregados.json.gz'),
+                'entrada']
+        acumulado = agregados.desde_argv(argv)
+        self.assertEqual(argv, ['script', 'entrada'])
+        list(acumulado.acumular(self.data))
+        acumulado.escribir()
+        with gzip.open(acumulado.ruta, 'rt') as f:
+            self.assertEqual(json.load(f), json.loads(json.dumps(acumulado.a_json())))
+
+
+if __name__ == '__main__':
+    unittest.main()
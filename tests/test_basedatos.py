@@ -0,0 +1,58 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from grados import salida
+from grados.basedatos import BaseDatos
+from grados.registro import Sexo, Titulacion
+from grados.upo import EDADES
+
+RAIZ = os.path.join(os.path.dirname(__file__), '..')
+
+
+class TestBaseDatos(unittest.TestCase):
+
+    def setUp(self):
+        self.directorio = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directorio)
+        self.bd = BaseDatos(os.path.join(self.directorio, 'grados.sqlite'))
+        self.addCleanup(self.bd.cerrar)
+
+    def test_json_con_fila_sin_titulacion(self):
+        # JSON escrito como los scripts: la fila sin titulación queda como "null"
+        edades = (1,) + (0,) * (len(EDADES) - 1)
+        filename = os.path.join(self.directorio, '2013.json')
+        with open(filename, 'w') as output:
+            salida.escribir_json([
+                ('GRADO EN SOCIOLOGÍA', Titulacion(2, 'FACULTAD', Sexo(1, edades=edades),
+                                                   Sexo(1, edades=edades))),
+                (None, Titulacion(None, 'FACULTAD', Sexo(50, edades=edades),
+                                  Sexo(70, edades=edades))),
+            ], output)
+        with open(filename) as f:
+            data = json.load(f)
+        self.assertIn('null', data)
+
+        self.assertEqual(self.bd.guardar('2013', data), 1)
+        self.assertEqual(self.bd.consulta('SELECT nombre FROM titulaciones'),
+                         [('GRADO EN SOCIOLOGÍA',)])
+        self.assertEqual(self.bd.consulta('SELECT SUM(total) FROM sexos'), [(2,)])
+        self.assertEqual(self.bd.consulta('SELECT SUM(n) FROM edades'), [(2,)])
+
+    def test_nuevo_edad(self):
+        with open(os.path.join(RAIZ, 'data', 'nuevo_edad.json')) as f:
+            data = json.load(f)
+        n = self.bd.guardar('2012', data)
+        titulaciones = (set(data[0]) | set(data[1])) - {'null'}
+        self.assertEqual(n, len(titulaciones))
+        self.assertEqual(self.bd.consulta(
+            "SELECT COUNT(*) FROM titulaciones WHERE nombre = 'null'"), [(0,)])
+        total = sum(por_titulacion[t][0] for por_titulacion in data
+                    for t in titulaciones if t in por_titulacion)
+        self.assertEqual(self.bd.consulta('SELECT SUM(total) FROM sexos'), [(total,)])
+
+
+if __name__ == '__main__':
+    unittest.main()
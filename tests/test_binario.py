@@ -0,0 +1,78 @@
+import io
+import json
+import os
+import sys
+import tempfile
+import unittest
+
+from grados import binario, salida, ugr
+from grados.registro import Sexo, Titulacion
+from grados.upo import EDADES
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'benchmarks'))
+import sintetico
+
+
+class TestBinario(unittest.TestCase):
+
+    def escribir(self, data):
+        fd, filename = tempfile.mkstemp(suffix='.bin')
+        self.addCleanup(os.remove, filename)
+        with os.fdopen(fd, 'wb') as output:
+            binario.escribir(data, output)
+        return filename
+
+    def test_igual_que_json(self):
+        datos = sintetico.titulaciones(30)
+        informes = []
+        for escribir in (sintetico.informe_edades, sintetico.informe_acceso):
+            output = io.StringIO()
+            # La última titulación sólo está en el informe por edades
+            escribir(output, datos if not informes else datos[:-1])
+            informes.append(io.StringIO(output.getvalue()))
+        data = dict(ugr.fusionar(ugr.parse_edades(informes[0]),
+                                 ugr.parse_acceso(informes[1])))
+        data[None] = Titulacion(None, None, Sexo(None, edades=None), Sexo(5))
+
+        with binario.Lector(self.escribir(data)) as lector:
+            self.assertEqual(list(lector), list(data))
+            self.assertEqual(len(lector.facultades), len({f for f, _, _ in datos}))
+            for titulacion, registro in data.items():
+                self.assertEqual(lector[titulacion], registro.a_json())
+            self.assertNotIn('via_acceso', lector[datos[-1][1]]['hombres'])
+            self.assertEqual(lector[None]['hombres'], {'total': None, 'edades': None})
+
+        # Los mismos datos leídos de un JSON (claves de las edades en texto)
+        output = io.StringIO()
+        salida.escribir_json(data.items(), output)
+        desde_json = json.loads(output.getvalue())
+        with binario.Lector(self.escribir(desde_json)) as lector:
+            for titulacion, registro in data.items():
+                self.assertEqual(lector[titulacion], registro.a_json())
+
+    def test_version(self):
+        filename = self.escribir({})
+        with open(filename, 'r+b') as f:
+            f.seek(4)
+            f.write(b'\x01\x00\x00\x00')
+        with self.assertRaises(ValueError):
+            binario.Lector(filename)
+
+    def test_sin_titulacion(self):
+        edades = tuple(range(len(EDADES)))
+        data = {
+            'GRADO EN SOCIOLOGÍA': Titulacion(3, 'FACULTAD', Sexo(1, edades=edades),
+                                              Sexo(2, edades=edades)),
+            # Fila sin titulación
+            None: Titulacion(None, 'FACULTAD', Sexo(5), Sexo(7)),
+        }
+        with binario.Lector(self.escribir(data)) as lector:
+            self.assertEqual(list(lector), ['GRADO EN SOCIOLOGÍA', None])
+            self.assertIn(None, lector)
+            self.assertEqual(lector[None]['mujeres'], {'total': 7})
+            self.assertIsNone(lector[None]['total'])
+            self.assertEqual(lector['GRADO EN SOCIOLOGÍA']['hombres']['edades'][18], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
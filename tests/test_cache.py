@@ -0,0 +1,53 @@
+import contextlib
+import io
+import os
+import pickle
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from grados import cache
+
+
+class TestCache(unittest.TestCase):
+
+    def setUp(self):
+        directorio = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directorio)
+        parche = mock.patch.object(cache, 'DIRECTORIO', directorio)
+        parche.start()
+        self.addCleanup(parche.stop)
+        fd, self.entrada = tempfile.mkstemp(dir=directorio, suffix='.html')
+        os.write(fd, b'<html></html>')
+        os.close(fd)
+
+    def cargar(self, funcion):
+        with contextlib.redirect_stderr(io.StringIO()):
+            return cache.cargar(self.entrada, 'prueba', 1, funcion)
+
+    def test_acierto(self):
+        self.assertEqual(self.cargar(lambda filename: {'a': 1}), {'a': 1})
+        self.assertEqual(self.cargar(lambda filename: self.fail('no usa la caché')),
+                         {'a': 1})
+
+    def test_pickle_antiguo(self):
+        ruta = cache._ruta(self.entrada, 'prueba', 1)
+        # Pickles de una clase que ya no existe y de un módulo renombrado
+        for antiguo in (b'cgrados.registro\nNoExiste\n)R.',
+                        b'cgrados.no_existe\nTitulacion\n)R.'):
+            with open(ruta, 'wb') as f:
+                f.write(antiguo)
+            self.assertEqual(self.cargar(lambda filename: {'a': 2}), {'a': 2})
+            with open(ruta, 'rb') as f:
+                self.assertEqual(pickle.load(f), {'a': 2})
+
+    def test_error_al_guardar(self):
+        with self.assertRaises(Exception):
+            self.cargar(lambda filename: {'a': lambda: None})
+        self.assertEqual([f for f in os.listdir(cache.DIRECTORIO)
+                          if not f.endswith('.html')], [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,65 @@
+import io
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+from grados import comprimido, ugr
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'benchmarks'))
+import sintetico
+
+
+class TestComprimido(unittest.TestCase):
+
+    def setUp(self):
+        self.directorio = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directorio)
+
+    def extensiones(self):
+        return [e for e in ('',) + comprimido.EXTENSIONES if comprimido.disponible(e)]
+
+    def test_texto(self):
+        texto = '{"GRADO EN SOCIOLOGÍA": 54}\n' * 1000
+        for extension in self.extensiones():
+            filename = os.path.join(self.directorio, 'salida.json' + extension)
+            with comprimido.abrir(filename, 'w', encoding='utf-8') as output:
+                output.write(texto)
+                # flush() no vacía el compresor, pero no debe fallar
+                output.flush()
+            with comprimido.abrir(filename, 'r', encoding='utf-8') as f:
+                self.assertEqual(f.read(), texto)
+            if extension:
+                self.assertLess(os.path.getsize(filename), len(texto.encode('utf-8')))
+        with open(os.path.join(self.directorio, 'salida.json.gz'), 'rb') as f:
+            self.assertEqual(f.read(2), b'\x1f\x8b')
+
+    def test_informe(self):
+        output = io.StringIO()
+        sintetico.informe_edades(output, sintetico.titulaciones(20))
+        html = output.getvalue().encode('latin-1')
+        esperado = list(ugr.parse_edades(io.BytesIO(html)))
+        for extension in self.extensiones():
+            filename = os.path.join(self.directorio, 'edades.html' + extension)
+            with comprimido.abrir(filename, 'wb') as output:
+                output.write(html)
+            with comprimido.abrir(filename, 'rb') as html_doc:
+                self.assertEqual(list(ugr.parse_edades(html_doc)), esperado)
+
+    def test_desde_argv(self):
+        argv = ['script', '--compresion=zst', 'entrada']
+        self.assertEqual(comprimido.desde_argv(argv), '.zst')
+        self.assertEqual(argv, ['script', 'entrada'])
+        self.assertEqual(comprimido.desde_argv(argv), '')
+        with self.assertRaises(ValueError):
+            comprimido.desde_argv(['script', '--compresion=bz2'])
+
+    def test_nombres(self):
+        self.assertEqual(comprimido.compresion('a.ndjson.gz'), '.gz')
+        self.assertEqual(comprimido.sin_compresion('a.ndjson.zst'), 'a.ndjson')
+        self.assertEqual(comprimido.sin_compresion('a.json'), 'a.json')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,48 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from grados.consulta import Indice, por_year, year_de
+
+
+class TestYearDe(unittest.TestCase):
+
+    def test_year_de(self):
+        self.assertEqual(year_de('datos/2012.json'), '2012')
+        self.assertEqual(year_de('datos/2012-copia.json.gz'), '2012')
+        self.assertEqual(year_de('2013_edades_ciencias.html'), '2013')
+        self.assertIsNone(year_de('datos/resumen.json'))
+        self.assertIsNone(year_de('2012/120134.json'))
+
+    def test_por_year(self):
+        self.assertEqual(por_year(['b/2013.json', 'a/2012.json']),
+                         [('2012', 'a/2012.json'), ('2013', 'b/2013.json')])
+        with self.assertRaises(ValueError):
+            por_year(['2012.json', 'resumen.json'])
+
+
+class TestIndice(unittest.TestCase):
+
+    def test_sin_titulacion(self):
+        directorio = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directorio)
+        filename = os.path.join(directorio, '2012.json')
+        with open(filename, 'w') as f:
+            json.dump({
+                'GRADO EN SOCIOLOGÍA': {'total': 3, 'facultad': 'FACULTAD',
+                                        'hombres': {'total': 1}, 'mujeres': {'total': 2}},
+                # Fila de los totales de la facultad
+                'null': {'total': None, 'facultad': 'FACULTAD',
+                         'hombres': {'total': 50}, 'mujeres': {'total': 70}},
+            }, f)
+        indice = Indice([filename])
+        self.assertEqual(list(indice.consultar()), [('2012', 'GRADO EN SOCIOLOGÍA', 3)])
+        self.assertEqual(list(indice.consultar(facultad='facultad', sexo='mujeres')),
+                         [('2012', 'GRADO EN SOCIOLOGÍA', 2)])
+        self.assertEqual(indice.titulaciones, ['grado en sociologia'])
+
+
+if __name__ == '__main__':
+    unittest.main()
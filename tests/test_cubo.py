@@ -0,0 +1,45 @@
+import unittest
+
+from grados.cubo import Cubo, HOMBRES, MUJERES
+from grados.upo import EDADES, VIAS_ACCESO
+
+
+class TestDesdeJson(unittest.TestCase):
+
+    def test_contadores_none(self):
+        # Titulación que sólo está en el informe de acceso: sus edades son None
+        data = {
+            'GRADO EN SOCIOLOGÍA': {
+                'total': 3, 'facultad': 'FACULTAD',
+                'hombres': {'total': 1, 'edades': None,
+                            'via_acceso': dict.fromkeys(VIAS_ACCESO, 0)},
+                'mujeres': {'total': 2, 'edades': None, 'via_acceso': None},
+            },
+            'GRADO EN HISTORIA': {
+                'total': 1, 'facultad': 'FACULTAD',
+                'hombres': {'total': 1, 'edades': {str(e): 0 for e in EDADES}},
+                'mujeres': None,
+            },
+        }
+        data['GRADO EN SOCIOLOGÍA']['hombres']['via_acceso']['PAU'] = 1
+        data['GRADO EN HISTORIA']['hombres']['edades']['18'] = 1
+
+        cubo = Cubo.desde_json({'2013': data})
+        sociologia = cubo.indice_titulacion['GRADO EN SOCIOLOGÍA']
+        historia = cubo.indice_titulacion['GRADO EN HISTORIA']
+
+        self.assertFalse(cubo.con_edades[0, sociologia])
+        self.assertTrue(cubo.con_accesos[0, sociologia])
+        self.assertEqual(cubo.edades[0, sociologia].sum(), 0)
+        self.assertEqual(cubo.accesos[0, sociologia, HOMBRES].tolist(),
+                         [1, 0, 0, 0, 0, 0])
+        self.assertEqual(cubo.totales_sexo[0, sociologia].tolist(), [1, 2])
+
+        self.assertTrue(cubo.con_edades[0, historia])
+        self.assertFalse(cubo.con_accesos[0, historia])
+        self.assertEqual(cubo.edades[0, historia, HOMBRES, 0], 1)
+        self.assertEqual(cubo.totales_sexo[0, historia, MUJERES], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,86 @@
+import json
+import math
+import os
+import shutil
+import tempfile
+import unittest
+
+from grados.estadisticas import Estadisticas
+from grados.upo import EDADES, VIAS_ACCESO
+
+
+def sexo(edades, vias):
+    return {'total': sum(edades.values()),
+            'edades': {str(e): edades.get(e, 0) for e in EDADES},
+            'via_acceso': {v: vias.get(v, 0) for v in VIAS_ACCESO}}
+
+
+def titulacion(hombres, mujeres):
+    return {'total': hombres['total'] + mujeres['total'], 'facultad': 'FACULTAD',
+            'hombres': hombres, 'mujeres': mujeres}
+
+
+class TestEstadisticas(unittest.TestCase):
+
+    def setUp(self):
+        self.directorio = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directorio)
+        # 2012: 2 hombres de 18 y 2 mujeres de 20; 2013: 1 hombre de 18 y 3
+        # mujeres de 20. Historia sólo está en 2013.
+        self.escribir('2012', {
+            'GRADO EN SOCIOLOGÍA': titulacion(sexo({18: 2}, {'PAU': 2}),
+                                             sexo({20: 2}, {'PAU': 1, 'F.P.': 1})),
+        })
+        self.escribir('2013', {
+            'GRADO EN SOCIOLOGÍA': titulacion(sexo({18: 1}, {'PAU': 1}),
+                                             sexo({20: 3}, {'PAU': 3})),
+            'GRADO EN HISTORIA': titulacion(sexo({40: 1}, {'Mayores 25': 1}),
+                                           sexo({}, {})),
+        })
+
+    def escribir(self, year, data):
+        with open(os.path.join(self.directorio, year + '.json'), 'w') as output:
+            json.dump(data, output)
+
+    def test_resumen(self):
+        estadisticas = Estadisticas.desde_directorio(self.directorio)
+        sociologia = estadisticas.resumen('GRADO EN SOCIOLOGÍA')
+        self.assertEqual(sorted(sociologia), ['2012', '2013'])
+        self.assertEqual(sociologia['2012']['edad_media'], 19.0)
+        self.assertEqual(sociologia['2012']['edad_mediana'], 18.5)
+        self.assertEqual(sociologia['2013']['cuota_mujeres'], 0.75)
+        self.assertIsNone(sociologia['2012']['variacion_cuota_mujeres'])
+        self.assertEqual(sociologia['2013']['variacion_cuota_mujeres'], 0.25)
+        self.assertEqual(sociologia['2012']['via_acceso']['F.P.'], 0.25)
+
+        # Sin datos en 2012: NaN en los arrays, None en el resumen
+        historia = estadisticas.resumen('GRADO EN HISTORIA')
+        self.assertEqual(historia['2012'], {
+            'edad_media': None, 'edad_mediana': None, 'cuota_mujeres': None,
+            'variacion_cuota_mujeres': None,
+            'via_acceso': dict.fromkeys(VIAS_ACCESO)})
+        self.assertEqual(historia['2013']['edad_media'], 42.0)
+        self.assertEqual(historia['2013']['cuota_mujeres'], 0.0)
+
+        with self.assertRaises(KeyError):
+            estadisticas.resumen('GRADO EN FILOLOGÍA')
+
+    def test_resultados_guardados(self):
+        estadisticas = Estadisticas.desde_directorio(self.directorio)
+        medias = estadisticas.edad_media(sexo='mujeres')
+        self.assertIs(estadisticas.edad_media(sexo='mujeres'), medias)
+        historia = estadisticas.cubo.indice_titulacion['GRADO EN HISTORIA']
+        self.assertTrue(math.isnan(medias[0, historia]))
+        with self.assertRaises(ValueError):
+            medias[0, 0] = 0
+        self.assertIs(Estadisticas.desde_directorio(self.directorio), estadisticas)
+
+        # Otro JSON en el directorio: otra versión de los datos
+        self.escribir('2014', {})
+        nuevas = Estadisticas.desde_directorio(self.directorio)
+        self.assertIsNot(nuevas, estadisticas)
+        self.assertNotEqual(nuevas.version, estadisticas.version)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,49 @@
+import time
+import unittest
+
+from grados import perfil
+
+
+class TestPerfil(unittest.TestCase):
+
+    def setUp(self):
+        perfil.activar(resumen_al_salir=False)
+        perfil.extraer()
+
+    def tearDown(self):
+        import tracemalloc
+        perfil.ACTIVO = False
+        tracemalloc.stop()
+
+    def test_recursiva(self):
+        def cuenta(n):
+            if n:
+                cuenta(n - 1)
+            time.sleep(0.01)
+        cuenta = perfil.medir('cuenta', cuenta)
+        inicio = time.perf_counter()
+        cuenta(4)
+        total = time.perf_counter() - inicio
+        llamadas, _, pared, _, _ = perfil.ETAPAS['cuenta']
+        self.assertEqual(llamadas, 5)
+        self.assertGreaterEqual(pared, 0.05)
+        self.assertLessEqual(pared, total)
+
+    def test_etapas_anidadas(self):
+        inicio = time.perf_counter()
+        with perfil.etapa('fuera'):
+            time.sleep(0.02)
+            with perfil.etapa('dentro'):
+                time.sleep(0.03)
+        total = time.perf_counter() - inicio
+        fuera = perfil.ETAPAS['fuera'][2]
+        dentro = perfil.ETAPAS['dentro'][2]
+        self.assertGreaterEqual(dentro, 0.03)
+        # Sin el tiempo de 'dentro': incluyéndolo sería al menos 0.05
+        self.assertGreaterEqual(fuera, 0.02)
+        self.assertLess(fuera, 0.05)
+        self.assertLessEqual(fuera + dentro, total)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,50 @@
+import unittest
+
+from grados.registro import Sexo, Titulacion, a_json
+from grados.upo import EDADES, VIAS_ACCESO
+
+
+class TestRegistro(unittest.TestCase):
+
+    def setUp(self):
+        self.edades = tuple(range(len(EDADES)))
+        self.titulacion = Titulacion(
+            30, 'FACULTAD', Sexo(sum(self.edades), edades=self.edades),
+            Sexo(12, via_acceso=(7, 0, 2, 1, 1, 1)))
+
+    def test_a_json(self):
+        datos = a_json(self.titulacion)
+        self.assertEqual(list(datos), ['total', 'facultad', 'hombres', 'mujeres'])
+        self.assertEqual(datos['hombres'], {'total': sum(self.edades),
+                                            'edades': dict(zip(EDADES, self.edades))})
+        self.assertEqual(datos['mujeres']['via_acceso'],
+                         dict(zip(VIAS_ACCESO, (7, 0, 2, 1, 1, 1))))
+        # Los diccionarios se devuelven tal cual
+        self.assertIs(a_json(datos), datos)
+        self.assertEqual(Sexo(3, edades=None).a_json(), {'total': 3, 'edades': None})
+
+    def test_contador(self):
+        self.assertEqual(self.titulacion.hombres.contador('edades', 19), 1)
+        self.assertEqual(self.titulacion.mujeres.contador('via_acceso', 'F.P.'), 2)
+        with self.assertRaises(ValueError):
+            self.titulacion.hombres.contador('edades', 17)
+        # Campo que no tiene el sexo
+        with self.assertRaises(AttributeError):
+            self.titulacion.hombres.contador('via_acceso', 'PAU')
+
+    def test_update(self):
+        hombres = self.titulacion.hombres
+        hombres.update(Sexo(20, via_acceso=(20, 0, 0, 0, 0, 0)))
+        self.assertEqual(hombres.total, 20)
+        self.assertEqual(hombres.campos(), ['edades', 'via_acceso'])
+        self.assertEqual(hombres.edades, self.edades)
+
+    def test_slots(self):
+        with self.assertRaises(AttributeError):
+            self.titulacion.otro = 1
+        with self.assertRaises(AttributeError):
+            Sexo(1, otro=(1,))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,45 @@
+import io
+import json
+import unittest
+
+from grados import salida
+from grados.registro import Sexo, Titulacion
+
+
+class TestEscribirJson(unittest.TestCase):
+
+    def entradas(self):
+        return [
+            ('GRADO EN SOCIOLOGÍA', Titulacion(3, 'FACULTAD', Sexo(1), Sexo(2))),
+            # Fila sin titulación
+            (None, Titulacion(None, 'FACULTAD', Sexo(5), Sexo(7))),
+        ]
+
+    def test_clave_none(self):
+        output = io.StringIO()
+        salida.escribir_json(self.entradas(), output)
+        data = json.loads(output.getvalue())
+        esperado = {('null' if t is None else t): d.a_json() for t, d in self.entradas()}
+        self.assertEqual(data, esperado)
+        self.assertEqual(output.getvalue(), json.dumps(
+            {t: d.a_json() for t, d in self.entradas()}))
+
+    def test_claves_repetidas(self):
+        entradas = self.entradas() + [
+            (None, Titulacion(None, None, Sexo(50), Sexo(70))),
+            ('GRADO EN SOCIOLOGÍA', Titulacion(4, 'FACULTAD', Sexo(2), Sexo(2)))]
+        output = io.StringIO()
+        salida.escribir_json(entradas, output)
+        self.assertEqual(output.getvalue().count('"null"'), 2)
+        data = json.loads(output.getvalue())
+        esperado = json.loads(json.dumps({t: d.a_json() for t, d in entradas}))
+        self.assertEqual(list(data.items()), list(esperado.items()))
+
+    def test_sin_titulacion(self):
+        self.assertTrue(salida.sin_titulacion(None))
+        self.assertTrue(salida.sin_titulacion('null'))
+        self.assertFalse(salida.sin_titulacion('GRADO EN SOCIOLOGÍA'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,54 @@
+import json
+import os
+import shutil
+import stat
+import subprocess
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+from grados import salida
+from grados.serie import INDICE, Serie
+
+
+class TestSerie(unittest.TestCase):
+
+    def setUp(self):
+        self.directorio = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directorio)
+        self.data = {'GRADO EN SOCIOLOGÍA': {
+            'total': 3, 'hombres': {'total': 1}, 'mujeres': {'total': 2}}}
+
+    def test_curso_sin_year(self):
+        serie = Serie(self.directorio)
+        with self.assertRaises(ValueError):
+            serie.append('resumen', self.data)
+        self.assertEqual(serie.years, [])
+
+    def test_permisos_indice(self):
+        # La umask se lee al importar grados.salida
+        with mock.patch.object(salida, '_UMASK', 0o022):
+            Serie(self.directorio).append('2012', self.data)
+        modo = stat.S_IMODE(os.stat(os.path.join(self.directorio, INDICE)).st_mode)
+        self.assertEqual(modo, 0o644)
+        self.assertEqual(Serie(self.directorio).years, ['2012'])
+
+    def test_script_curso_anterior(self):
+        ficheros = []
+        for year in ('2013', '2011'):
+            ficheros.append(os.path.join(self.directorio, year + '.json'))
+            with open(ficheros[-1], 'w') as f:
+                json.dump(self.data, f)
+        script = os.path.join(os.path.dirname(__file__), '..', 'serie.py')
+        serie = os.path.join(self.directorio, 'serie')
+        for filename, codigo in zip(ficheros, (0, 2)):
+            resultado = subprocess.run([sys.executable, script, serie, 'append', filename],
+                                       capture_output=True, text=True)
+            self.assertEqual(resultado.returncode, codigo)
+        self.assertIn('no es posterior a 2013', resultado.stderr)
+        self.assertNotIn('Traceback', resultado.stderr)
+
+
+if __name__ == '__main__':
+    unittest.main()
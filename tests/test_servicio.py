@@ -0,0 +1,86 @@
+import asyncio
+import contextlib
+import io
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from grados import servicio
+from grados.servicio import ErrorHTTP, Servicio, sumar
+
+DATOS = {'GRADO EN SOCIOLOGÍA': {
+    'total': 3, 'facultad': 'FACULTAD',
+    'hombres': {'total': 1, 'edades': None, 'via_acceso': {'PAU': 1}},
+    'mujeres': {'total': 2, 'edades': None, 'via_acceso': {'PAU': 2}}}}
+
+
+class TestServicio(unittest.TestCase):
+
+    def setUp(self):
+        self.directorio = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directorio)
+        self.escribir('2012.json', json.dumps(DATOS))
+
+    def escribir(self, nombre, texto):
+        with open(os.path.join(self.directorio, nombre), 'w') as f:
+            f.write(texto)
+
+    def test_sumar_contadores_none(self):
+        suma = sumar(DATOS.values())
+        self.assertEqual(suma['mujeres'], {'total': 2, 'via_acceso': {'PAU': 2}})
+
+    def test_sin_titulacion(self):
+        # Fila de los totales de la facultad, como la escriben los scripts
+        data = dict(DATOS, null={
+            'total': None, 'facultad': 'FACULTAD',
+            'hombres': {'total': 50, 'edades': None, 'via_acceso': {'PAU': 50}},
+            'mujeres': {'total': 70, 'edades': None, 'via_acceso': {'PAU': 70}}})
+        self.escribir('2012.json', json.dumps(data))
+        s = Servicio(self.directorio)
+        self.assertEqual(s.datos('/titulaciones', {}), ['GRADO EN SOCIOLOGÍA'])
+        for ruta in ('/total', '/facultad/facultad'):
+            suma = s.datos(ruta, {})['2012']
+            self.assertEqual(suma['titulaciones'], 1)
+            self.assertEqual(suma['total'], 3)
+            self.assertEqual(suma['hombres'], {'total': 1, 'via_acceso': {'PAU': 1}})
+
+    def test_error_interno(self):
+        s = Servicio(self.directorio)
+        def fallar(ruta, parametros):
+            raise KeyError('x')
+        s.datos = fallar
+        with contextlib.redirect_stderr(io.StringIO()):
+            with self.assertRaises(ErrorHTTP) as error:
+                s.respuesta('/total')
+        self.assertEqual(error.exception.estado, 500)
+
+    def test_recarga_fallida(self):
+        s = Servicio(self.directorio)
+        indice = s.indice
+
+        async def revisar():
+            tarea = asyncio.ensure_future(servicio.vigilar(s, 0.01))
+            # JSON escrito a medias: se sigue sirviendo el índice anterior
+            self.escribir('2013.json', json.dumps(DATOS)[:20])
+            await asyncio.sleep(0.2)
+            self.assertIs(s.indice, indice)
+            self.assertFalse(tarea.done())
+            # Cuando se termina de escribir, se recarga
+            self.escribir('2013.json', json.dumps(DATOS) + ' ')
+            for _ in range(100):
+                await asyncio.sleep(0.02)
+                if s.indice is not indice:
+                    break
+            tarea.cancel()
+
+        errores = io.StringIO()
+        with contextlib.redirect_stderr(errores):
+            asyncio.run(revisar())
+        self.assertIn('no se ha podido recargar', errores.getvalue())
+        self.assertEqual(sorted(s.indice.por_year), ['2012', '2013'])
+
+
+if __name__ == '__main__':
+    unittest.main()
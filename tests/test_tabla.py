@@ -0,0 +1,69 @@
+import io
+import os
+import sys
+import unittest
+
+from grados import perfil
+from grados.tabla import filas
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'benchmarks'))
+import sintetico
+
+
+def leer(html, rapido, tamano=1024):
+    return [(list(fila), fila.colspan, fila.rowspan)
+            for fila in filas(io.BytesIO(html.encode('latin-1')), rapido=rapido,
+                              tamano=tamano)]
+
+
+class TestFilas(unittest.TestCase):
+
+    def setUp(self):
+        datos = sintetico.titulaciones(40)
+        self.informes = []
+        for escribir in (sintetico.informe_edades, sintetico.informe_acceso):
+            output = io.StringIO()
+            escribir(output, datos)
+            self.informes.append(output.getvalue())
+
+    def tearDown(self):
+        perfil.ACTIVO = False
+
+    def comprobar(self, html, tamano=1024):
+        rapidas = leer(html, True, tamano)
+        self.assertEqual(rapidas, leer(html, False, tamano))
+        return rapidas
+
+    def test_informes(self):
+        for html in self.informes:
+            rapidas = self.comprobar(html)
+            self.assertEqual(len(rapidas), html.count('<tr>'))
+            self.assertTrue(any(colspan for _, colspan, _ in rapidas))
+            # Con bloques de otro tamaño, las filas quedan partidas en otro sitio
+            self.assertEqual(rapidas, leer(html, True, 97))
+
+    def test_fila_con_etiquetas(self):
+        # Una fila que no tiene la forma esperada: el resto, con html.parser
+        html = self.informes[0]
+        posicion = html.index('<tr>', len(html) // 2)
+        html = html[:posicion] + '<tr><td><b>x</b> y</td></tr>\n' + html[posicion:]
+        perfil.activar(resumen_al_salir=False)
+        perfil.extraer()
+        rapidas = self.comprobar(html)
+        self.assertIn((['x y'], {}, {}), rapidas)
+        etapas = perfil.extraer()
+        self.assertGreater(etapas['html_rapido'][1], 0)
+        self.assertGreater(etapas['html_rapido'][0], 0)
+        self.assertGreater(etapas['html'][1], 0)
+
+    def test_muestra_distinta(self):
+        # La expresión regular corta el atributo en '>', html.parser no: la
+        # comprobación de las primeras filas lo detecta
+        html = self.informes[0].replace('<tr><td colspan="22">',
+                                        '<tr><td title=\'>\' colspan="22">', 1)
+        rapidas = self.comprobar(html)
+        self.assertEqual(rapidas[0][1], {0: 22})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,124 @@
+import io
+import os
+import sys
+import unittest
+
+from grados import ugr, validacion
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'benchmarks'))
+import sintetico
+
+
+def fila(facultad, total, titulacion, total_titulacion, edades):
+    edades = [str(n) for n in edades]
+    return [facultad, total, titulacion, total_titulacion, 'Hombre'] + edades + [
+        str(sum(int(n.replace('.', '')) for n in edades))]
+
+
+class TestParseLoteEdades(unittest.TestCase):
+
+    def comprobar(self, td_lists):
+        self.assertEqual(ugr.parse_lote_edades(td_lists),
+                         [ugr.parse_tr_edades(td_list) for td_list in td_lists])
+
+    def test_igual_que_fila_a_fila(self):
+        self.comprobar([
+            fila('FACULTAD', '1.234', 'GRADO EN\n SOCIOLOGÍA', '120', range(15)),
+            fila('', '', 'GRADO EN\n SOCIOLOGÍA', '', ['1.001'] + [0] * 14),
+            # Fila sin titulación (totales de la facultad)
+            ['FACULTAD', '1.234', '', '', ''],
+            fila('', '', 'GRADO EN HISTORIA', 'x', [7] * 15),
+        ])
+
+    def test_vuelve_a_fila_a_fila(self):
+        # Ceros a la izquierda: el escáner de json no los acepta, int() sí
+        self.comprobar([fila('FACULTAD', '', 'GRADO EN HISTORIA', '', ['007'] * 15)])
+        with self.assertRaises(ValueError):
+            ugr.parse_lote_edades([fila('FACULTAD', '', 'GRADO', '', [''] * 15)])
+
+    def test_coma_en_una_celda(self):
+        # '1,2' tiene sólo dígitos y comas, pero daría un valor de más que
+        # desplazaría los de las filas siguientes del lote
+        mala = fila('', '', 'GRADO EN HISTORIA', '', [0] * 15)
+        mala[5] = '1,2'
+        td_lists = [
+            fila('FACULTAD', '', 'GRADO EN SOCIOLOGÍA', '', range(15)),
+            mala,
+            fila('', '', 'GRADO EN FILOLOGÍA', '', range(15, 30)),
+        ]
+        with self.assertRaises(ValueError):
+            ugr.parse_tr_edades(mala)
+        with self.assertRaises(ValueError):
+            ugr.parse_lote_edades(td_lists)
+
+
+class TestParseEdades(unittest.TestCase):
+
+    def test_fila_sin_titulacion(self):
+        output = io.StringIO()
+        sintetico.informe_edades(output, sintetico.titulaciones(10))
+        # Fila de totales al final del informe, tras la última facultad
+        totales = '<tr><td></td><td></td><td></td>%s</tr>\n' % ('<td></td>' * 19)
+        html = output.getvalue().replace('</tbody>', totales * 2 + '</tbody>')
+
+        data = list(ugr.parse_edades(io.StringIO(html)))
+        self.assertEqual(len(data), 11)
+        titulacion, datos = data[-1]
+        self.assertIsNone(titulacion)
+        self.assertIsNone(datos.facultad)
+        self.assertIsNone(datos.total_facultad)
+        self.assertEqual(data[-2][1].facultad, sintetico.titulaciones(10)[-1][0])
+
+
+class TestFusionar(unittest.TestCase):
+
+    def setUp(self):
+        self.datos = sintetico.titulaciones(30)
+        self.html = {}
+        for tipo, escribir in (('edades', sintetico.informe_edades),
+                               ('acceso', sintetico.informe_acceso)):
+            output = io.StringIO()
+            escribir(output, self.datos)
+            self.html[tipo] = output.getvalue()
+
+    def parse(self, tipo):
+        parse = ugr.parse_edades if tipo == 'edades' else ugr.parse_acceso
+        return list(parse(io.StringIO(self.html[tipo])))
+
+    def comprobar(self, entradas, unidas):
+        # merge modifica los registros que une: cada uno se parsea aparte
+        edades, acceso = entradas()
+        esperado = ugr.merge(dict(edades), acceso)
+        fusionados = list(ugr.fusionar(*entradas()))
+        self.assertEqual([t for t, _ in fusionados], list(esperado))
+        self.assertEqual(dict(fusionados), esperado)
+        self.assertEqual(sum(d.hombres.campos() == ['edades', 'via_acceso']
+                             for _, d in fusionados), unidas)
+
+    def test_mismo_orden(self):
+        self.comprobar(lambda: (self.parse('edades'), self.parse('acceso')), 30)
+
+    def test_otro_orden(self):
+        # Titulaciones en otro orden, una que sólo está en el informe de
+        # edades y otra que sólo está en el de acceso
+        def entradas():
+            acceso = self.parse('acceso')
+            return self.parse('edades')[:-1], (acceso[5:] + acceso[:5])[1:]
+        self.comprobar(entradas, 28)
+
+    def test_totales_distintos(self):
+        acceso = self.parse('acceso')
+        titulacion, datos = acceso[3]
+        datos.total = datos.total + 1
+        with self.assertRaises(Exception):
+            list(ugr.fusionar(self.parse('edades'), acceso))
+
+        validador = validacion.Validador()
+        fusionados = list(ugr.fusionar(self.parse('edades'), acceso, validador))
+        self.assertEqual(len(fusionados), len(self.datos))
+        self.assertEqual([(d.titulacion, d.regla) for d in validador.discrepancias],
+                         [(titulacion, 'merge')])
+
+
+if __name__ == '__main__':
+    unittest.main()
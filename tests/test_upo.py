@@ -0,0 +1,76 @@
+import csv
+import io
+import os
+import sys
+import tempfile
+import unittest
+
+from grados import upo
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'benchmarks'))
+import sintetico
+
+CSV = """curso,titulacion,ingreso,edad,sexo
+2012,GRADO EN HISTORIA,SELECTIVIDAD LOGSE,18,M
+
+2012,GRADO EN HISTORIA,MAYORES DE 25 AÑOS,41,H
+2012,GRADO EN HISTORIA,TRASLADO DE EXPEDIENTE,22
+2013,GRADO EN HISTORIA,CICLO FORMATIVO FP,20,V
+"""
+
+
+class TestAgregar(unittest.TestCase):
+
+    def test_lineas_en_blanco_e_incompletas(self):
+        data = dict(upo.agregar(csv.reader(io.StringIO(CSV))))
+        self.assertEqual(sorted(data), ['2012', '2013'])
+        historia = upo.year_data(data['2012'])['GRADO EN HISTORIA']
+        self.assertEqual(historia['total'], 2)
+        self.assertEqual(historia['mujeres']['edades'][18], 1)
+        self.assertEqual(historia['mujeres']['via_acceso']['PAU'], 1)
+        self.assertEqual(historia['hombres']['edades'][40], 1)
+        self.assertEqual(historia['hombres']['via_acceso']['Mayores 25'], 1)
+        historia = upo.year_data(data['2013'])['GRADO EN HISTORIA']
+        self.assertEqual(historia['hombres']['via_acceso']['F.P.'], 1)
+
+    def test_indice_acceso(self):
+        otros = len(upo.EDADES) + upo.VIAS_ACCESO.index('Otros')
+        self.assertEqual(upo.indice_acceso('TRASLADO DE EXPEDIENTE'), otros)
+        self.assertEqual(upo.indice_acceso('Credencial UNED'),
+                         len(upo.EDADES) + upo.VIAS_ACCESO.index('Credencial'))
+
+
+class TestTrozos(unittest.TestCase):
+
+    def setUp(self):
+        fd, self.filename = tempfile.mkstemp(suffix='.csv')
+        self.addCleanup(os.remove, self.filename)
+        with os.fdopen(fd, 'w', encoding='utf-8', newline='') as output:
+            sintetico.csv_upo(output, 3000, n_titulaciones=20)
+
+    def test_igual_que_una_pasada(self):
+        with open(self.filename, encoding='utf-8', newline='') as f:
+            esperado = dict(upo.agregar(csv.reader(f)))
+        tamano = os.path.getsize(self.filename)
+        for n in (1, 3, 8, 5000):
+            limites = upo.trozos(self.filename, n)
+            self.assertLessEqual(len(limites), n)
+            self.assertEqual(limites[0][0], 0)
+            self.assertEqual(limites[-1][1], tamano)
+            self.assertEqual([fin for _, fin in limites[:-1]],
+                             [inicio for inicio, _ in limites[1:]])
+            data = {}
+            for inicio, fin in limites:
+                upo.combinar(data, upo.agregar_trozo(self.filename, inicio, fin, 'utf-8'))
+            self.assertEqual(data, esperado)
+            # Las titulaciones quedan en el mismo orden
+            for curso in esperado:
+                self.assertEqual(list(data[curso]), list(esperado[curso]))
+
+    def test_sin_fichero(self):
+        with self.assertRaises(FileNotFoundError):
+            upo.trozos(self.filename + '.no', 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,33 @@
+import io
+import unittest
+
+from grados import validacion
+
+
+class TestInforme(unittest.TestCase):
+
+    def test_codigo_de_salida(self):
+        validador = validacion.Validador()
+        self.assertEqual(validador.informe(io.StringIO()), 0)
+        validador.anotar('FACULTAD', 'GRADO EN SOCIOLOGÍA', 'merge', None, 56, 57)
+        self.assertEqual(validador.informe(io.StringIO()),
+                         validacion.ESTADO_DISCREPANCIAS)
+        validador.tolerar = True
+        self.assertEqual(validador.informe(io.StringIO()), 0)
+
+    def test_desde_argv(self):
+        argv = ['script', '--tolerar-discrepancias', 'entrada']
+        validador = validacion.desde_argv(argv)
+        self.assertEqual(argv, ['script', 'entrada'])
+        self.assertTrue(validador.activo)
+        self.assertTrue(validador.tolerar)
+
+        argv = ['script', '--sin-validacion', 'entrada']
+        validador = validacion.desde_argv(argv)
+        self.assertEqual(argv, ['script', 'entrada'])
+        self.assertFalse(validador.activo)
+        self.assertEqual(validador.informe(io.StringIO()), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
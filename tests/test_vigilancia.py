@@ -0,0 +1,66 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from grados.vigilancia import Vigilante, estado
+
+
+class TestVigilante(unittest.TestCase):
+
+    def setUp(self):
+        self.directorio = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directorio)
+        self.a = self.escribir('a.html', 'a')
+        self.b = self.escribir('b.html', 'b')
+        self.escribir('notas.txt', 'no se vigila')
+
+    def escribir(self, nombre, texto):
+        filename = os.path.join(self.directorio, nombre)
+        with open(filename, 'w') as output:
+            output.write(texto)
+        return filename
+
+    def comprobar(self, inotify):
+        vigilante = Vigilante(self.directorio, '*.html', espera=0.05, intervalo=0.01,
+                              inotify=inotify)
+        self.addCleanup(vigilante.cerrar)
+        cambios = vigilante.cambios()
+        self.assertEqual(next(cambios), ([self.a, self.b], []))
+
+        # Otro tamaño, un fichero nuevo y uno borrado, a la vez
+        self.escribir('a.html', 'aa')
+        c = self.escribir('c.html', 'c')
+        os.remove(self.b)
+        self.escribir('notas.txt', 'tampoco')
+        self.assertEqual(next(cambios), ([self.a, c], [self.b]))
+        return vigilante
+
+    def test_revisando(self):
+        vigilante = self.comprobar(inotify=False)
+        self.assertIsNone(vigilante.fd)
+
+    def test_inotify(self):
+        vigilante = self.comprobar(inotify=True)
+        if vigilante.fd is None:
+            self.skipTest('inotify no disponible')
+
+    def test_desde_estado_anterior(self):
+        anterior = estado([self.a, self.b])
+        self.escribir('b.html', 'bb')
+        vigilante = Vigilante(self.directorio, '*.html', espera=0.05, intervalo=0.01,
+                              inotify=False)
+        self.assertEqual(next(vigilante.cambios(anterior)), ([self.b], []))
+
+    def test_sin_directorio(self):
+        # Sin el directorio no se puede usar inotify: se revisa cada intervalo
+        directorio = os.path.join(self.directorio, 'no')
+        vigilante = Vigilante(directorio, inotify=True)
+        self.assertIsNone(vigilante.fd)
+        self.assertEqual(vigilante.ficheros(), [])
+        self.assertEqual(estado([self.a, os.path.join(directorio, 'a.html')]),
+                         {self.a: estado([self.a])[self.a]})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,81 @@
+import contextlib
+import io
+import json
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+import vigilar
+from grados import validacion
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'benchmarks'))
+import sintetico
+
+
+class Vigilante:
+    """
+    Como grados.vigilancia.Vigilante, pero los cambios son los de la lista y
+    los borrados se hacen al avisar de ellos.
+    """
+
+    def __init__(self, directorio, cambios):
+        self.directorio = directorio
+        self.lista = cambios
+
+    def cambios(self):
+        for cambiados, borrados in self.lista:
+            for filename in borrados:
+                os.remove(filename)
+            yield cambiados, borrados
+
+
+class TestVigilar(unittest.TestCase):
+
+    def setUp(self):
+        self.entrada = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.entrada)
+        self.salida = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.salida)
+
+        datos = sintetico.titulaciones(24)
+        self.titulaciones = {}
+        self.informes = {}
+        for parte, lista in (('a', datos[:12]), ('b', datos[12:])):
+            self.titulaciones[parte] = {titulacion for _, titulacion, _ in lista}
+            for tipo, escribir in (('edades', sintetico.informe_edades),
+                                   ('acceso', sintetico.informe_acceso)):
+                filename = os.path.join(self.entrada, '2012_%s_%s.html' % (tipo, parte))
+                with open(filename, 'w', encoding='latin-1') as output:
+                    escribir(output, lista)
+                self.informes[tipo, parte] = filename
+
+    def vigilar(self, cambios):
+        with ThreadPoolExecutor(1) as executor, \
+                contextlib.redirect_stderr(io.StringIO()):
+            vigilar.vigilar(Vigilante(self.entrada, cambios), self.salida, executor,
+                            validacion.Validador(activo=False))
+
+    def leer(self):
+        with open(os.path.join(self.salida, '2012.json')) as f:
+            return set(json.load(f)) - {'null'}
+
+    def test_informe_borrado(self):
+        todos = sorted(self.informes.values())
+        self.vigilar([(todos, [])])
+        self.assertEqual(self.leer(), self.titulaciones['a'] | self.titulaciones['b'])
+
+        # El informe de acceso de b se queda sin pareja: 2012 sólo tiene a
+        self.vigilar([(todos, []), ([], [self.informes['edades', 'b']])])
+        self.assertEqual(self.leer(), self.titulaciones['a'])
+
+        # Sin informes, se borra 2012.json
+        a = [self.informes['acceso', 'a'], self.informes['edades', 'a']]
+        self.vigilar([(a, []), ([], a)])
+        self.assertEqual(os.listdir(self.salida), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
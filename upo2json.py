@@ -79,47 +79,109 @@ ejemplo de la estructura devuelta:
     ...
 }
 
+Se genera un fichero upoAÑO.json por cada curso. El CSV se recorre una sola
+vez (ver grados/upo.py). Si el fichero está ordenado por curso, cada año se
+escribe en cuanto termina; si un curso vuelve a aparecer más adelante, su
+fichero se reescribe al final con los datos completos.
+
+Si se indica el número de procesos, el CSV se divide en tantos trozos de
+líneas completas, cada proceso agrega uno y los contadores se suman al final
+(ver grados/upo.py); los ficheros JSON son los mismos, pero se escriben
+todos al terminar. Los campos del CSV no deben contener saltos de línea.
+
 Argumentos:
-- input: Fichero CSV que contiene la información ofrecida por la UPO
+- input: Fichero CSV que contiene la información ofrecida por la UPO. Puede
+  estar comprimido con gzip (.gz) o zstd (.zst); se descomprime a medida que
+  se lee (ver grados/comprimido.py).
 - output_dir: Directorio donde se almacenarán los ficheros JSON.
+- procesos: Argumento opcional. Número de procesos con los que se agrega el
+  CSV en paralelo. Un CSV comprimido no se puede dividir en trozos, así que
+  siempre se agrega en una sola pasada.
+- --compresion=gz o --compresion=zst: Argumento opcional. Los ficheros se
+  escriben comprimidos (upoAÑO.json.gz o upoAÑO.json.zst).
+- --profile: Argumento opcional (también --profile=FICHERO.pstats). Muestra al
+  terminar el tiempo y la memoria de cada etapa (ver grados/perfil.py). Con
+  varios procesos se suman las etapas de todos.
 """
 import csv
 import json
+import locale
 import os
 import sys
+from concurrent.futures import ProcessPoolExecutor
+from grados import comprimido, perfil, upo
 
 
-
-# Comprobamos los argumentos
-if len(sys.argv) != 3:
-    sys.exit('USO:', sys.argv[0], 'input output_dir')
-
-# Estructuras para almacenar los datos
-data = {}
-
-# Apertura del fichero de entrada por edades
-filename = sys.argv[1]    
-reader = csv.reader(open(filename, "r"))
-
-for row in reader:
-    curso, titulacion, ingreso, edad, sexo, pais_nacionalidad, \
-        pais_familiar, ccaa_familiar, provincia_familiar, poblacion_familiar, \
-        familia_numerosa = row
-    
-    titulacion_data = data.setdefault(curso, {}).setdefault(titulacion, {
-        'total': 0,
-        'hombres': { 'total': 0 },
-        'mujeres': { 'total': 0 },
-    })
-    
-    titulacion_data['total'] = titulacion_data['total'] + 1
-    # ... por terminar ...
-
-for year, year_data in data.items():
-    filename = os.path.join(output_dir, 'upo'+year+'.json')
-    output = open(filename, 'w+')
+def escribir(output_dir, year, titulaciones, compresion=''):
+    filename = os.path.join(output_dir, 'upo'+year+'.json'+compresion)
+    output = comprimido.abrir(filename, 'w')
     # Preparamos los datos en JSON
-    json_data = json.dumps(year_data)
+    with perfil.etapa('json'):
+        json_data = json.dumps(upo.year_data(titulaciones))
     # Mostramos el resultado
-    output.write(json_data)
-    output.close()
+    with perfil.etapa('escritura'):
+        output.write(json_data)
+        output.close()
+
+
+def agregar_en_proceso(filename, inicio, fin, encoding):
+    """
+    Agrega un trozo del CSV (ver upo.agregar_trozo) y devuelve además las
+    etapas medidas en el proceso con --profile, para sumarlas en el principal.
+    """
+    reader = perfil.iterar('csv', upo.leer_trozo(filename, inicio, fin, encoding))
+    por_year = dict(perfil.iterar('agregar', upo.agregar(reader)))
+    return por_year, perfil.extraer()
+
+
+def agregar_en_paralelo(filename, procesos):
+    """
+    Agrega el CSV por trozos en procesos procesos y devuelve
+    {curso: {titulacion: contadores}}.
+    """
+    # La misma codificación que open() en modo texto
+    encoding = locale.getpreferredencoding(False)
+
+    inicializar = {}
+    if perfil.ACTIVO:
+        inicializar = {'initializer': perfil.activar, 'initargs': (None, False)}
+
+    data = {}
+    with ProcessPoolExecutor(procesos, **inicializar) as executor:
+        futuros = [executor.submit(agregar_en_proceso, filename, inicio, fin, encoding)
+                   for inicio, fin in upo.trozos(filename, procesos)]
+        # Los trozos se suman en orden para conservar el de las titulaciones
+        for futuro in futuros:
+            parcial, etapas = futuro.result()
+            perfil.sumar(etapas)
+            with perfil.etapa('combinar'):
+                upo.combinar(data, parcial)
+    return data
+
+
+if __name__ == '__main__':
+    perfil.desde_argv(sys.argv)
+    compresion = comprimido.desde_argv(sys.argv)
+
+    # Comprobamos los argumentos
+    if len(sys.argv) not in (3, 4):
+        sys.exit('USO: %s input output_dir [procesos]' % sys.argv[0])
+
+    output_dir = sys.argv[2]
+    filename = sys.argv[1]
+
+    if len(sys.argv) == 4 and comprimido.compresion(filename):
+        print('%s está comprimido, se agrega en una sola pasada' % filename,
+              file=sys.stderr)
+    elif len(sys.argv) == 4:
+        por_year = agregar_en_paralelo(filename, int(sys.argv[3]))
+        for year, titulaciones in por_year.items():
+            escribir(output_dir, year, titulaciones, compresion)
+        sys.exit()
+
+    # Apertura del fichero de entrada (descomprimido si es .gz o .zst)
+    reader = perfil.iterar('csv', csv.reader(comprimido.abrir(filename, "r", newline='')))
+
+    agregados = perfil.iterar('agregar', upo.agregar(reader))
+    for year, titulaciones in agregados:
+        escribir(output_dir, year, titulaciones, compresion)
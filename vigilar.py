@@ -0,0 +1,214 @@
+"""
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+
+
+"""
+Descripción:
+============
+Proceso permanente que vigila un directorio de informes de Acceso
+Identificado (p. ej. datos-raw) y, cuando aparece o cambia alguno, vuelve a
+generar los JSON por año en el directorio de salida (p. ej. data), como
+nuevas_matriculaciones_grado.py --batch.
+
+- Los informes se vigilan con inotify (o revisando el directorio cada
+  --intervalo segundos si no está disponible, ver grados/vigilancia.py); sin
+  cambios, el proceso no consume CPU.
+- Un informe sólo se procesa cuando lleva --espera segundos sin cambiar,
+  para no leer ficheros a medio copiar.
+- Sólo se parsean los informes nuevos o que han cambiado, en un conjunto de
+  procesos que se mantiene abierto; los datos de los demás se guardan en
+  memoria (y en la caché de grados/cache.py).
+- Sólo se vuelven a escribir los años afectados. Cada AÑO.json se escribe en
+  un fichero temporal del directorio de salida y se cambia por el anterior
+  con os.replace, así que quien lo lea ve el fichero anterior o el nuevo,
+  nunca uno a medias.
+- Si se borran todos los informes de un año, se borra su AÑO.json.
+
+Si un informe no se puede parsear (p. ej. está incompleto), se indica por la
+salida de error, su año no se actualiza y se sigue vigilando.
+
+Ejemplo:
+
+    python vigilar.py datos-raw data
+
+Argumentos:
+- entrada: Directorio de los informes HTML (se emparejan como en
+  nuevas_matriculaciones_grado.py --batch).
+- salida: Directorio donde se escriben los ficheros AÑO.json.
+- --procesos: Número de procesos (por defecto, uno por núcleo).
+- --espera: Segundos sin cambios antes de procesar un informe (por defecto 2).
+- --intervalo: Segundos entre revisiones del directorio si no se puede usar
+  inotify (por defecto 2).
+- --sin-inotify: Revisa siempre el directorio cada --intervalo segundos.
+- --compresion=gz o --compresion=zst: Argumento opcional. Los ficheros
+  AÑO.json se escriben comprimidos (AÑO.json.gz o AÑO.json.zst).
+- --sin-validacion: Argumento opcional. Por defecto, las discrepancias de
+  cada año (ver grados/validacion.py) se muestran por la salida de error al
+  escribirlo. Con esta opción no se comprueba nada y un año cuyos informes
+  no coinciden no se actualiza.
+- --profile: Argumento opcional (también --profile=FICHERO.pstats). Al parar
+  muestra el tiempo y la memoria de cada etapa, sumando las de todos los
+  procesos (ver grados/perfil.py).
+"""
+
+import argparse
+import copy
+import os
+import signal
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from grados import comprimido, perfil, salida, ugr, validacion
+from grados.vigilancia import Vigilante
+from nuevas_matriculaciones_grado import parejas, parse_en_proceso
+
+
+def publicar(output_dir, year, entradas, compresion=''):
+    """
+    Escribe output_dir/AÑO.json (con la extensión de compresion) sin que
+    nunca se vea a medias: se escribe en un temporal y se cambia por el
+    anterior. El fichero queda con los permisos de uno nuevo (como los que
+    escribe el modo por lotes), no con los 0600 del temporal.
+    """
+    fd, temporal = tempfile.mkstemp(dir=output_dir, prefix='.' + year + '-',
+                                    suffix='.json' + compresion)
+    os.close(fd)
+    try:
+        with comprimido.abrir(temporal, 'w') as output:
+            salida.escribir_json(entradas, output)
+        salida.permisos_por_defecto(temporal)
+        os.replace(temporal, os.path.join(output_dir, year + '.json' + compresion))
+    except BaseException:
+        os.remove(temporal)
+        raise
+
+
+def retirar(output_dir, year, compresion=''):
+    """
+    Borra output_dir/AÑO.json (con la extensión de compresion), si existe.
+    """
+    try:
+        os.remove(os.path.join(output_dir, year + '.json' + compresion))
+    except FileNotFoundError:
+        pass
+
+
+def vigilar(vigilante, output_dir, executor, validador, compresion=''):
+    """
+    Procesa los informes de vigilante cada vez que cambian, hasta que se
+    interrumpa.
+    """
+    # Datos parseados de cada informe: {filename: {titulacion: datos}}
+    parseados = {}
+    # Año de cada informe emparejado la vez anterior: un informe borrado ya
+    # no está en el emparejamiento actual, pero hay que reescribir su año
+    years_anteriores = {}
+    for cambiados, borrados in vigilante.cambios():
+        inicio = time.perf_counter()
+        por_year = parejas(vigilante.directorio)
+        tipos = {}
+        years = {}
+        for year, lista in por_year.items():
+            for input_edades, input_acceso in lista:
+                tipos[input_edades] = 'edades'
+                tipos[input_acceso] = 'acceso'
+                years[input_edades] = years[input_acceso] = year
+
+        for filename in borrados:
+            parseados.pop(filename, None)
+        futuros = {filename: executor.submit(parse_en_proceso, tipos[filename], filename)
+                   for filename in cambiados if filename in tipos}
+        for filename, futuro in futuros.items():
+            parseados.pop(filename, None)
+            try:
+                data, segundos, etapas = futuro.result()
+            except Exception as e:
+                print('error  %s: %s' % (filename, e), file=sys.stderr)
+                continue
+            perfil.sumar(etapas)
+            parseados[filename] = data
+            print('%8.2f s  %s' % (segundos, filename), file=sys.stderr)
+
+        # Sólo se escriben los años con algún informe nuevo, cambiado o borrado
+        afectados = set()
+        for filename in cambiados + borrados:
+            for year in (years_anteriores.get(filename), years.get(filename)):
+                if year is not None:
+                    afectados.add(year)
+        years_anteriores = years
+        for year in sorted(afectados):
+            if year not in por_year:
+                retirar(output_dir, year, compresion)
+                print('%s: retirado (no le quedan informes)' % year, file=sys.stderr)
+                continue
+            informes = [f for pareja in por_year[year] for f in pareja]
+            if not all(f in parseados for f in informes):
+                print('%s: no se actualiza (hay informes con errores)' % year,
+                      file=sys.stderr)
+                continue
+            validador.origen = year
+            validador.discrepancias = []
+            data = {}
+            try:
+                # merge modifica los datos que une: se usa una copia para poder
+                # volver a unirlos cuando cambie otro informe del año
+                for filename in informes:
+                    ugr.merge(data, copy.deepcopy(parseados[filename]), validador)
+            except Exception as e:
+                print('%s: no se actualiza (%s)' % (year, e), file=sys.stderr)
+                continue
+            publicar(output_dir, year, validador.revisar(data.items()), compresion)
+            validador.informe()
+            print('%s: publicado (%d titulaciones)' % (year, len(data)), file=sys.stderr)
+        print('%8.2f s  desde que dejaron de cambiar' % (time.perf_counter() - inicio),
+              file=sys.stderr)
+
+
+if __name__ == '__main__':
+    perfil.desde_argv(sys.argv)
+    validador = validacion.desde_argv(sys.argv)
+    compresion = comprimido.desde_argv(sys.argv)
+
+    parser = argparse.ArgumentParser(description='Vigila un directorio de informes')
+    parser.add_argument('entrada')
+    parser.add_argument('salida')
+    parser.add_argument('--procesos', type=int)
+    parser.add_argument('--espera', type=float, default=2.0)
+    parser.add_argument('--intervalo', type=float, default=2.0)
+    parser.add_argument('--sin-inotify', action='store_true')
+    args = parser.parse_args()
+
+    # Con SIGTERM se termina como con Ctrl+C
+    signal.signal(signal.SIGTERM, signal.default_int_handler)
+
+    vigilante = Vigilante(args.entrada, '*.htm*', args.espera, args.intervalo,
+                          inotify=not args.sin_inotify)
+    print('vigilando %s (%s)' % (args.entrada, 'polling' if vigilante.fd is None else 'inotify'),
+          file=sys.stderr)
+
+    # Con --profile, cada proceso mide sus etapas y las devuelve con los datos
+    inicializar = {}
+    if perfil.ACTIVO:
+        inicializar = {'initializer': perfil.activar, 'initargs': (None, False)}
+
+    try:
+        with ProcessPoolExecutor(args.procesos, **inicializar) as executor:
+            vigilar(vigilante, args.salida, executor, validador, compresion)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        vigilante.cerrar()